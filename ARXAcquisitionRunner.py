@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from ARXApiDataAcquire import ARXApiDataAcquire
+
+
+class ARXRateLimiter:
+    """
+    Spaces out calls so that at most `rate` calls per second are started.
+
+    Attributes:
+        rate (float): Maximum calls per second (None for no limit).
+    """
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ARXAcquisitionRunner:
+    """
+    The ARXAcquisitionRunner acquires several yield curves (datalink codes and tickers) in one job.
+
+    Sources are fetched concurrently by at most `max_workers` threads, so the wall-clock time of a job is close
+    to that of its slowest source rather than the sum of all of them. Each datalink code has its own rate limit
+    shared by every source using it, failed requests are retried with exponential backoff and jitter, and each
+    source's CSV files are written as soon as its response arrives.
+
+    A source is a dict with the ARXApiDataAcquire parameters:
+        {"ticker": "US TREASURY", "maturities": ["3 MO", "10 YR"], "nasdaq_datalink_code": "USTREASURY/YIELD",
+         "start_date": "2021-01-01", "end_date": "2023-01-01", "rate_limit": 2}
+    'start_date' and 'end_date' default to the runner's dates, and 'rate_limit' (calls per second) is optional.
+    Each (ticker, datalink code) pair may only be listed once, and no two sources may write the same CSV file.
+
+    Attributes:
+        sources (list): The sources to acquire.
+        start_date (str): Default data retrieval start date.
+        end_date (str): Default data retrieval end date.
+        config_directory (Path): Directory where config.json is located.
+        destination_directory (Path): Directory where CSV files will be saved.
+        max_workers (int): Maximum number of concurrent requests.
+        retries (int): Retries per source after the first attempt.
+        backoff (float): Initial retry delay in seconds, doubled on every retry.
+        response_cache (ARXApiResponseCache): Optional cache of API responses shared by all sources.
+        fetcher (callable): Optional fetcher passed to every ARXApiDataAcquire (defaults to Quandl).
+    """
+
+    def __init__(self, sources, start_date, end_date, config_directory=Path.cwd(), destination_directory=Path.cwd(),
+                 max_workers=4, retries=3, backoff=1.0, response_cache=None, fetcher=None):
+        self.sources = sources
+        self.start_date = start_date
+        self.end_date = end_date
+        self.config_directory = Path(config_directory)
+        self.destination_directory = Path(destination_directory)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.response_cache = response_cache
+        self.fetcher = fetcher
+        self.validate_sources(sources)
+        self.rate_limiters = {}
+        for source in sources:
+            code = source.get("nasdaq_datalink_code", "USTREASURY/YIELD")
+            if code not in self.rate_limiters or source.get("rate_limit"):
+                self.rate_limiters[code] = ARXRateLimiter(source.get("rate_limit"))
+
+    @staticmethod
+    def validate_sources(sources):
+        """
+        Check that the sources neither repeat a (ticker, datalink code) pair, which would overwrite each other's
+        results, nor write the same CSV file (named by ticker and maturity) concurrently.
+
+        Raises:
+        - ValueError: On the first repeated pair or CSV file.
+        """
+        keys = set()
+        files = {}
+        for source in sources:
+            key = f"{source['ticker']} ({source.get('nasdaq_datalink_code', 'USTREASURY/YIELD')})"
+            if key in keys:
+                raise ValueError(f"Source {key} is listed more than once.")
+            keys.add(key)
+
+            for maturity in source["maturities"]:
+                instrument = ARXApiDataAcquire.instrument_name(source["ticker"], maturity)
+                if instrument in files and files[instrument] != key:
+                    raise ValueError(f"Sources {files[instrument]} and {key} both write {instrument}_yield_data.csv.")
+                files[instrument] = key
+
+    def _acquirer(self, source):
+        code = source.get("nasdaq_datalink_code", "USTREASURY/YIELD")
+
+        # Every request of this source waits for its datalink code's rate limit
+        return ARXApiDataAcquire(source["ticker"], source.get("start_date", self.start_date),
+                                 source.get("end_date", self.end_date), source["maturities"],
+                                 config_directory=self.config_directory,
+                                 destination_directory=self.destination_directory, nasdaq_datalink_code=code,
+                                 response_cache=self.response_cache, fetcher=self.fetcher,
+                                 rate_limiter=self.rate_limiters[code])
+
+    def acquire(self, source):
+        """Fetch one source with retries and write its CSV files. Returns the number of attempts made."""
+        acquirer = self._acquirer(source)
+        delay = self.backoff
+        for attempt in range(1, self.retries + 2):
+            try:
+                data = acquirer.fetch_yield_data()
+            except Exception as e:
+                if attempt > self.retries:
+                    raise
+                print(f"Retrying {source['ticker']} ({acquirer.nasdaq_datalink_code}) in {delay:.1f}s: {e}")
+                time.sleep(delay * (1 + random.random() / 2))
+                delay *= 2
+                continue
+
+            # Write this source's files as soon as its response arrives
+            acquirer.save_to_csv(data)
+            return attempt
+
+    def run(self):
+        """
+        Acquire every source concurrently.
+
+        Returns:
+        - dict: Per source (keyed by ticker and datalink code), 'ok' with the attempts and seconds taken,
+                or 'error' with the final error message.
+        """
+        results = {}
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._timed_acquire, source): source for source in self.sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                key = f"{source['ticker']} ({source.get('nasdaq_datalink_code', 'USTREASURY/YIELD')})"
+                try:
+                    attempts, elapsed = future.result()
+                    results[key] = {"status": "ok", "attempts": attempts, "seconds": elapsed}
+                    print(f"Acquired {key} in {elapsed:.2f}s")
+                except Exception as e:
+                    results[key] = {"status": "error", "error": str(e)}
+                    print(f"Failed to acquire {key}: {e}")
+
+        print(f"Acquired {sum(r['status'] == 'ok' for r in results.values())} of {len(self.sources)} sources "
+              f"in {time.perf_counter() - start_time:.2f}s")
+        return results
+
+    def _timed_acquire(self, source):
+        start_time = time.perf_counter()
+        attempts = self.acquire(source)
+        return attempts, time.perf_counter() - start_time
@@ -0,0 +1,372 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXResultCache import ARXResultCache
+from ARXRiskActions import ARXRiskActions
+from ARXYieldDataCache import ARXYieldDataCache
+
+
+class ARXReadWriteLock:
+    """
+    Lets any number of readers in at once, or a single writer on its own.
+
+    Requests read the shared yield matrix concurrently; the background refresh takes it exclusively only for
+    the short moment it appends new dates (or swaps in a rebuilt matrix). A waiting writer goes first: new
+    readers wait behind it, so a steady stream of requests cannot starve the refresh. Reads must not be nested.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writing = False
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+
+    def release_write(self):
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+
+class ARXLatencyStats:
+    """
+    Keeps the latest request latencies of every endpoint and summarizes them as percentiles.
+
+    Attributes:
+        window (int): Latencies kept per endpoint.
+    """
+
+    def __init__(self, window=10000):
+        self.window = window
+        self._latencies = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self):
+        """Per endpoint: the request count and the p50, p95 and p99 latencies (milliseconds) of the window."""
+        with self._lock:
+            latencies = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for endpoint, values in latencies.items():
+            p50, p95, p99 = np.percentile(values * 1000, [50, 95, 99])
+            summary[endpoint] = {"count": counts[endpoint], "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                                 "max_ms": float(values.max() * 1000)}
+        return summary
+
+
+class ARXAnalyticsServer:
+    """
+    ARXAnalyticsServer is a local HTTP/JSON service that keeps the yield matrix warm in memory.
+
+    The yield data is loaded once (through ARXYieldDataCache) into an ARXPortfolioSimulation, and a background
+    task pulls the rows ingested since the last refresh: new dates are appended to the matrix incrementally,
+    while corrections to dates already held trigger a rebuild that is swapped in when ready. Requests are
+    handled by asyncio, and the analytics run on a thread pool (NumPy releases the GIL) while holding a read
+    lock on the matrix. Results are memoized in an ARXResultCache, keyed by the data version of the matrix, so
+    repeated requests are served without recomputing them until new yield data arrives.
+
+    Endpoints (JSON bodies; dates are optional and default to the whole dataset):
+        POST /var       {"portfolio": {...}, "start_date", "end_date", "methods", "percentiles", "paths", "seed"}
+        POST /simulate  {"portfolio": {...}, "start_date", "end_date"}
+        POST /dv01      {"start_date", "end_date"}
+        GET  /stats     Latency percentiles per endpoint, the result cache counters, and the dataset's dates and
+                        version.
+        GET  /health
+
+    Attributes:
+        yield_data_access (ARXYieldDataStore): The storage backend.
+        start_date (str): First date of the dataset.
+        end_date (str): Last date of the dataset (None for today; later dates are appended by the refresh).
+        host (str), port (int): Address to listen on (port 0 picks a free port).
+        workers (int): Threads running the analytics.
+        refresh_interval (float): Seconds between background refreshes (None to disable).
+        result_cache (ARXResultCache): Memoized results (by default in memory only).
+        data_version: Version of the yield data in the matrix (the watermark of the yield data cache).
+    """
+
+    def __init__(self, yield_data_access, start_date, end_date=None, host="127.0.0.1", port=8080, workers=4,
+                 refresh_interval=60, cache_directory=Path("cache") / "yield_data", result_cache=None):
+        self.yield_data_access = yield_data_access
+        self.cache = ARXYieldDataCache(yield_data_access, cache_directory=cache_directory)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.lock = ARXReadWriteLock()
+        self.latency = ARXLatencyStats()
+        self.result_cache = ARXResultCache() if result_cache is None else result_cache
+        self.simulation = None
+        self.data_version = None
+        self._server = None
+        self._refresh_task = None
+
+        self.routes = {
+            ("POST", "/var"): self.var,
+            ("POST", "/simulate"): self.simulate,
+            ("POST", "/dv01"): self.dv01,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/health"): self.health,
+        }
+
+    # Dataset
+
+    def _build(self):
+        end_date = self.end_date or pd.Timestamp.today().strftime("%Y-%m-%d")
+        compact = self.cache.execute_get_compact_yield_data_by_date_range(self.start_date, end_date)
+        simulation = ARXPortfolioSimulation(compact)
+        simulation.calculate_yield_changes()
+        return simulation
+
+    def load(self):
+        """Load (or rebuild) the dataset and swap it in."""
+        simulation = self._build()
+        data_version = self.cache.data_version
+        self.lock.acquire_write()
+        try:
+            self.simulation = simulation
+            self.data_version = data_version
+        finally:
+            self.lock.release_write()
+
+    def refresh_once(self):
+        """
+        Bring the dataset up to date with the rows ingested since the last refresh.
+
+        Returns:
+        - str: 'unchanged', 'appended' or 'rebuilt'.
+        """
+        updated = self.cache.refresh()
+        data_version = self.cache.data_version
+        if updated is None or updated.empty:
+            return "unchanged"
+
+        last_date = pd.Timestamp(self.simulation.dates[-1])
+        if self.end_date is None and (pd.to_datetime(updated["Date"]) > last_date).all():
+            self.lock.acquire_write()
+            try:
+                self.simulation.append(updated[["Date", "InstrumentName", "Yield"]])
+                self.simulation.calculate_yield_changes()
+                self.data_version = data_version
+                return "appended"
+            except ValueError:
+                # New instruments can't be appended as rows; rebuild below
+                pass
+            finally:
+                self.lock.release_write()
+
+        # Corrections to dates already held: rebuild off to the side and swap it in
+        self.load()
+        return "rebuilt"
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                result = await loop.run_in_executor(self.executor, self.refresh_once)
+                if result != "unchanged":
+                    print(f"Yield data refreshed ({result}).")
+            except Exception as e:
+                print(f"Could not refresh the yield data: {e}")
+
+    # Endpoints
+
+    def _read(self, function, *args):
+        self.lock.acquire_read()
+        try:
+            return function(*args)
+        finally:
+            self.lock.release_read()
+
+    def var(self, body):
+        def run():
+            return ARXRiskActions.var(self.simulation, body["portfolio"], body.get("start_date"),
+                                      body.get("end_date"),
+                                      percentiles=body.get("percentiles", ARXRiskActions.PERCENTILES),
+                                      methods=body.get("methods", ARXRiskActions.VAR_METHODS),
+                                      paths=body.get("paths", 100_000), workers=1, seed=body.get("seed"),
+                                      result_cache=self.result_cache, data_version=self.data_version)
+        return self._read(run)
+
+    def simulate(self, body):
+        def run():
+            series = ARXRiskActions.simulate(self.simulation, body["portfolio"], body.get("start_date"),
+                                             body.get("end_date"), result_cache=self.result_cache,
+                                             data_version=self.data_version)
+            return {"dates": pd.to_datetime(series.index).strftime("%Y-%m-%d").tolist(),
+                    "portfolio_delta_yield": series.tolist()}
+        return self._read(run)
+
+    def dv01(self, body):
+        def compute():
+            # Only the first day of each month is reported, so only those rows are turned back into long format
+            wide = self.simulation.data
+            wide = wide[pd.to_datetime(wide.index).day == 1]
+            long = wide.rename_axis(index="Date", columns="InstrumentName").stack().dropna().rename("Yield")
+            pivot = ARXRiskActions.dv01(long.reset_index(), body.get("start_date"), body.get("end_date"))
+            return json.loads(pivot.to_json(orient="index", date_format="iso"))
+
+        def run():
+            return ARXRiskActions.cached(self.result_cache, "dv01", compute, self.data_version,
+                                         start_date=ARXRiskActions.normalize_date(body.get("start_date")),
+                                         end_date=ARXRiskActions.normalize_date(body.get("end_date")))
+
+        return self._read(run)
+
+    def stats(self, body):
+        def run():
+            dates = self.simulation.dates
+            return {"first_date": str(dates[0]) if len(dates) else None,
+                    "last_date": str(dates[-1]) if len(dates) else None,
+                    "dates": len(dates), "instruments": list(self.simulation.instruments),
+                    "data_version": self.data_version}
+        return {"latency": self.latency.summary(), "result_cache": self.result_cache.stats,
+                "dataset": self._read(run)}
+
+    def health(self, body):
+        return {"status": "ok"}
+
+    # HTTP
+
+    async def handle(self, reader, writer):
+        start_time = time.perf_counter()
+        endpoint = None
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0].upper(), request_line[1].split("?")[0]
+
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1")
+                if line in ("\r\n", "\n", ""):
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            handler = self.routes.get((method, path))
+            if handler is None:
+                status, result = HTTPStatus.NOT_FOUND, {"error": f"No endpoint {method} {path}"}
+            else:
+                endpoint = f"{method} {path}"
+                try:
+                    payload = json.loads(body) if body else {}
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(self.executor, handler, payload)
+                    status = HTTPStatus.OK
+                except (ValueError, KeyError, TypeError) as e:
+                    status, result = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+                except Exception as e:
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+            content = json.dumps(result, default=str).encode()
+            writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode() + content)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            if endpoint is not None:
+                self.latency.record(endpoint, time.perf_counter() - start_time)
+
+    async def start(self):
+        """Load the dataset, start listening and start the background refresh. Returns the bound port."""
+        loop = asyncio.get_running_loop()
+        if self.simulation is None:
+            await loop.run_in_executor(self.executor, self.load)
+
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.refresh_interval:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return self.port
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"ARX analytics server listening on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+if __name__ == "__main__":
+    import click
+
+    from ARXYieldDataStore import ARXYieldDataStore
+
+    @click.command()
+    @click.option("--host", default="127.0.0.1", help="Address to listen on.")
+    @click.option("--port", default=8080, help="Port to listen on.")
+    @click.option("--start", "start_date", default="2021-01-01", help="First date of the dataset.")
+    @click.option("--end", "end_date", default=None, help="Last date of the dataset (default: today).")
+    @click.option("--workers", default=4, help="Threads running the analytics.")
+    @click.option("--refresh-interval", default=60.0, help="Seconds between background refreshes.")
+    @click.option("--config-dir", default="config", help="Directory of config.json.")
+    @click.option("--result-cache-dir", default=str(Path("cache") / "results"),
+                  help="Directory of the memoized results (kept across restarts).")
+    def serve(host, port, start_date, end_date, workers, refresh_interval, config_dir, result_cache_dir):
+        """Serve VaR, DV01 and simulation requests over a warm in-memory dataset."""
+        yield_data_access = ARXYieldDataStore.create(data_directory=Path("sources"),
+                                                     config_directory=Path(config_dir), sql_directory=Path("SQL"))
+        success, result = yield_data_access.verify_db_config()
+        if not success:
+            raise click.ClickException(result)
+
+        server = ARXAnalyticsServer(yield_data_access, start_date, end_date, host=host, port=port, workers=workers,
+                                    refresh_interval=refresh_interval,
+                                    result_cache=ARXResultCache(cache_directory=result_cache_dir))
+        asyncio.run(server.serve_forever())
+
+    serve()
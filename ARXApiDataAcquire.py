@@ -1,5 +1,6 @@
 import json
-import quandl
+import os
+import pandas as pd
 from pathlib import Path
 
 
@@ -11,6 +12,8 @@ class ARXApiDataAcquire:
     - Configuration loading from a JSON file to obtain Quandl API key.
     - Data fetching from the Quandl based on specific tickers, date ranges, and maturities.
     - Data persistence by saving the retrieved information into CSV files.
+    - Optional on-disk response cache (ARXApiResponseCache): only the date gaps not already held locally are
+      requested, and existing CSV files are appended to rather than rewritten.
 
     Attributes:
         ticker (str): Instrument ticker name.
@@ -20,6 +23,10 @@ class ARXApiDataAcquire:
         config_directory (pathlib.Path): Directory where config.json is located.
         destination_directory (pathlib.Path): Directory where CSV files will be saved.
         nasdaq_datalink_code (str): Default Quandl datalink code.
+        response_cache (ARXApiResponseCache): Optional cache of API responses.
+        fetcher (callable): Fetches a (datalink_code, start_date, end_date) range as a DataFrame indexed by date.
+                            Defaults to Quandl; a local stand-in can be supplied, e.g. for tests.
+        rate_limiter (ARXRateLimiter): Optional limiter waited on before every request.
 
     Methods:
         load_config(): Load the API key from a config.json file.
@@ -28,7 +35,8 @@ class ARXApiDataAcquire:
     """
 
     def __init__(self, ticker, start_date, end_date, maturities, config_directory=Path.cwd(),
-                 destination_directory=Path.cwd(), nasdaq_datalink_code="USTREASURY/YIELD"):
+                 destination_directory=Path.cwd(), nasdaq_datalink_code="USTREASURY/YIELD", response_cache=None,
+                 fetcher=None, rate_limiter=None):
         self.ticker = ticker.replace(" ", "_")
         self.start_date = start_date
         self.nasdaq_datalink_code = nasdaq_datalink_code
@@ -37,7 +45,15 @@ class ARXApiDataAcquire:
         self.config_directory = Path(config_directory)
         self.destination_directory = Path(destination_directory)
         self.destination_directory.mkdir(parents=True, exist_ok=True)
-        self.api_key = self.load_config()
+        self.response_cache = response_cache
+        self.fetcher = fetcher
+        self.rate_limiter = rate_limiter
+        self.api_key = self.load_config() if fetcher is None else None
+
+    @staticmethod
+    def instrument_name(ticker, maturity):
+        """The instrument name of a ticker's maturity, which also names its CSV file (e.g. US_TREASURY_3_MO)."""
+        return f"{ticker.replace(' ', '_')}_{maturity.replace(' ', '_')}"
 
     def load_config(self):
         try:
@@ -49,33 +65,80 @@ class ARXApiDataAcquire:
             print("Configuration file not found.")
             return None
 
+    def fetch(self, datalink_code, start_date, end_date):
+        """Request a date range from the API (or the configured fetcher)."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+
+        if self.fetcher is not None:
+            return self.fetcher(datalink_code, start_date, end_date)
+
+        # Imported here: quandl is slow to import and only needed when actually calling the API
+        import quandl
+
+        quandl.ApiConfig.api_key = self.api_key
+        return quandl.get(datalink_code, start_date=start_date, end_date=end_date)
+
+    def fetch_yield_data(self):
+        """Fetch the maturities for the date range, raising on failure."""
+        if self.fetcher is None and not self.api_key:
+            raise ValueError("API key not loaded. Can't fetch data.")
+
+        if self.response_cache is not None:
+            data = self.response_cache.get(self.nasdaq_datalink_code, self.start_date, self.end_date, self.fetch)
+        else:
+            data = self.fetch(self.nasdaq_datalink_code, self.start_date, self.end_date)
+        if data is None:
+            raise ValueError(f"No data returned for {self.nasdaq_datalink_code}.")
+        return data[self.maturities]
+
     def get_yield_data(self):
-        if not self.api_key:
+        if self.fetcher is None and not self.api_key:
             print("API key not loaded. Can't fetch data.")
             return None
 
         try:
-            quandl.ApiConfig.api_key = self.api_key
-            data = quandl.get(self.nasdaq_datalink_code, start_date=self.start_date, end_date=self.end_date)
-            return data[self.maturities]
+            return self.fetch_yield_data()
         except Exception as e:
             print(f"An error occurred while fetching data from Quandl: {e}")
             return None
 
-    def save_to_csv(self):
-        data = self.get_yield_data()
+    def save_to_csv(self, data=None):
+        if data is None:
+            data = self.get_yield_data()
         if data is not None:
             for maturity in self.maturities:
-                safe_maturity = maturity.replace(" ", "_")
-                filename = self.destination_directory / f"{self.ticker}_{safe_maturity}_yield_data.csv"
+                instrument = self.instrument_name(self.ticker, maturity)
+                filename = self.destination_directory / f"{instrument}_yield_data.csv"
                 # By default, the dates are set as the index of the DataFrame when data is fetched from Quandl.
                 # By resetting the index, the dates are transformed from being the index to being a regular column in
                 # the DataFrame. This is helpful for saving the data to CSV where we want dates as a column.
                 subset = data[[maturity]].reset_index()
                 subset.columns = ['Date', 'Yield']
-                subset.insert(0, 'InstrumentName', f"{self.ticker}_{safe_maturity}")
-                subset.to_csv(filename, index=False)
-                print(f"Saved data for {maturity} to {filename}")
+                subset.insert(0, 'InstrumentName', instrument)
+
+                if filename.exists():
+                    saved_dates = pd.to_datetime(pd.read_csv(filename, usecols=['Date'])['Date'])
+                    dates = pd.to_datetime(subset['Date'])
+                    subset = subset[~dates.isin(saved_dates)]
+                    backfill = subset[pd.to_datetime(subset['Date']) < saved_dates.max()] \
+                        if not saved_dates.empty else subset.iloc[:0]
+                    if backfill.empty:
+                        # Only later dates: append them instead of rewriting the file
+                        subset.to_csv(filename, mode='a', header=False, index=False)
+                        print(f"Appended {len(subset)} rows for {maturity} to {filename}")
+                    else:
+                        # Earlier dates the file does not hold: merge them in by date and swap the file in
+                        merged = pd.concat([pd.read_csv(filename, parse_dates=['Date']), subset], ignore_index=True)
+                        merged = merged.sort_values('Date', kind='stable')
+                        temporary = filename.with_name(filename.name + ".tmp")
+                        merged.to_csv(temporary, index=False)
+                        os.replace(temporary, filename)
+                        print(f"Merged {len(subset)} rows for {maturity} into {filename} "
+                              f"({len(backfill)} before its last date)")
+                else:
+                    subset.to_csv(filename, index=False)
+                    print(f"Saved data for {maturity} to {filename}")
 
 
 # Usage
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from ARXDateRanges import ARXDateRanges
+
+
+class ARXApiResponseCache:
+    """
+    The ARXApiResponseCache keeps API responses on disk, keyed by datalink code and date.
+
+    Each datalink code gets its own directory holding the response rows (one row per date) in a CSV file and
+    a JSON file listing the date ranges already fetched together with the time they were fetched. A fetched
+    range stays valid for `ttl` seconds; after that it is considered a gap again and re-requested. Only the
+    gaps of a requested range are passed to the fetch function.
+
+    Attributes:
+        cache_directory (Path): Directory holding one subdirectory per datalink code.
+        ttl (float): Seconds a fetched range stays valid (None for no expiry).
+    """
+    DATA_FILE = "responses.csv"
+    META_FILE = "meta.json"
+
+    def __init__(self, cache_directory=Path("cache") / "api", ttl=24 * 60 * 60):
+        self.cache_directory = Path(cache_directory)
+        self.ttl = ttl
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _directory(self, datalink_code):
+        # Datalink codes look like 'USTREASURY/YIELD'; keep them readable but filesystem safe
+        return self.cache_directory / re.sub(r'[^A-Za-z0-9_.-]', '_', datalink_code)
+
+    def _load_meta(self, directory):
+        try:
+            with open(directory / self.META_FILE, 'r') as meta_file:
+                return json.load(meta_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"ranges": []}
+
+    def _load_data(self, directory):
+        try:
+            return pd.read_csv(directory / self.DATA_FILE, index_col=0, parse_dates=True)
+        except FileNotFoundError:
+            return None
+
+    def _lock(self, datalink_code):
+        # One lock per datalink code, so concurrent acquisitions of the same code don't interleave their files
+        with self._locks_guard:
+            return self._locks.setdefault(datalink_code, threading.Lock())
+
+    def _fresh_ranges(self, meta):
+        now = time.time()
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end, fetched_at in meta["ranges"]
+                if self.ttl is None or now - fetched_at <= self.ttl]
+
+    def missing(self, datalink_code, start_date, end_date):
+        """Return the parts of the date range that are not held, or no longer fresh, in the cache."""
+        meta = self._load_meta(self._directory(datalink_code))
+        return ARXDateRanges.missing(self._fresh_ranges(meta), start_date, end_date)
+
+    def get(self, datalink_code, start_date, end_date, fetch):
+        """
+        Return the responses for a date range, calling `fetch(datalink_code, start, end)` only for the gaps.
+
+        Parameters:
+        - datalink_code (str): The datalink code (e.g., 'USTREASURY/YIELD').
+        - start_date, end_date: The requested date range (inclusive).
+        - fetch (callable): Returns a DataFrame indexed by date for a (datalink_code, start, end) request.
+
+        Returns:
+        - pd.DataFrame: The cached responses within the range, indexed by date.
+        """
+        with self._lock(datalink_code):
+            return self._get(datalink_code, start_date, end_date, fetch)
+
+    def _get(self, datalink_code, start_date, end_date, fetch):
+        start, end = ARXDateRanges.normalize(start_date, end_date)
+        directory = self._directory(datalink_code)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        meta = self._load_meta(directory)
+        data = self._load_data(directory)
+
+        gaps = ARXDateRanges.missing(self._fresh_ranges(meta), start, end)
+        if gaps:
+            for gap_start, gap_end in gaps:
+                response = fetch(datalink_code, gap_start.strftime("%Y-%m-%d"), gap_end.strftime("%Y-%m-%d"))
+                if response is None:
+                    # The fetcher reports its own errors; leave the gap to be fetched next time
+                    continue
+
+                response = response.copy()
+                response.index = pd.to_datetime(response.index)
+
+                # Fresh responses replace whatever was cached for the same dates
+                if data is not None:
+                    data = data[(data.index < gap_start) | (data.index > gap_end)]
+                    data = pd.concat([data, response]).sort_index()
+                else:
+                    data = response.sort_index()
+
+                meta["ranges"].append([gap_start.strftime("%Y-%m-%d"), gap_end.strftime("%Y-%m-%d"), time.time()])
+
+            self._save(directory, data, meta)
+
+        if data is None:
+            return None
+        return data[(data.index >= start) & (data.index <= end)]
+
+    def _save(self, directory, data, meta):
+        # Drop expired ranges before merging, so a refetched range is stamped with its new fetch time only;
+        # then swap the files in atomically
+        now = time.time()
+        entries = [(range_start, range_end, timestamp) for range_start, range_end, timestamp in meta["ranges"]
+                   if self.ttl is None or now - timestamp <= self.ttl]
+        fresh = ARXDateRanges.merge([(pd.Timestamp(start), pd.Timestamp(end)) for start, end, _ in entries])
+        fetched_at = {}
+        for range_start, range_end, timestamp in entries:
+            for start, end in fresh:
+                if start <= pd.Timestamp(range_start) and pd.Timestamp(range_end) <= end:
+                    fetched_at[(start, end)] = min(fetched_at.get((start, end), timestamp), timestamp)
+        meta = {"ranges": [[start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), fetched_at[(start, end)]]
+                           for start, end in fresh]}
+
+        if data is not None:
+            temporary = directory / (self.DATA_FILE + ".tmp")
+            data.to_csv(temporary, index_label="Date")
+            os.replace(temporary, directory / self.DATA_FILE)
+
+        temporary = directory / (self.META_FILE + ".tmp")
+        with open(temporary, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temporary, directory / self.META_FILE)
+
+    def invalidate(self, datalink_code):
+        """Forget every fetched range of a datalink code."""
+        directory = self._directory(datalink_code)
+        for file_name in (self.DATA_FILE, self.META_FILE):
+            (directory / file_name).unlink(missing_ok=True)
@@ -0,0 +1,323 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import click
+
+from ARXResultCache import ARXResultCache
+
+
+class ARXBatchRunner:
+    """
+    The ARXBatchRunner runs the CLI actions without the interactive menu, e.g. from a scheduler.
+
+    Each action is run with explicit dates, portfolio and output path. A job file lists many runs; they are
+    executed concurrently on a thread pool over one in-memory dataset, loaded once for the union of their date
+    ranges, and their results are written as JSON.
+
+    A job file looks like:
+        {"jobs": [
+            {"name": "var-2022", "action": "var", "start_date": "2022-01-01", "end_date": "2022-12-31",
+             "portfolio": "config/portfolio.json", "methods": ["historical", "parametric"]},
+            {"name": "dv01", "action": "dv01", "start_date": "2021-01-01", "end_date": "2023-01-01",
+             "output": "out/dv01.csv"}
+        ]}
+    'portfolio' is a path to a portfolio JSON file or the weights themselves. Actions: 'var', 'simulate',
+    'dv01', 'import' and 'save'.
+
+    The results of 'var', 'simulate' and 'dv01' are memoized on disk (see ARXResultCache) by their inputs and the
+    version of the yield data, so scheduled runs repeating a job reuse its result until new data is ingested.
+
+    Attributes:
+        config_directory (Path): Directory holding config.json.
+        data_directory (Path): Directory of the source CSV files.
+        sql_directory (Path): Directory of the SQL files.
+        cache_directory (Path): Directory of the yield data cache.
+        result_cache (ARXResultCache): The memoized results (None to always compute).
+    """
+    DATA_ACTIONS = ("var", "simulate", "dv01")
+
+    def __init__(self, config_directory=Path("config"), data_directory=Path("sources"), sql_directory=Path("SQL"),
+                 cache_directory=Path("cache") / "yield_data", result_cache_directory=Path("cache") / "results"):
+        self.config_directory = Path(config_directory)
+        self.data_directory = Path(data_directory)
+        self.sql_directory = Path(sql_directory)
+        self.cache_directory = Path(cache_directory)
+        self.result_cache = None if result_cache_directory is None else ARXResultCache(result_cache_directory)
+        self._yield_data_access = None
+        self._lock = threading.Lock()
+        self.dataset = None
+        self.simulation = None
+        self.data_version = None
+
+    @property
+    def yield_data_access(self):
+        if self._yield_data_access is None:
+            from ARXYieldDataStore import ARXYieldDataStore
+
+            self._yield_data_access = ARXYieldDataStore.create(data_directory=self.data_directory,
+                                                               config_directory=self.config_directory,
+                                                               sql_directory=self.sql_directory)
+            success, result = self._yield_data_access.verify_db_config()
+            if not success:
+                raise click.ClickException(result)
+        return self._yield_data_access
+
+    def load_dataset(self, start_date, end_date):
+        """Load the yield data of a date range once; every job reads from it."""
+        from ARXPortfolioSimulation import ARXPortfolioSimulation
+        from ARXYieldDataCache import ARXYieldDataCache
+
+        cache = ARXYieldDataCache(self.yield_data_access, cache_directory=self.cache_directory)
+        self.dataset = cache.execute_get_compact_yield_data_by_date_range(start_date, end_date)
+        self.data_version = cache.data_version
+        self.simulation = ARXPortfolioSimulation(self.dataset)
+
+        # Compute the shared change matrix up front rather than in whichever job gets there first
+        self.simulation.calculate_yield_changes()
+
+    @staticmethod
+    def load_portfolio(portfolio):
+        if isinstance(portfolio, dict):
+            return portfolio
+        with open(portfolio, 'r') as file:
+            return json.load(file)
+
+    def run_job(self, job):
+        """
+        Run one job and return its machine-readable result.
+
+        Returns:
+        - dict: The job's name and action, 'ok' or 'error' status, the seconds taken and the result (or error).
+        """
+        from ARXRiskActions import ARXRiskActions
+
+        start_time = time.perf_counter()
+        action = job["action"]
+        outcome = {"name": job.get("name", action), "action": action}
+        try:
+            start_date, end_date = job.get("start_date"), job.get("end_date")
+            output = job.get("output")
+
+            if action == "var":
+                result = ARXRiskActions.var(self.simulation, self.load_portfolio(job["portfolio"]), start_date,
+                                            end_date, percentiles=job.get("percentiles", ARXRiskActions.PERCENTILES),
+                                            methods=job.get("methods", ARXRiskActions.VAR_METHODS),
+                                            paths=job.get("paths", 1_000_000), workers=job.get("workers", 1),
+                                            seed=job.get("seed"), result_cache=self.result_cache,
+                                            data_version=self.data_version)
+                if output:
+                    self._write_json(result, output)
+            elif action == "simulate":
+                series = ARXRiskActions.simulate(self.simulation, self.load_portfolio(job["portfolio"]), start_date,
+                                                 end_date, result_cache=self.result_cache,
+                                                 data_version=self.data_version)
+                result = {"dates": len(series), "mean": float(series.mean()), "std": float(series.std())}
+                if output:
+                    self._write_csv(series, output)
+            elif action == "dv01":
+                def compute():
+                    return ARXRiskActions.dv01(self.dataset.to_frame(), start_date, end_date)
+
+                pivot = ARXRiskActions.cached(self.result_cache, "dv01", compute, self.data_version,
+                                              start_date=ARXRiskActions.normalize_date(start_date),
+                                              end_date=ARXRiskActions.normalize_date(end_date))
+                result = {"dates": len(pivot), "instruments": list(pivot.columns)}
+                if output:
+                    self._write_csv(pivot, output)
+                else:
+                    result["dv01"] = json.loads(pivot.to_json(orient="index", date_format="iso"))
+            elif action == "import":
+                result = self.import_data(start_date, end_date)
+            elif action == "save":
+                total_rows, failures = self.yield_data_access.execute_parallel_insert()
+                result = {"rows": total_rows, "failures": failures}
+            else:
+                raise ValueError(f"Unknown action: {action}")
+
+            outcome.update(status="ok", result=result)
+            if output:
+                outcome["output"] = str(output)
+        except Exception as e:
+            outcome.update(status="error", error=str(e))
+        outcome["seconds"] = time.perf_counter() - start_time
+        return outcome
+
+    def import_data(self, start_date, end_date):
+        from ARXAcquisitionRunner import ARXAcquisitionRunner
+        from ARXApiResponseCache import ARXApiResponseCache
+
+        maturities = ["3 MO", "1 YR", "5 YR", "10 YR", "30 YR"]
+        runner = ARXAcquisitionRunner([{"ticker": "US TREASURY", "maturities": maturities}], start_date, end_date,
+                                      config_directory=self.config_directory,
+                                      destination_directory=self.data_directory, response_cache=ARXApiResponseCache())
+        return runner.run()
+
+    def run_jobs(self, jobs, workers=4):
+        """
+        Run many jobs concurrently over one shared dataset.
+
+        Returns:
+        - list: The result of every job, in the order of the jobs.
+        """
+        from ARXRiskActions import ARXRiskActions
+
+        data_jobs = [job for job in jobs if job["action"] in self.DATA_ACTIONS]
+        if data_jobs:
+            starts = [job.get("start_date") for job in data_jobs]
+            ends = [job.get("end_date") for job in data_jobs]
+            if None in starts or None in ends:
+                raise click.ClickException("Every var, simulate and dv01 job needs a start_date and an end_date.")
+            try:
+                # Normalized, so '2021-1-1' and '2021-01-01' compare as the same date
+                start_date = min(ARXRiskActions.normalize_date(start) for start in starts)
+                end_date = max(ARXRiskActions.normalize_date(end) for end in ends)
+            except ValueError as e:
+                raise click.ClickException(f"Invalid job date: {e}")
+
+        # Imports and database loads change the data the other jobs read, so they run first, one at a time
+        results = {}
+        for index, job in enumerate(jobs):
+            if job["action"] not in self.DATA_ACTIONS:
+                results[index] = self.run_job(job)
+
+        # The dataset (and its data version) is loaded only once the imports and loads are done
+        if data_jobs:
+            self.load_dataset(start_date, end_date)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {index: executor.submit(self.run_job, job) for index, job in enumerate(jobs)
+                       if job["action"] in self.DATA_ACTIONS}
+            for index, future in futures.items():
+                results[index] = future.result()
+
+        return [results[index] for index in range(len(jobs))]
+
+    @staticmethod
+    def _prepare(output):
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        return output
+
+    @staticmethod
+    def _write_json(result, output):
+        with open(ARXBatchRunner._prepare(output), 'w') as file:
+            json.dump(result, file, indent=2, default=str)
+
+    @staticmethod
+    def _write_csv(frame, output):
+        frame.to_csv(ARXBatchRunner._prepare(output))
+
+
+def _emit(result, output):
+    if output:
+        ARXBatchRunner._write_json(result, output)
+    else:
+        click.echo(json.dumps(result, indent=2, default=str))
+
+
+@click.group()
+@click.option("--config-dir", default="config", type=click.Path(file_okay=False), help="Directory of config.json.")
+@click.option("--data-dir", default="sources", type=click.Path(file_okay=False), help="Directory of the CSV files.")
+@click.option("--sql-dir", default="SQL", type=click.Path(file_okay=False), help="Directory of the SQL files.")
+@click.option("--cache-dir", default=str(Path("cache") / "yield_data"), type=click.Path(file_okay=False),
+              help="Directory of the yield data cache.")
+@click.option("--result-cache-dir", default=str(Path("cache") / "results"), type=click.Path(file_okay=False),
+              help="Directory of the memoized results.")
+@click.option("--no-result-cache", is_flag=True, help="Always compute the results.")
+@click.pass_context
+def cli(ctx, config_dir, data_dir, sql_dir, cache_dir, result_cache_dir, no_result_cache):
+    """Run the ARX yield data analysis actions without the interactive menu."""
+    ctx.obj = ARXBatchRunner(config_dir, data_dir, sql_dir, cache_dir,
+                             None if no_result_cache else result_cache_dir)
+
+
+def _run_single(runner, job, output):
+    outcome = runner.run_jobs([job], workers=1)[0]
+    _emit(outcome, output if job["action"] in ("var", "import", "save") else None)
+    if outcome["status"] != "ok":
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option("--start", "start_date", required=True, help="Start date (YYYY-MM-DD).")
+@click.option("--end", "end_date", required=True, help="End date (YYYY-MM-DD).")
+@click.option("--portfolio", default=str(Path("config") / "portfolio.json"), type=click.Path(exists=True),
+              help="Portfolio JSON file.")
+@click.option("--method", "methods", multiple=True, type=click.Choice(["historical", "parametric", "monte_carlo"]),
+              help="VaR method (repeatable, default all).")
+@click.option("--paths", default=1_000_000, help="Monte Carlo paths.")
+@click.option("--seed", default=None, type=int, help="Monte Carlo seed.")
+@click.option("--output", type=click.Path(dir_okay=False), help="JSON output file (default: print).")
+@click.pass_obj
+def var(runner, start_date, end_date, portfolio, methods, paths, seed, output):
+    """VaR and Expected Shortfall of a portfolio."""
+    job = {"action": "var", "start_date": start_date, "end_date": end_date, "portfolio": portfolio,
+           "paths": paths, "seed": seed, "workers": None}
+    if methods:
+        job["methods"] = list(methods)
+    _run_single(runner, job, output)
+
+
+@cli.command()
+@click.option("--start", "start_date", required=True, help="Start date (YYYY-MM-DD).")
+@click.option("--end", "end_date", required=True, help="End date (YYYY-MM-DD).")
+@click.option("--portfolio", default=str(Path("config") / "portfolio.json"), type=click.Path(exists=True),
+              help="Portfolio JSON file.")
+@click.option("--output", required=True, type=click.Path(dir_okay=False), help="CSV output file.")
+@click.pass_obj
+def simulate(runner, start_date, end_date, portfolio, output):
+    """Daily yield change of a portfolio."""
+    _run_single(runner, {"action": "simulate", "start_date": start_date, "end_date": end_date,
+                         "portfolio": portfolio, "output": output}, None)
+
+
+@cli.command()
+@click.option("--start", "start_date", required=True, help="Start date (YYYY-MM-DD).")
+@click.option("--end", "end_date", required=True, help="End date (YYYY-MM-DD).")
+@click.option("--output", required=True, type=click.Path(dir_okay=False), help="CSV output file.")
+@click.pass_obj
+def dv01(runner, start_date, end_date, output):
+    """DV01 per US Treasury instrument on the first day of each month."""
+    _run_single(runner, {"action": "dv01", "start_date": start_date, "end_date": end_date, "output": output}, None)
+
+
+@cli.command("import")
+@click.option("--start", "start_date", required=True, help="Start date (YYYY-MM-DD).")
+@click.option("--end", "end_date", required=True, help="End date (YYYY-MM-DD).")
+@click.option("--output", type=click.Path(dir_okay=False), help="JSON output file (default: print).")
+@click.pass_obj
+def import_data(runner, start_date, end_date, output):
+    """Import treasury yield data from the API into the source CSV files."""
+    _run_single(runner, {"action": "import", "start_date": start_date, "end_date": end_date}, output)
+
+
+@cli.command()
+@click.option("--output", type=click.Path(dir_okay=False), help="JSON output file (default: print).")
+@click.pass_obj
+def save(runner, output):
+    """Load the source CSV files into the database."""
+    _run_single(runner, {"action": "save"}, output)
+
+
+@cli.command()
+@click.argument("job_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", default=4, help="Jobs run at the same time.")
+@click.option("--output", type=click.Path(dir_okay=False), help="JSON results file (default: print).")
+@click.pass_obj
+def jobs(runner, job_file, workers, output):
+    """Run every job of a job file concurrently over one shared dataset."""
+    with open(job_file, 'r') as file:
+        job_list = json.load(file)["jobs"]
+
+    start_time = time.perf_counter()
+    results = runner.run_jobs(job_list, workers=workers)
+    _emit({"seconds": time.perf_counter() - start_time, "jobs": results}, output)
+    if any(result["status"] != "ok" for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    cli()
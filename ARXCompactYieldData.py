@@ -0,0 +1,161 @@
+import tracemalloc
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+class ARXCompactYieldData:
+    """
+    ARXCompactYieldData holds long-format yield data as three compact arrays instead of a DataFrame.
+
+    - Instruments are dictionary-encoded: each row stores a small integer code into `instruments`.
+    - Dates are stored as integer day offsets from `epoch`.
+    - Yields are float64, or float32 to halve them again when that precision is enough.
+    The `Id` and `DateUpdated` columns are not kept, as the analytics never read them.
+
+    A row therefore takes 14 bytes (10 with float32) instead of the GUID string, instrument name object,
+    timestamps and float of a DataFrame row, and the wide (date x instrument) matrix used by the portfolio
+    simulation is built straight from the arrays without an intermediate long DataFrame.
+
+    Attributes:
+        instruments (list): Instrument names, indexed by code.
+        codes (np.ndarray): Instrument code per row (int16).
+        days (np.ndarray): Days since `epoch` per row (int32).
+        yields (np.ndarray): Yield per row (float64 or float32).
+        epoch (np.datetime64): Day the offsets count from.
+    """
+    EPOCH = np.datetime64('1970-01-01', 'D')
+
+    def __init__(self, instruments, codes, days, yields, epoch=EPOCH):
+        self.instruments = list(instruments)
+        self.codes = np.asarray(codes, dtype=np.int16)
+        self.days = np.asarray(days, dtype=np.int32)
+        self.yields = np.asarray(yields)
+        if self.yields.dtype not in (np.float32, np.float64):
+            self.yields = self.yields.astype(np.float64)
+        self.epoch = np.datetime64(epoch, 'D')
+
+    @classmethod
+    def from_columns(cls, instruments, codes, dates, yields, float32=False) -> 'ARXCompactYieldData':
+        """
+        Build from already encoded columns (e.g. the memory-mapped columns of ARXYieldDataCache).
+
+        Parameters:
+        - instruments (list): Instrument names, indexed by code.
+        - codes (array): Instrument code per row.
+        - dates (array): Date per row (datetime64).
+        - yields (array): Yield per row.
+        - float32 (bool): Store the yields as float32.
+        """
+        days = (np.asarray(dates).astype('datetime64[D]') - cls.EPOCH).astype(np.int32)
+        return cls(instruments, codes, days, np.asarray(yields, dtype=np.float32 if float32 else np.float64))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, float32=False) -> 'ARXCompactYieldData':
+        """
+        Build from a long-format DataFrame with 'InstrumentName', 'Date' and 'Yield' columns; other columns
+        are dropped.
+        """
+        codes, instruments = pd.factorize(df['InstrumentName'].astype(str))
+        return cls.from_columns(instruments, codes, pd.to_datetime(df['Date']).to_numpy(), df['Yield'].to_numpy(),
+                                float32=float32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the row arrays."""
+        return self.codes.nbytes + self.days.nbytes + self.yields.nbytes
+
+    def dates(self) -> np.ndarray:
+        """Date per row (datetime64[D])."""
+        return self.epoch + self.days.astype('timedelta64[D]')
+
+    def to_frame(self) -> pd.DataFrame:
+        """The long-format DataFrame ('InstrumentName', 'Date', 'Yield')."""
+        return pd.DataFrame({
+            'InstrumentName': pd.Categorical.from_codes(self.codes, categories=self.instruments),
+            'Date': self.dates().astype('datetime64[ns]'),
+            'Yield': self.yields,
+        })
+
+    def to_wide(self) -> pd.DataFrame:
+        """
+        Pivot into one row per date and one column per instrument (sorted by name, as DataFrame.pivot does).
+        When an instrument has several rows for a date, the first one is kept, as in
+        ARXPortfolioSimulation.transform_data.
+        """
+        days, rows = np.unique(self.days, return_inverse=True)
+
+        # Column of each instrument code once the columns are sorted by name
+        order = np.argsort(np.asarray(self.instruments, dtype=object))
+        columns = np.empty(len(order), dtype=np.int64)
+        columns[order] = np.arange(len(order))
+
+        matrix = np.full((len(days), len(self.instruments)), np.nan, dtype=self.yields.dtype)
+        # Scatter in reverse so that the first of any duplicate rows is written last and wins
+        matrix[rows[::-1], columns[self.codes[::-1]]] = self.yields[::-1]
+
+        index = pd.DatetimeIndex((self.epoch + days.astype('timedelta64[D]')).astype('datetime64[ns]'), name='Date')
+        names = pd.Index(np.asarray(self.instruments, dtype=object)[order], name='InstrumentName')
+        return pd.DataFrame(matrix, index=index, columns=names, copy=False)
+
+
+def _benchmark_columns(instruments=60, days=5000, seed=0):
+    """Columns shaped like those ARXYieldDataCache stores: codes, dates, yields, update times and GUID ids."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2000-01-03', periods=days).to_numpy().astype('datetime64[D]')
+    rows = instruments * days
+    return {
+        'instruments': [f"US_TREASURY_{i}_YR" for i in range(instruments)],
+        'InstrumentCode': np.repeat(np.arange(instruments, dtype=np.int32), days),
+        'Date': np.tile(dates, instruments),
+        'Yield': rng.normal(2, 1, rows),
+        'DateUpdated': np.full(rows, np.datetime64('2024-01-01T00:00:00', 'ns')),
+        'Id': np.array([str(uuid.UUID(int=int(value))) for value in rng.integers(0, 2 ** 63, rows)]),
+    }
+
+
+def _peak(function, *args):
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+# Benchmark: peak memory of loading a simulation through the long DataFrame and through the compact arrays
+if __name__ == "__main__":
+    # Use the classes of the importable modules, which are the ones ARXPortfolioSimulation recognises
+    from ARXCompactYieldData import ARXCompactYieldData
+    from ARXPortfolioSimulation import ARXPortfolioSimulation
+    from ARXYieldDataCache import ARXYieldDataCache
+
+    columns = _benchmark_columns()
+    print(f"Benchmark dataset: {len(columns['Yield']):,} rows, {len(columns['instruments'])} instruments")
+
+    def through_frame(columns):
+        df = ARXYieldDataCache._frame(columns['InstrumentCode'], columns['Date'], columns['Yield'],
+                                      columns['DateUpdated'], columns['Id'], columns['instruments'])
+        # As the query results, with an object-dtype instrument name
+        df['InstrumentName'] = df['InstrumentName'].astype(object)
+        return df, ARXPortfolioSimulation(df)
+
+    def through_compact(columns, float32):
+        compact = ARXCompactYieldData.from_columns(columns['instruments'], columns['InstrumentCode'],
+                                                   columns['Date'], columns['Yield'], float32=float32)
+        return compact, ARXPortfolioSimulation(compact)
+
+    (df, _), frame_peak = _peak(through_frame, columns)
+    (compact, _), compact_peak = _peak(through_compact, columns, False)
+    (compact32, _), compact32_peak = _peak(through_compact, columns, True)
+
+    mib = 2 ** 20
+    print(f"Long DataFrame:    {df.memory_usage(deep=True).sum() / mib:8.1f} MiB held, "
+          f"{frame_peak / mib:8.1f} MiB peak with the simulation")
+    print(f"Compact (float64): {compact.nbytes / mib:8.1f} MiB held, "
+          f"{compact_peak / mib:8.1f} MiB peak with the simulation")
+    print(f"Compact (float32): {compact32.nbytes / mib:8.1f} MiB held, "
+          f"{compact32_peak / mib:8.1f} MiB peak with the simulation")
@@ -0,0 +1,216 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ARXPooledConnection:
+    """
+    A database connection held by an ARXConnectionPool.
+
+    The connection keeps one long-lived cursor. Executing the same SQL text on the same cursor lets the ODBC
+    driver reuse the prepared statement instead of preparing it again on every call.
+
+    Attributes:
+        connection: The underlying DB-API connection.
+        cursor: The reusable cursor of the connection.
+        last_used (float): time.monotonic() of the last checkin, used to decide when to health-check.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.last_used = time.monotonic()
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        for resource in (self.cursor, self.connection):
+            try:
+                resource.close()
+            except Exception:
+                pass
+
+
+class ARXConnectionPool:
+    """
+    ARXConnectionPool is a thread-safe pool of database connections shared across data access objects.
+
+    Connections are opened lazily up to `size`. A connection that has been idle for longer than
+    `health_check_interval` seconds is verified with `health_check_query` at checkout and transparently
+    reopened if the check fails. Pool statistics (checkouts, wait times, reconnects) are available through
+    `statistics()` to help size the pool under concurrent batch jobs.
+
+    Attributes:
+        conn_str (str): The connection string.
+        size (int): The maximum number of open connections.
+        timeout (float): Seconds to wait for a free connection before raising TimeoutError.
+        health_check_query (str): Cheap query used to verify an idle connection.
+        health_check_interval (float): Idle seconds after which a connection is verified at checkout.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, conn_str, size=5, timeout=30, health_check_query="SELECT 1", health_check_interval=30,
+                 connect=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+
+        if connect is None:
+            import pyodbc
+            connect = pyodbc.connect
+
+        self.conn_str = conn_str
+        self.size = size
+        self.timeout = timeout
+        self.health_check_query = health_check_query
+        self.health_check_interval = health_check_interval
+        self.connect = connect
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._stats = {
+            "checkouts": 0,
+            "connections_opened": 0,
+            "reconnects": 0,
+            "health_checks": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    @classmethod
+    def shared(cls, conn_str, size=5, **kwargs) -> 'ARXConnectionPool':
+        """Return the process-wide pool for a connection string, creating it on first use."""
+        with cls._shared_lock:
+            pool = cls._shared.get(conn_str)
+            if pool is None:
+                pool = cls(conn_str, size=size, **kwargs)
+                cls._shared[conn_str] = pool
+            return pool
+
+    def _open(self):
+        connection = ARXPooledConnection(self.connect(self.conn_str))
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return connection
+
+    def _is_healthy(self, pooled):
+        with self._lock:
+            self._stats["health_checks"] += 1
+        try:
+            pooled.cursor.execute(self.health_check_query)
+            pooled.cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self) -> ARXPooledConnection:
+        """Check a connection out of the pool, waiting up to `timeout` seconds for one to be free."""
+        start_time = time.perf_counter()
+        pooled = None
+
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.size
+                if can_open:
+                    self._created += 1
+            if can_open:
+                try:
+                    pooled = self._open()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    pooled = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["timeouts"] += 1
+                    raise TimeoutError(f"No database connection became available within {self.timeout} seconds.")
+
+        # Verify connections that have been idle for a while and reopen broken ones
+        if time.monotonic() - pooled.last_used > self.health_check_interval and not self._is_healthy(pooled):
+            pooled.close()
+            try:
+                pooled = self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            with self._lock:
+                self._stats["reconnects"] += 1
+
+        wait_time = time.perf_counter() - start_time
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+        return pooled
+
+    def release(self, pooled: ARXPooledConnection, discard=False):
+        """Return a connection to the pool, or close it if it is no longer usable."""
+        with self._lock:
+            self._in_use -= 1
+            if discard:
+                self._created -= 1
+
+        if discard:
+            pooled.close()
+            return
+
+        pooled.last_used = time.monotonic()
+        self._idle.put(pooled)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager checking a connection out for the duration of the block.
+
+        Work that is not committed is rolled back when the block raises; a connection that cannot even be
+        rolled back is discarded.
+        """
+        pooled = self.acquire()
+        discard = False
+        try:
+            yield pooled
+        except BaseException:
+            try:
+                pooled.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def statistics(self) -> dict:
+        """Snapshot of the pool statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["open"] = self._created
+            stats["in_use"] = self._in_use
+        stats["idle"] = self._idle.qsize()
+        stats["wait_time_mean"] = stats["wait_time_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        return stats
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            pooled.close()
+            with self._lock:
+                self._created -= 1
@@ -0,0 +1,60 @@
+import pandas as pd
+
+
+class ARXDateRanges:
+    """
+    Helpers for bookkeeping of inclusive, day-granular date ranges.
+
+    A range is a (start, end) tuple of pd.Timestamp, both ends included. The caches use these helpers to record
+    which ranges they already hold and to work out the gaps that still have to be fetched.
+    """
+
+    ONE_DAY = pd.Timedelta(days=1)
+
+    @staticmethod
+    def normalize(start, end):
+        """Convert a (start, end) pair of strings, dates or timestamps to day-granular timestamps."""
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize()
+        if start > end:
+            raise ValueError("Start date must not be after end date.")
+        return start, end
+
+    @staticmethod
+    def merge(ranges):
+        """Merge overlapping or adjacent ranges into a sorted list of disjoint ranges."""
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + ARXDateRanges.ONE_DAY:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def missing(covered, start, end):
+        """Return the parts of [start, end] not covered by the given ranges."""
+        start, end = ARXDateRanges.normalize(start, end)
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in ARXDateRanges.merge(covered):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - ARXDateRanges.ONE_DAY))
+            cursor = max(cursor, covered_end + ARXDateRanges.ONE_DAY)
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    @staticmethod
+    def to_json(ranges):
+        return [[start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")] for start, end in ranges]
+
+    @staticmethod
+    def from_json(ranges):
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in ranges]
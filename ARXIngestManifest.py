@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+
+class ARXIngestManifest:
+    """
+    The ARXIngestManifest records what has already been loaded from each source CSV file, so that
+    re-running the ingestion skips unchanged files and only sends the new rows of files that were appended to.
+
+    For every file it keeps the SHA-256 checksum, the size in bytes and, per instrument, the latest `Date`
+    already loaded. A file whose checksum and size match is skipped without being parsed. A file whose first
+    bytes still match the recorded checksum only had rows appended (a routine daily refresh), so only the rows
+    after the recorded size are sent. Any other change (e.g. corrections to already-loaded dates) rewrote the
+    file, and all of its rows are sent again; the upsert leaves the unchanged ones as they were.
+
+    Attributes:
+        path (Path): The JSON manifest file.
+        files (dict): Manifest entries keyed by file name.
+    """
+    MANIFEST_FILE = ".ingest_manifest.json"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.files = self.load()
+
+    @classmethod
+    def for_directory(cls, data_directory) -> 'ARXIngestManifest':
+        """Return the manifest stored alongside the CSV files of a data directory."""
+        return cls(Path(data_directory) / cls.MANIFEST_FILE)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as manifest_file:
+                return json.load(manifest_file).get("files", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        # Write to a temporary file and swap it in, so an interrupted run never leaves a truncated manifest
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, 'w') as manifest_file:
+            json.dump({"files": self.files}, manifest_file, indent=2, sort_keys=True)
+        os.replace(temporary, self.path)
+
+    def reset(self):
+        """Forget every file, so the next run reloads everything."""
+        self.files = {}
+        self.save()
+
+    @staticmethod
+    def file_checksum(csv_file, block_size=1 << 20, size=None):
+        """SHA-256 of a file (or of its first `size` bytes), read in blocks so large files are not held in memory."""
+        digest = hashlib.sha256()
+        remaining = size
+        with open(csv_file, 'rb') as f:
+            while remaining is None or remaining > 0:
+                block = f.read(block_size if remaining is None else min(block_size, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(csv_file):
+        """Return the (checksum, size) pair identifying the current contents of a file."""
+        return ARXIngestManifest.file_checksum(csv_file), Path(csv_file).stat().st_size
+
+    def known_fingerprint(self, csv_file):
+        """The (checksum, size) pair recorded for a file, or None if it has not been loaded."""
+        entry = self.files.get(Path(csv_file).name)
+        return None if entry is None else (entry["sha256"], entry["size"])
+
+    def is_unchanged(self, csv_file, fingerprint):
+        return self.known_fingerprint(csv_file) == tuple(fingerprint)
+
+    def max_dates(self, csv_file):
+        """Latest date already loaded per instrument from a file (ISO strings)."""
+        return dict(self.files.get(Path(csv_file).name, {}).get("max_dates", {}))
+
+    @staticmethod
+    def appended_offset(csv_file, known_fingerprint):
+        """
+        Byte offset of the rows appended to a file since it was loaded.
+
+        Parameters:
+        - csv_file (Path): The source file.
+        - known_fingerprint (tuple): The (checksum, size) pair recorded for the file, or None.
+
+        Returns:
+        - int: The recorded size, when the file grew and its first bytes are still the loaded contents (ending
+               with a complete line); otherwise None, and the whole file has to be loaded.
+        """
+        if known_fingerprint is None:
+            return None
+        checksum, size = known_fingerprint
+        if size == 0 or Path(csv_file).stat().st_size <= size:
+            return None
+
+        with open(csv_file, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                return None
+        return size if ARXIngestManifest.file_checksum(csv_file, size=size) == checksum else None
+
+    def record(self, csv_file, fingerprint, max_dates):
+        """
+        Record a successfully loaded file.
+
+        Parameters:
+        - csv_file (Path): The source file.
+        - fingerprint (tuple): The (checksum, size) pair of the loaded contents.
+        - max_dates (dict): Latest date loaded per instrument in this run (Timestamps or ISO strings).
+        """
+        name = Path(csv_file).name
+        previous = self.files.get(name, {}).get("max_dates", {})
+
+        merged = dict(previous)
+        for instrument, max_date in max_dates.items():
+            max_date = pd.Timestamp(max_date).strftime("%Y-%m-%d")
+            merged[instrument] = max(previous.get(instrument, max_date), max_date)
+
+        checksum, size = fingerprint
+        self.files[name] = {"sha256": checksum, "size": size, "max_dates": merged}
@@ -0,0 +1,154 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class ARXInstrument(NamedTuple):
+    """
+    Compact record describing an instrument, parsed once from its name.
+
+    Attributes:
+        instrument_id (int): Integer id of the instrument within its registry.
+        name (str): The instrument name (e.g., 'US_TREASURY_10_YR').
+        tenor_years (float): Time to maturity in years, or NaN if the name has no recognizable maturity.
+        coupon_frequency (int): Coupon payments per year (0 for zero-coupon bonds and unknown instruments).
+        bond_type (str): One of ARXInstrumentRegistry.ZERO_COUPON, COUPON or UNKNOWN.
+    """
+    instrument_id: int
+    name: str
+    tenor_years: float
+    coupon_frequency: int
+    bond_type: str
+
+
+class ARXInstrumentRegistry:
+    """
+    The ARXInstrumentRegistry interns instrument names and parses each distinct name exactly once.
+
+    Hot paths can translate a column of instrument names into integer ids with `ids()` and then look up
+    tenors and bond types from NumPy arrays indexed by id, instead of re-parsing the strings on every row.
+    A single registry is shared across the application through `shared()`.
+    """
+    ZERO_COUPON = 'ZERO_COUPON'
+    COUPON = 'COUPON'
+    UNKNOWN = 'UNKNOWN'
+
+    # Coupon-paying treasuries pay semi-annually.
+    COUPON_FREQUENCY = 2
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._ids = {}
+        self._records = []
+        self._lock = threading.Lock()
+
+        # Arrays indexed by instrument id, rebuilt lazily whenever new instruments are registered.
+        self._tenor_years = None
+        self._zero_coupon = None
+
+    @classmethod
+    def shared(cls) -> 'ARXInstrumentRegistry':
+        """Return the registry shared by the DV01 calculator, portfolio simulation and portfolio manager."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def parse(name: str):
+        """
+        Parse the maturity and bond type from an instrument name.
+
+        The last two parts of the name hold the maturity (e.g., '10_YR' in 'US_TREASURY_10_YR' or
+        '3_MO' in 'US_TREASURY_3_MO'). T-Bills and 1-Year T-Notes are zero-coupon.
+
+        Returns:
+        - tuple: (tenor_years, coupon_frequency, bond_type).
+        """
+        parts = name.split('_')
+        if len(parts) < 2 or not parts[-2].isdigit() or parts[-1] not in ('MO', 'YR'):
+            return float('nan'), 0, ARXInstrumentRegistry.UNKNOWN
+
+        if parts[-1] == 'MO':
+            return int(parts[-2]) / 12, 0, ARXInstrumentRegistry.ZERO_COUPON
+
+        tenor_years = float(int(parts[-2]))
+        if tenor_years == 1:
+            return tenor_years, 0, ARXInstrumentRegistry.ZERO_COUPON
+        return tenor_years, ARXInstrumentRegistry.COUPON_FREQUENCY, ARXInstrumentRegistry.COUPON
+
+    def get(self, name: str) -> ARXInstrument:
+        """Return the record for an instrument name, registering and parsing it on first use."""
+        instrument_id = self._ids.get(name)
+        if instrument_id is not None:
+            return self._records[instrument_id]
+
+        with self._lock:
+            instrument_id = self._ids.get(name)
+            if instrument_id is None:
+                instrument_id = len(self._records)
+                self._records.append(ARXInstrument(instrument_id, name, *self.parse(name)))
+                self._ids[name] = instrument_id
+                self._tenor_years = None
+                self._zero_coupon = None
+            return self._records[instrument_id]
+
+    def get_id(self, name: str) -> int:
+        """Return the integer id of an instrument name."""
+        return self.get(name).instrument_id
+
+    def record(self, instrument_id: int) -> ARXInstrument:
+        """Return the record for an instrument id."""
+        return self._records[instrument_id]
+
+    def ids(self, names) -> np.ndarray:
+        """
+        Translate a sequence of instrument names (list, Series, Index or Categorical) into integer ids.
+        Each distinct name is looked up once, so the cost is proportional to the number of distinct instruments.
+        """
+        codes, uniques = pd.factorize(names)
+        unique_ids = np.array([self.get_id(name) for name in uniques], dtype=np.int32)
+        return unique_ids[codes]
+
+    def tenor_years(self) -> np.ndarray:
+        """Tenors in years indexed by instrument id."""
+        self._build_arrays()
+        return self._tenor_years
+
+    def zero_coupon(self) -> np.ndarray:
+        """Boolean zero-coupon flags indexed by instrument id."""
+        self._build_arrays()
+        return self._zero_coupon
+
+    def _build_arrays(self):
+        with self._lock:
+            if self._tenor_years is None or len(self._tenor_years) != len(self._records):
+                self._tenor_years = np.array([record.tenor_years for record in self._records], dtype=float)
+                self._zero_coupon = np.array([record.bond_type == self.ZERO_COUPON for record in self._records],
+                                             dtype=bool)
+
+    def describe(self, name: str) -> str:
+        """Short human-readable description of an instrument's terms (e.g., '10Y coupon')."""
+        record = self.get(name)
+        if record.bond_type == self.UNKNOWN:
+            return "unknown terms"
+
+        months = round(record.tenor_years * 12)
+        tenor = f"{months}M" if months < 12 else f"{record.tenor_years:g}Y"
+        bond_type = "zero-coupon" if record.bond_type == self.ZERO_COUPON else "coupon"
+        return f"{tenor} {bond_type}"
+
+    def sort_key(self, name: str):
+        """Sort key ordering instruments along the curve by tenor, with unknown instruments last."""
+        record = self.get(name)
+        return record.bond_type == self.UNKNOWN, 0.0 if np.isnan(record.tenor_years) else record.tenor_years, name
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, name):
+        return name in self._ids
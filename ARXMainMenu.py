@@ -1,16 +1,16 @@
+import time
+
+# Measure how long the application takes to import and to show its menu (see --timing)
+_START_TIME = time.perf_counter()
+
 import json
+import sys
 from pathlib import Path
 
-import pandas as pd
+# The analytics modules pull in pandas, scipy, quandl and the database drivers. They are imported by the
+# actions that need them, so starting the menu or viewing the readme doesn't pay for them.
 
-from ARXApiDataAcquire import ARXApiDataAcquire
-from ARXUsTreasuryDV01Calc import ARXUsTreasuryDV01Calc
-from ARXDatabaseSetup import ARXDatabaseSetup
-from ARXPortfolioManager import ARXPortfolioManager
-from ARXPortfolioSimulation import ARXPortfolioSimulation
-from ARXVar import ARXParametricSimulation, ARXHistoricalSimulation, ARXVaRCalculator
-from ARXVarReport import ARXVaRReport
-from ARXYieldDataAccess import ARXYieldDataAccess
+_IMPORT_TIME = time.perf_counter() - _START_TIME
 
 
 class ARXYieldDataAnalysisCLI:
@@ -18,27 +18,114 @@ class ARXYieldDataAnalysisCLI:
     The ARXYieldDataAnalysisCLI class provides command-line interface functionality
     for the ARX Yield Data Analysis application. It offers a menu-driven interaction
     for tasks such as importing data, calculating VaR, simulating portfolios, etc.
+
+    Startup is lazy: the database is connected and verified, and the yield data loaded, only when the first
+    action needing them runs. The yield data is then loaded once and shared by every later action, until new
+    data is saved to the database. VaR and DV01 results are memoized (see ARXResultCache) by their inputs and the
+    version of the yield data, so repeating an action on unchanged data doesn't recompute it.
+
+    Attributes:
+        configuration_directory (Path): Directory holding config.json and portfolio.json.
+        timing (bool): Report import time, time to first menu and the duration of every action.
     """
-    def __init__(self, configuration_directory):
+    def __init__(self, configuration_directory, timing=False):
         self.start_date = "2021-01-01"
         self.end_date = "2023-01-01"
 
         self.configuration_directory = configuration_directory
         self.portfolio_path = self.configuration_directory / 'portfolio.json'
-        self.yield_data_access = ARXYieldDataAccess(data_directory=Path("sources"), config_directory=Path("config"),
-                                                    sql_directory=Path("SQL"))
-        success, result = self.yield_data_access.verify_db_config()
-        if not success:
-            print("ALERT: ", result)
-            self.error = result
-            return
+        self.timing = timing
         self.error = None
-        self.portfolio_manager = ARXPortfolioManager(self.configuration_directory / 'portfolio.json',
-                                                     self.yield_data_access, start_date=self.start_date,
-                                                     end_date=self.end_date)
 
-        self.yield_data = self.yield_data_access.execute_get_yield_data_by_date_range(self.start_date, self.end_date)
-        self.portfolio_simulation = ARXPortfolioSimulation(data=self.yield_data)
+        self._yield_data_access = None
+        self._database_verified = False
+        self._yield_data_cache = None
+        self._portfolio_manager = None
+        self._yield_data = None
+        self._yield_data_version = None
+        self._portfolio_simulation = None
+        self._result_cache = None
+
+    @property
+    def yield_data_access(self):
+        if self._yield_data_access is None:
+            from ARXYieldDataStore import ARXYieldDataStore
+
+            # The storage backend (SQL Server or embedded SQLite) is selected in config.json
+            self._yield_data_access = ARXYieldDataStore.create(data_directory=Path("sources"),
+                                                               config_directory=Path("config"),
+                                                               sql_directory=Path("SQL"))
+        return self._yield_data_access
+
+    def verify_database(self):
+        """
+        Verify the database configuration once. On failure, print the alert and offer the database setup.
+
+        Returns:
+        - bool: Whether the database can be used.
+        """
+        if not self._database_verified:
+            success, result = self.yield_data_access.verify_db_config()
+            if not success:
+                print("ALERT: ", result)
+                print("\nPlease setup the database following the instruction in the README.md before using the "
+                      "application.")
+                self.error = result
+                return False
+            self.error = None
+            self._database_verified = True
+        return True
+
+    @property
+    def yield_data_cache(self):
+        if self._yield_data_cache is None:
+            from ARXYieldDataCache import ARXYieldDataCache
+
+            # Serve repeated date-range requests from the local columnar cache
+            self._yield_data_cache = ARXYieldDataCache(self.yield_data_access)
+        return self._yield_data_cache
+
+    @property
+    def portfolio_manager(self):
+        if self._portfolio_manager is None:
+            from ARXPortfolioManager import ARXPortfolioManager
+
+            self._portfolio_manager = ARXPortfolioManager(self.configuration_directory / 'portfolio.json',
+                                                          self.yield_data_cache, start_date=self.start_date,
+                                                          end_date=self.end_date)
+        return self._portfolio_manager
+
+    @property
+    def yield_data(self):
+        """The yield data of the default date range, loaded on first use and shared by every action."""
+        if self._yield_data is None:
+            # Only the instrument, date and yield columns are needed by the simulation, in compact arrays
+            self._yield_data = self.yield_data_cache.execute_get_compact_yield_data_by_date_range(self.start_date,
+                                                                                                  self.end_date)
+            self._yield_data_version = self.yield_data_cache.data_version
+        return self._yield_data
+
+    @property
+    def yield_data_version(self):
+        """Version of the loaded yield data (the watermark of the yield data cache when it was loaded)."""
+        self.yield_data
+        return self._yield_data_version
+
+    @property
+    def result_cache(self):
+        if self._result_cache is None:
+            from ARXResultCache import ARXResultCache
+
+            self._result_cache = ARXResultCache(cache_directory=Path("cache") / "results")
+        return self._result_cache
+
+    @property
+    def portfolio_simulation(self):
+        if self._portfolio_simulation is None:
+            from ARXPortfolioSimulation import ARXPortfolioSimulation
+
+            self._portfolio_simulation = ARXPortfolioSimulation(data=self.yield_data)
+        return self._portfolio_simulation
 
     def load_portfolio(self):
         try:
@@ -71,25 +158,16 @@ class ARXYieldDataAnalysisCLI:
 
     def setup_database(self):
         """
-        Set up the database by creating tables and stored procedures using the ARXDatabaseSetup class.
+        Set up the database by creating tables and stored procedures for the configured storage backend.
         """
         print("Setting up the database...")
 
-        # Define the directories for config, SQL, and data
-        config_directory = Path("config")
-        sql_directory = Path("SQL") / "setup"
-        data_directory = Path("data")
-
-        # Initialize the data access and database setup classes
-        loader = ARXYieldDataAccess(data_directory=data_directory, config_directory=config_directory,
-                                    sql_directory=sql_directory)
-        executor = ARXDatabaseSetup(sql_directory, loader.conn_str)
-
-        # Execute the scripts to set up the database
-        executor.execute_scripts()
+        # Execute the backend's setup scripts (ARXDatabaseSetup for SQL Server)
+        self.yield_data_access.setup_database()
 
         print("Database set up successfully.")
         self.error = None
+        self._database_verified = False
 
     def main_menu(self):
         print("\nARX Yield Data Analysis CLI")
@@ -99,14 +177,7 @@ class ARXYieldDataAnalysisCLI:
         print("Application Date: October 17, 2023")
         print("\nWelcome to the ARX Yield Data Analysis tool.")
 
-        if self.error:
-            print("\n*** Pre-inspection Alert message: ***")
-            print(self.error)
-            print(
-                "\nPlease setup the database following the instruction in the README.md before using the application.")
-            input("\nClick enter to continue: ").upper()
-            print("-----------------------------------")
-
+        first_menu = True
         while True:
             print("\nPlease select an option from the menu below:")
             print("-----------------------------------")
@@ -124,7 +195,13 @@ class ARXYieldDataAnalysisCLI:
             print("T. View report.md")
             print("E. Exit")
 
+            if first_menu and self.timing:
+                print(f"\n[timing] imports: {_IMPORT_TIME * 1000:.1f} ms, "
+                      f"time to first menu: {(time.perf_counter() - _START_TIME) * 1000:.1f} ms")
+            first_menu = False
+
             choice = input("\nEnter your choice: ").upper()
+            action_start = time.perf_counter()
 
             if choice == 'I':
                 self.import_treasury_data()
@@ -151,33 +228,45 @@ class ARXYieldDataAnalysisCLI:
                 print("\nThank you for using ARX Yield Data Analysis CLI. Goodbye!")
                 break
 
+            if self.timing:
+                print(f"[timing] {choice}: {(time.perf_counter() - action_start) * 1000:.1f} ms")
+
     def import_treasury_data(self):
+        from ARXAcquisitionRunner import ARXAcquisitionRunner
+        from ARXApiResponseCache import ARXApiResponseCache
+
         print("Fetching treasury yield data from API...")
         ticker = "US TREASURY"
 
         maturities = ["3 MO", "1 YR", "5 YR", "10 YR", "30 YR"]
-        data_acquirer = ARXApiDataAcquire(ticker, self.start_date, self.end_date, maturities,
-                                          config_directory=Path("config"),
-                                          destination_directory=Path('sources'))
-        data_acquirer.save_to_csv()
-        print("Data fetched successfully")
+        runner = ARXAcquisitionRunner([{"ticker": ticker, "maturities": maturities}], self.start_date,
+                                      self.end_date, config_directory=Path("config"),
+                                      destination_directory=Path('sources'), response_cache=ARXApiResponseCache())
+        results = runner.run()
+        if all(result["status"] == "ok" for result in results.values()):
+            print("Data fetched successfully")
 
     def save_api_data_to_db(self):
+        if not self.verify_database():
+            return
         print("Saving API data to db...")
-        data_directory = Path("sources")
-        config_directory = Path("config")
-        sql_directory = Path("SQL")
+        total_rows, failures = self.yield_data_access.execute_parallel_insert()
 
-        loader = ARXYieldDataAccess(data_directory=data_directory, config_directory=config_directory,
-                                    sql_directory=sql_directory)
-        loader.execute_insert()
+        # Load the new data on the next action; its new version retires the memoized results
+        self._yield_data = None
+        self._portfolio_simulation = None
+
+        if failures:
+            for file_name, error in sorted(failures.items()):
+                print(f"ERROR loading {file_name}: {error}")
+            print(f"Saved {total_rows} rows; the files above were not loaded and will be retried next time.")
+            return
         print("Saved API data to db successfully.")
 
     def simulate_portfolio(self):
+        if not self.verify_database():
+            return
         print("Simulating portfolio...")
-        # Placeholder for your portfolio simulation function
-        self.yield_data_access = ARXYieldDataAccess(data_directory=Path("sources"), config_directory=Path("config"),
-                                                    sql_directory=Path("SQL"))
         pf = self.portfolio_manager.load_portfolio()
         self.portfolio_simulation.set_weights(pf)
         self.portfolio_simulation.simulate()
@@ -186,49 +275,59 @@ class ARXYieldDataAnalysisCLI:
         print("Simulation complete!")
 
     def calculate_var(self):
-        print("Calculating VaR using the Historical Simulation methodology...")
+        if not self.verify_database():
+            return
+        from ARXRiskActions import ARXRiskActions
+        from ARXVarReport import ARXVaRReport
+
         portfolio_details = self.portfolio_manager.load_portfolio()
-        self.portfolio_simulation.set_weights(portfolio_details)
-        self.portfolio_simulation.simulate()
-        portfolio_delta_values = self.portfolio_simulation.get_portfolio_delta_yield()
-        calculator = ARXVaRCalculator(strategy=ARXHistoricalSimulation())
-        var_95 = calculator.compute(portfolio_delta_values, 0.95)
-        var_99 = calculator.compute(portfolio_delta_values, 0.99)
-        report = ARXVaRReport()
-        report.generate(var_95, var_99)
-        print("Calculating VaR using the Parametric Simulation methodology...")
-
-        calculator = ARXVaRCalculator(strategy=ARXParametricSimulation())
-        var_95 = calculator.compute(portfolio_delta_values, 0.95)
-        var_99 = calculator.compute(portfolio_delta_values, 0.99)
-        report = ARXVaRReport()
-        report.generate(var_95, var_99)
+        results = ARXRiskActions.var(self.portfolio_simulation, portfolio_details, self.start_date, self.end_date,
+                                     percentiles=[0.95, 0.99], result_cache=self.result_cache,
+                                     data_version=self.yield_data_version)
+
+        for method, name in (("historical", "Historical"), ("parametric", "Parametric"),
+                             ("monte_carlo", "Monte Carlo")):
+            print(f"Calculating VaR using the {name} Simulation methodology...")
+            result_95, result_99 = results[method]["0.95"], results[method]["0.99"]
+            report = ARXVaRReport()
+            report.generate(result_95["var"], result_99["var"], result_95["es"], result_99["es"])
+
+        diagnostics = results["monte_carlo"]["diagnostics"]
+        print(f"Monte Carlo: {diagnostics['paths']:,} paths in {diagnostics['seconds']:.2f}s "
+              f"({diagnostics['paths_per_second']:,.0f} paths/s)")
+        if self.timing:
+            stats = self.result_cache.stats
+            print(f"[timing] result cache: {stats['hits']} hits, {stats['misses']} misses")
 
     def calculate_dv01(self):
-        yield_data_access = ARXYieldDataAccess(data_directory=Path("sources"), config_directory=Path("config"),
-                                               sql_directory=Path("SQL"))
-        df = yield_data_access.execute_get_yield_data_by_date_range(self.start_date, self.end_date)
-        df = df[df["InstrumentName"].str.startswith("US_TREASURY_")]
-        df['DV01'] = df.apply(ARXUsTreasuryDV01Calc.compute_dv01, axis=1)
-
-        # Convert the 'Date' column to a datetime object
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df[df['Date'].dt.day == 1]
-        df['DV01'] = df.apply(ARXUsTreasuryDV01Calc.compute_dv01, axis=1)
-
-        # Group by 'InstrumentName' and 'Date', then get the first value for each group
-        grouped_df = df.groupby(['InstrumentName', 'Date']).first().reset_index()
-
-        # Pivot the DataFrame
-        pivot_df = grouped_df.pivot(index='Date', columns='InstrumentName', values='DV01')
-        print(pivot_df)
+        if not self.verify_database():
+            return
+        from ARXRiskActions import ARXRiskActions
+
+        def compute():
+            # The database sends only the US Treasury rows of the first day of each month
+            df = self.yield_data_cache.execute_get_filtered_yield_data(self.start_date, self.end_date,
+                                                                       instrument_prefix="US_TREASURY_",
+                                                                       sampling="first_of_month")
+            return ARXRiskActions.dv01(df)
+
+        # Bring the data version up to date without loading the yield data; until the cache holds any data
+        # there is no version to key the result with, so it is computed every time
+        self.yield_data_cache.refresh()
+        data_version = self.yield_data_cache.data_version
+        print(ARXRiskActions.cached(self.result_cache if data_version is not None else None, "dv01", compute,
+                                    data_version, start_date=ARXRiskActions.normalize_date(self.start_date),
+                                    end_date=ARXRiskActions.normalize_date(self.end_date)))
 
         print("The above report shows DV01 per instrument as a pivot table for each first day of the month.")
 
     def manage_portfolio(self):
+        if not self.verify_database():
+            return
         self.portfolio_manager.manage_portfolio()
 
 
 if __name__ == "__main__":
-    cli = ARXYieldDataAnalysisCLI(configuration_directory=Path("config"))
+    # Run with --timing to report import time, time to first menu and the duration of every action
+    cli = ARXYieldDataAnalysisCLI(configuration_directory=Path("config"), timing="--timing" in sys.argv[1:])
     cli.main_menu()
@@ -1,5 +1,6 @@
 import json
-from ARXYieldDataAccess import ARXYieldDataAccess
+
+from ARXInstrumentRegistry import ARXInstrumentRegistry
 
 
 class ARXPortfolioManager:
@@ -70,12 +71,16 @@ class ARXPortfolioManager:
         updated_portfolio = {}
 
         try:
-            df = self.yield_data_access.execute_get_yield_data_by_date_range(self.start_date, self.end_date)
-            unique_instruments = self.yield_data_access.get_unique_instruments(df)
+            # Only the instrument names are needed, so only they are fetched
+            unique_instruments = self.yield_data_access.execute_get_distinct_instruments(self.start_date,
+                                                                                         self.end_date)
             if unique_instruments:
+                # List the tickers along the curve using the terms parsed once by the shared instrument registry
+                registry = ARXInstrumentRegistry.shared()
+                unique_instruments = sorted(unique_instruments, key=registry.sort_key)
                 print("\nAvailable Tickers:")
                 for idx, ticker in enumerate(unique_instruments, 1):
-                    print(f"{idx}. {ticker}")
+                    print(f"{idx}. {ticker} ({registry.describe(ticker)})")
             else:
                 print("No tickers found. You can add them manually.")
         except Exception as e:
@@ -1,48 +1,166 @@
+import numpy as np
 import pandas as pd
 
+from ARXCompactYieldData import ARXCompactYieldData
+from ARXInstrumentRegistry import ARXInstrumentRegistry
+
 
 class ARXPortfolioSimulation:
     """
     Provides a portfolio simulation to compute a portfolio's delta yield.
+
+    The yields are held once, as a read-only, contiguous float matrix (dates x instruments) with the dates and
+    instrument names as its index. Setting weights never changes that matrix: a portfolio is a weight vector
+    over all instruments (zero for those it does not hold), so any number of portfolios can be simulated in
+    one session against the same data. The day-to-day changes are computed once per data version and reused.
+
+    New dates are added with `append`, which only computes the changes, portfolio delta yield and registered
+    rolling VaR of the new dates. The rows live in buffers whose capacity doubles when full, so a daily update
+    costs the same however long the history is.
+
+    Attributes:
+        instruments (pd.Index): Instrument names of the matrix columns.
+        data_version (int): Version of the matrix, moved on by every append.
+        weights (list): Weights of the current portfolio, in the order they were given.
+        weight_vector (np.ndarray): Weights of the current portfolio over all instruments.
     """
 
-    def __init__(self, data: pd.DataFrame):
-        self.data = self.transform_data(data)
+    def __init__(self, data):
+        wide = self.transform_data(data)
+        self.instruments = wide.columns
+        self.data_version = 0
+
+        # Row buffers; only the first `_count` rows hold data
+        self._count = len(wide)
+        self._dates = np.asarray(wide.index, dtype=object).copy()
+        self._dates_name = wide.index.name
+        self._yields = np.ascontiguousarray(wide.to_numpy(dtype=float)).copy()
+        self._changes = None
+        self._changes_version = None
+        self._portfolio = None
+
         self.weights = None
-        self.delta_yield = None
-        self.portfolio_delta_yield = None
+        self.weight_vector = None
+        # Matrix columns of the current portfolio's instruments, in the order of its weights
+        self._columns = None
+        self._trackers = {}
 
     def transform_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Transform the data from long format to wide format.
         """
+        if isinstance(data, ARXCompactYieldData):
+            # Pivot straight from the compact arrays
+            return data.to_wide()
+
         # Drop duplicates based on 'Date' and 'InstrumentName'
         data = data.drop_duplicates(subset=['Date', 'InstrumentName'])
 
         return data.pivot(index='Date', columns='InstrumentName', values='Yield')
 
+    @staticmethod
+    def _read_only(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(matrix, dtype=float)
+        matrix.flags.writeable = False
+        return matrix
+
+    @staticmethod
+    def _view(buffer: np.ndarray, count: int) -> np.ndarray:
+        view = buffer[:count]
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def _grow(buffer: np.ndarray, count: int) -> np.ndarray:
+        # Double the capacity so that appending n dates one at a time copies O(n) rows in total
+        if count <= len(buffer):
+            return buffer
+        grown = np.empty((max(count, 2 * len(buffer)),) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
+
+    @property
+    def dates(self) -> pd.Index:
+        """Dates of the matrix rows."""
+        return pd.Index(self._dates[:self._count], name=self._dates_name)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only yields, one row per date and one column per instrument."""
+        return self._view(self._yields, self._count)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        The yields in wide format (one column per instrument), viewing the matrix without copying it.
+        """
+        return pd.DataFrame(self.matrix, index=self.dates, columns=self.instruments, copy=False)
+
+    @property
+    def instrument_ids(self) -> np.ndarray:
+        """
+        Shared registry ids of the instruments in the data columns, in column order.
+        """
+        return ARXInstrumentRegistry.shared().ids(self.instruments)
+
     def set_weights(self, weights: dict):
         """
         Set the weights for the portfolio.
         """
-        # print(self.data.head())
-        if not set(weights.keys()).issubset(set(self.data.columns)):
+        if not set(weights.keys()).issubset(set(self.instruments)):
             raise ValueError("Some keys in the provided weights are not included in the data columns.")
 
         if abs(sum(weights.values()) - 1) > 1e-9:
             raise ValueError("Weights must sum to 1.")
 
-        # Reorder data columns based on the order of the weights
-        self.data = self.data[list(weights.keys())]
+        # Locate the portfolio's instruments in the matrix instead of narrowing the data to them
+        self._columns = self.instruments.get_indexer(list(weights.keys()))
 
         # Convert weights dictionary values to a list for easier matrix operations
         self.weights = list(weights.values())
+        weight_vector = np.zeros(len(self.instruments))
+        weight_vector[self._columns] = self.weights
+        self.weight_vector = self._read_only(weight_vector)
+        self._portfolio = None
+        self._trackers = {}
 
-    def calculate_yield_changes(self):
+    def calculate_yield_changes(self) -> np.ndarray:
         """
         Calculate day-to-day percentage change in yield for each instrument.
+
+        The changes are computed once per data version, for every instrument, and kept read-only.
+        """
+        if self._changes_version != self.data_version:
+            self._changes = np.zeros_like(self._yields)
+            self._changes[1:self._count] = self._percentage_changes(self._yields[:self._count])
+            self._changes_version = self.data_version
+        return self._view(self._changes, self._count)
+
+    @staticmethod
+    def _percentage_changes(yields: np.ndarray) -> np.ndarray:
+        """Changes from each row to the next (one row fewer than `yields`)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes = yields[1:] / yields[:-1] - 1
+        # As pct_change().fillna(0): the first date and missing yields give no change
+        changes[np.isnan(changes)] = 0
+        return changes
+
+    @property
+    def delta_yield(self) -> pd.DataFrame:
+        """
+        Day-to-day percentage change in yield of the portfolio's instruments (of every instrument when no
+        weights are set), in the order of the weights.
+        """
+        changes = self.change_matrix()
+        if self._columns is None:
+            return changes
+        return changes.iloc[:, self._columns]
+
+    def change_matrix(self) -> pd.DataFrame:
+        """
+        Day-to-day percentage change in yield of every instrument, viewing the cached changes without copying them.
         """
-        self.delta_yield = self.data.pct_change().fillna(0)
+        return pd.DataFrame(self.calculate_yield_changes(), index=self.dates, columns=self.instruments, copy=False)
 
     def simulate(self):
         """
@@ -57,15 +175,115 @@ class ARXPortfolioSimulation:
                 - The summation is over all instruments in the portfolio.
 
         """
-        if self.delta_yield is None:
-            self.calculate_yield_changes()
+        if self.weight_vector is None:
+            raise ValueError("Weights must be set before simulating the portfolio.")
 
-        # The reason for sum(axis=1) below is to compute the daily portfolio yield change for each date by summing
-        # the weighted yield changes of all instruments.
-        self.portfolio_delta_yield = (self.delta_yield * self.weights).sum(axis=1)
+        # The matrix-vector product computes the daily portfolio yield change for each date by summing the
+        # weighted yield changes of all instruments; instruments outside the portfolio have a weight of 0.
+        self._portfolio = np.empty(len(self._yields))
+        self._portfolio[:self._count] = self.calculate_yield_changes() @ self.weight_vector
+
+    @property
+    def portfolio_delta_yield(self) -> pd.Series:
+        if self._portfolio is None:
+            return None
+        return pd.Series(self._view(self._portfolio, self._count), index=self.dates, copy=False)
 
     def get_portfolio_delta_yield(self) -> pd.Series:
         """
         Get the portfolio's daily yield change.
         """
         return self.portfolio_delta_yield
+
+    def track_rolling_var(self, name: str, strategy, percentile: float, window: int):
+        """
+        Keep a rolling VaR of the portfolio's delta yield up to date as dates are appended.
+
+        Parameters:
+        - name (str): Name to read the series back with `rolling_var`.
+        - strategy (ARXVaRStrategy): Provides the rolling tracker (e.g., ARXHistoricalSimulation()).
+        - percentile (float): Confidence level between 0 and 1 (e.g., 0.99).
+        - window (int): Number of observations in the trailing window (e.g., 250).
+        """
+        if self._portfolio is None:
+            raise ValueError("The portfolio must be simulated before tracking a rolling VaR.")
+
+        tracker = strategy.rolling_tracker(window, percentile)
+        values = [tracker.update(value) for value in self._portfolio[:self._count]]
+        self._trackers[name] = (tracker, values)
+
+    def rolling_var(self, name: str) -> pd.Series:
+        """The rolling VaR registered under `name`, one value per date."""
+        _, values = self._trackers[name]
+        return pd.Series(values, index=self.dates, name="VaR", dtype=float)
+
+    def append(self, new_rows: pd.DataFrame):
+        """
+        Add new dates to the simulation.
+
+        Only the new dates are processed: their changes are taken from the last stored row, and the portfolio
+        delta yield and the tracked rolling VaR are extended in place.
+
+        Parameters:
+        - new_rows (pd.DataFrame): Long-format rows ('Date', 'InstrumentName', 'Yield') of the instruments
+                                   already in the simulation. Dates already held are ignored.
+
+        Returns:
+        - int: The number of dates added.
+        """
+        wide = self.transform_data(new_rows)
+        if not set(wide.columns).issubset(set(self.instruments)):
+            raise ValueError("New rows contain instruments that are not included in the data columns.")
+        if self._count:
+            wide = wide[wide.index > self._dates[self._count - 1]]
+        wide = wide.sort_index()
+        if wide.empty:
+            return 0
+
+        start, end = self._count, self._count + len(wide)
+        self._dates = self._grow(self._dates, end)
+        self._dates[start:end] = np.asarray(wide.index, dtype=object)
+        self._yields = self._grow(self._yields, end)
+        self._yields[start:end] = wide.reindex(columns=self.instruments).to_numpy(dtype=float)
+
+        if self._changes_version == self.data_version:
+            self._changes = self._grow(self._changes, end)
+            if start:
+                self._changes[start:end] = self._percentage_changes(self._yields[start - 1:end])
+            else:
+                self._changes[0] = 0
+                self._changes[1:end] = self._percentage_changes(self._yields[:end])
+            self._changes_version = self.data_version + 1
+
+            if self._portfolio is not None:
+                self._portfolio = self._grow(self._portfolio, end)
+                self._portfolio[start:end] = self._changes[start:end] @ self.weight_vector
+                for tracker, values in self._trackers.values():
+                    values.extend(tracker.update(value) for value in self._portfolio[start:end])
+
+        self._count = end
+        self.data_version += 1
+        return len(wide)
+
+    def simulate_batch(self, weights) -> pd.DataFrame:
+        """
+        Compute the daily yield change of many portfolios with one matrix product, without changing the data
+        or the weights of the single-portfolio simulation.
+
+        Parameters:
+        - weights (pd.DataFrame): One row per portfolio and one column per instrument. Instruments without a
+                                  column get a weight of 0 and each row must sum to 1.
+
+        Returns:
+        - pd.DataFrame: One column per portfolio (named after the rows of `weights`) with its daily yield change.
+        """
+        if not set(weights.columns).issubset(set(self.instruments)):
+            raise ValueError("Some keys in the provided weights are not included in the data columns.")
+
+        weight_matrix = weights.reindex(columns=self.instruments, fill_value=0.0).to_numpy(dtype=float)
+        if not np.allclose(weight_matrix.sum(axis=1), 1, rtol=0, atol=1e-9):
+            raise ValueError("Weights must sum to 1.")
+
+        # (dates x instruments) @ (instruments x portfolios) gives every portfolio's daily yield change at once
+        return pd.DataFrame(self.calculate_yield_changes() @ weight_matrix.T, index=self.dates,
+                            columns=weights.index)
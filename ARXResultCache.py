@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class ARXResultCache:
+    """
+    ARXResultCache memoizes analytics results (VaR, DV01, simulations) by the inputs they were computed from.
+
+    A result is keyed by a SHA-256 hash of the action, its parameters (portfolio weights, date range, strategy
+    and the strategy's settings) and the data version of the yield data it was computed on, so a result is
+    never served for data it was not computed from. When a newer data version is seen, the memory entries of
+    the older versions are dropped; results of an older version looked up afterwards are still cached, and the
+    files of older versions on disk are left to the size-based eviction.
+
+    Results are kept pickled, so a caller changing a returned DataFrame or dict never changes the cached one:
+    - In memory, as an LRU of at most `max_memory_bytes`.
+    - Optionally on disk (one file per result in `cache_directory`), at most `max_disk_bytes`; the least
+      recently used files are removed first. The disk tier is shared by every process using the directory.
+
+    Attributes:
+        cache_directory (Path): Directory of the disk tier (None for memory only).
+        max_memory_bytes (int): Size of the memory tier.
+        max_disk_bytes (int): Size of the disk tier.
+        hits, misses (int): Lookups served from the cache and lookups computed.
+    """
+    SUFFIX = ".pkl"
+
+    def __init__(self, cache_directory=None, max_memory_bytes=64 * 2 ** 20, max_disk_bytes=512 * 2 ** 20):
+        self.cache_directory = None if cache_directory is None else Path(cache_directory)
+        if self.cache_directory is not None:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._data_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _canonical(value):
+        if isinstance(value, dict):
+            # Dicts keep their order: the order of the weights sets the column order of the computation
+            return [[str(key), ARXResultCache._canonical(item)] for key, item in value.items()]
+        if isinstance(value, (list, tuple)):
+            return [ARXResultCache._canonical(item) for item in value]
+        if isinstance(value, float):
+            # repr round-trips, so equal floats hash equally and different ones never collide
+            return repr(value)
+        if value is None or isinstance(value, (bool, int, str)):
+            return value
+        return str(value)
+
+    @staticmethod
+    def key(action, data_version, **parameters) -> str:
+        """The content hash of an action, its parameters and the data version."""
+        payload = [action, ARXResultCache._canonical(data_version),
+                   sorted([name, ARXResultCache._canonical(value)] for name, value in parameters.items())]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    @staticmethod
+    def _version_tag(data_version) -> str:
+        return hashlib.sha256(json.dumps(ARXResultCache._canonical(data_version)).encode()).hexdigest()[:16]
+
+    def _path(self, key, data_version):
+        return self.cache_directory / f"{self._version_tag(data_version)}-{key}{self.SUFFIX}"
+
+    @staticmethod
+    def _is_older(data_version, other) -> bool:
+        """Whether a data version is older than another (None, no data yet, is the oldest)."""
+        if data_version is None:
+            return other is not None
+        # Data versions are watermark timestamps in ISO format, which order as strings
+        return other is not None and str(data_version) < str(other)
+
+    def _use_version(self, data_version):
+        """Move on to a newer data version, dropping the memory entries of the older ones."""
+        if not self._is_older(self._data_version, data_version):
+            return
+        self._data_version = data_version
+        for key, (version, payload) in list(self._entries.items()):
+            if self._is_older(version, data_version):
+                del self._entries[key]
+                self._memory_bytes -= len(payload)
+                self.evictions += 1
+
+    def _remember(self, key, data_version, payload):
+        if len(payload) > self.max_memory_bytes:
+            return
+        if key in self._entries:
+            self._memory_bytes -= len(self._entries.pop(key)[1])
+        self._entries[key] = (data_version, payload)
+        self._memory_bytes += len(payload)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _read_disk(self, key, data_version):
+        if self.cache_directory is None:
+            return None
+        path = self._path(key, data_version)
+        try:
+            with open(path, 'rb') as result_file:
+                payload = result_file.read()
+        except FileNotFoundError:
+            return None
+        # The modification time orders the files for eviction, so a read counts as a use
+        os.utime(path)
+        return payload
+
+    def _write_disk(self, key, data_version, payload):
+        if self.cache_directory is None or len(payload) > self.max_disk_bytes:
+            return
+        path = self._path(key, data_version)
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, 'wb') as result_file:
+            result_file.write(payload)
+        os.replace(temporary, path)
+
+        files = []
+        for file in self.cache_directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files, key=lambda entry: entry[0]):
+            if total <= self.max_disk_bytes:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def get_or_compute(self, action, compute, data_version, **parameters):
+        """
+        Return the cached result of an action, or compute and cache it.
+
+        Parameters:
+        - action (str): Name of the result (e.g., 'var').
+        - compute (callable): Computes the result when it is not cached.
+        - data_version: Version of the yield data the result is computed on (e.g., ARXYieldDataCache.data_version).
+        - parameters: Everything else the result depends on; values must be JSON-like (dicts, lists, numbers,
+                      strings, None).
+
+        Returns:
+        - The result.
+        """
+        key = self.key(action, data_version, **parameters)
+        with self._lock:
+            self._use_version(data_version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(entry[1])
+
+            payload = self._read_disk(key, data_version)
+            if payload is not None:
+                self._remember(key, data_version, payload)
+                self.hits += 1
+                self.disk_hits += 1
+                return pickle.loads(payload)
+            self.misses += 1
+
+        # Computed outside the lock, so other results can be served meanwhile
+        result = compute()
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, data_version, payload)
+            self._write_disk(key, data_version, payload)
+        return result
+
+    def invalidate(self):
+        """Drop every cached result."""
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+            self._memory_bytes = 0
+            if self.cache_directory is not None:
+                for path in self.cache_directory.glob(f"*{self.SUFFIX}"):
+                    path.unlink(missing_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        """Hit and miss counters and the size of the memory tier."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits,
+                    "hit_rate": self.hits / lookups if lookups else 0.0, "evictions": self.evictions,
+                    "entries": len(self._entries), "memory_bytes": self._memory_bytes}
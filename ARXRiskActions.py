@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXUsTreasuryDV01Calc import ARXUsTreasuryDV01Calc
+from ARXVar import ARXHistoricalSimulation, ARXMonteCarloSimulation, ARXParametricSimulation, ARXVaRCalculator
+
+
+class ARXRiskActions:
+    """
+    The analytics behind the CLI actions, as functions of their inputs.
+
+    The actions take the data and parameters they need and return their results, without prompting or
+    printing, so the interactive menu and the batch runner share them. A shared ARXPortfolioSimulation is
+    only read (its cached change matrix), never re-weighted, so several actions can run on it concurrently.
+
+    Given an ARXResultCache and the data version of the simulation, results are memoized by their inputs.
+    """
+    PERCENTILES = (0.95, 0.99)
+    VAR_METHODS = ("historical", "parametric", "monte_carlo")
+
+    @staticmethod
+    def cached(result_cache, action, compute, data_version, **parameters):
+        """`compute()`, memoized in `result_cache` (computed every time when there is no cache)."""
+        if result_cache is None:
+            return compute()
+        return result_cache.get_or_compute(action, compute, data_version, **parameters)
+
+    @staticmethod
+    def normalize_date(value):
+        # One form per date, so '2021-01-01' and '2021-1-1' share their memoized results
+        return None if value is None else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _rows(simulation: ARXPortfolioSimulation, start_date=None, end_date=None) -> np.ndarray:
+        dates = pd.to_datetime(simulation.dates)
+        selected = np.ones(len(dates), dtype=bool)
+        if start_date is not None:
+            selected &= dates >= pd.Timestamp(start_date)
+        if end_date is not None:
+            selected &= dates <= pd.Timestamp(end_date)
+        return np.flatnonzero(selected)
+
+    @staticmethod
+    def yield_changes(simulation: ARXPortfolioSimulation, weights: dict, start_date=None,
+                      end_date=None) -> pd.DataFrame:
+        """
+        Day-to-day changes of the portfolio's instruments within a date range, in the order of the weights.
+
+        The first date of the range has no change, as if only the range had been loaded.
+        """
+        if not set(weights.keys()).issubset(set(simulation.instruments)):
+            raise ValueError("Some keys in the provided weights are not included in the data columns.")
+
+        rows = ARXRiskActions._rows(simulation, start_date, end_date)
+        columns = simulation.instruments.get_indexer(list(weights.keys()))
+        changes = simulation.calculate_yield_changes()[np.ix_(rows, columns)]
+        if len(rows):
+            changes[0] = 0
+        return pd.DataFrame(changes, index=simulation.dates[rows], columns=list(weights.keys()))
+
+    @staticmethod
+    def simulate(simulation: ARXPortfolioSimulation, weights: dict, start_date=None, end_date=None,
+                 result_cache=None, data_version=None) -> pd.Series:
+        """The portfolio's daily yield change within a date range."""
+        if abs(sum(weights.values()) - 1) > 1e-9:
+            raise ValueError("Weights must sum to 1.")
+
+        def compute():
+            changes = ARXRiskActions.yield_changes(simulation, weights, start_date, end_date)
+            return pd.Series(changes.to_numpy() @ np.array(list(weights.values()), dtype=float),
+                             index=changes.index, name="PortfolioDeltaYield")
+
+        return ARXRiskActions.cached(result_cache, "simulate", compute, data_version, weights=weights,
+                                     start_date=ARXRiskActions.normalize_date(start_date),
+                                     end_date=ARXRiskActions.normalize_date(end_date))
+
+    @staticmethod
+    def var(simulation: ARXPortfolioSimulation, weights: dict, start_date=None, end_date=None,
+            percentiles=PERCENTILES, methods=VAR_METHODS, paths=1_000_000, workers=None, seed=None,
+            result_cache=None, data_version=None) -> dict:
+        """
+        VaR and Expected Shortfall of a portfolio with each method.
+
+        Parameters:
+        - simulation (ARXPortfolioSimulation): The yield data.
+        - weights (dict): Portfolio weights by instrument name.
+        - start_date, end_date: Date range of the returns (inclusive, None for all dates).
+        - percentiles (list): Confidence levels.
+        - methods (list): Any of 'historical', 'parametric' and 'monte_carlo'.
+        - paths, workers, seed: Monte Carlo settings.
+        - result_cache (ARXResultCache): Memoizes the result of each method (None to always compute). Unseeded
+                                         Monte Carlo results are never memoized: each run draws other paths.
+        - data_version: Version of the simulation's yield data, part of the memoization key.
+
+        Returns:
+        - dict: Per method and percentile, {'var': ..., 'es': ...}; the Monte Carlo results also include
+                'diagnostics'.
+        """
+        if not set(weights.keys()).issubset(set(simulation.instruments)):
+            raise ValueError("Some keys in the provided weights are not included in the data columns.")
+        inputs = {}
+
+        def portfolio():
+            # Only computed when a method is not memoized, and then once for every method
+            if not inputs:
+                inputs["changes"] = ARXRiskActions.yield_changes(simulation, weights, start_date, end_date)
+                inputs["portfolio"] = ARXRiskActions.simulate(simulation, weights, start_date, end_date)
+            return inputs["changes"], inputs["portfolio"]
+
+        def compute(method):
+            changes, portfolio_delta_yield = portfolio()
+            if method == "historical":
+                strategy = ARXHistoricalSimulation()
+            elif method == "parametric":
+                strategy = ARXParametricSimulation()
+            else:
+                strategy = ARXMonteCarloSimulation(changes, list(weights.values()), paths=paths, workers=workers,
+                                                   seed=seed, verbose=False)
+
+            pairs = ARXVaRCalculator(strategy=strategy).compute_with_es(portfolio_delta_yield, list(percentiles))
+            result = {str(percentile): {"var": float(var), "es": float(es)}
+                      for percentile, (var, es) in zip(percentiles, pairs)}
+            if method == "monte_carlo":
+                diagnostics = strategy.diagnostics
+                result["diagnostics"] = {"paths": diagnostics["paths"], "seconds": diagnostics["seconds"],
+                                         "paths_per_second": diagnostics["paths_per_second"]}
+            return result
+
+        results = {}
+        for method in methods:
+            if method not in ARXRiskActions.VAR_METHODS:
+                raise ValueError(f"Unknown VaR method: {method}")
+            # The Monte Carlo settings only key the Monte Carlo results, and only a seeded run is reproducible
+            settings = {"paths": paths, "seed": seed} if method == "monte_carlo" else {}
+            memo = None if method == "monte_carlo" and seed is None else result_cache
+            results[method] = ARXRiskActions.cached(
+                memo, "var", lambda: compute(method), data_version, weights=weights,
+                start_date=ARXRiskActions.normalize_date(start_date), end_date=ARXRiskActions.normalize_date(end_date),
+                method=method, percentiles=list(percentiles), **settings)
+        return results
+
+    @staticmethod
+    def dv01(df: pd.DataFrame, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        DV01 per US Treasury instrument on the first day of each month.
+
+        Parameters:
+        - df (pd.DataFrame): Long-format yield data ('InstrumentName', 'Date', 'Yield').
+
+        Returns:
+        - pd.DataFrame: One row per date and one column per instrument.
+        """
+        df = df[df["InstrumentName"].astype(str).str.startswith("US_TREASURY_")].copy()
+
+        # Convert the 'Date' column to a datetime object
+        df['Date'] = pd.to_datetime(df['Date'])
+        if start_date is not None:
+            df = df[df['Date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df['Date'] <= pd.Timestamp(end_date)]
+        df = df[df['Date'].dt.day == 1].copy()
+        df['InstrumentName'] = df['InstrumentName'].astype(str)
+        df['DV01'] = ARXUsTreasuryDV01Calc.dv01_frame(df)
+
+        # Group by 'InstrumentName' and 'Date', then get the first value for each group
+        grouped_df = df.groupby(['InstrumentName', 'Date'], observed=True).first().reset_index()
+
+        return grouped_df.pivot(index='Date', columns='InstrumentName', values='DV01')
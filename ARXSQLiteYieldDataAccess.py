@@ -0,0 +1,110 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from ARXConnectionPool import ARXConnectionPool
+from ARXYieldDataStore import ARXYieldDataStore
+
+
+class ARXSQLiteYieldDataAccess(ARXYieldDataStore):
+    """
+    ARXSQLiteYieldDataAccess is the embedded, file-based backend of ARXYieldDataStore.
+
+    It stores the yield data in a local SQLite database, so analytics, tests and laptop sessions can run
+    in-process without a SQL Server. The queries live in the 'sqlite' subdirectory of the SQL directory
+    and the schema scripts in 'sqlite/setup'. Dates are stored as ISO-8601 text, which sorts chronologically.
+
+    Select it with the following entries in config.json:
+        "backend": "sqlite",
+        "database_path": "data/ARXFinance.db"
+
+    Attributes:
+        data_directory (Path): Directory containing the source CSV files to be inserted into the database.
+        config_directory (Path): Directory containing the JSON configuration file.
+        sql_directory (Path): Directory containing the SQLite query files.
+        database_path (Path): Path of the SQLite database file.
+        pool (ARXConnectionPool): Connection pool shared by every data access object using the same file.
+    """
+    DATABASE_ERRORS = (sqlite3.Error,)
+
+    def __init__(self, data_directory, config_directory, sql_directory):
+        super().__init__(data_directory, Path(config_directory), Path(sql_directory) / "sqlite")
+        self.pool_size = 5
+        self.database_path = self.load_database_config()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn_str = str(self.database_path)
+        self.pool = ARXConnectionPool.shared(self.conn_str, size=self.pool_size, connect=self.connect)
+
+        self.date_range_query = self.load_sql_query('GetYieldDataByDateRange.sql')
+        self.updated_since_query = self.load_sql_query('GetYieldDataUpdatedSince.sql')
+        self.filtered_query = self.load_sql_query('GetYieldDataFiltered.sql')
+        self.distinct_instruments_query = self.load_sql_query('GetDistinctInstruments.sql')
+
+    def load_database_config(self):
+        try:
+            # Load database configuration from config.json
+            with open(self.config_directory / 'config.json', 'r') as config_file:
+                config = json.load(config_file)
+
+            self.pool_size = int(config.get('pool_size', self.pool_size))
+            return Path(config.get('database_path', Path("data") / "ARXFinance.db"))
+        except (FileNotFoundError, ValueError) as e:
+            raise Exception("Error loading database configuration from config.json") from e
+
+    @staticmethod
+    def connect(database_path):
+        # Pooled connections are handed between threads; the pool guarantees one user at a time.
+        conn = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _date_param(self, value):
+        return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+    def _timestamp_param(self, value):
+        return pd.Timestamp(value).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    def verify_db_config(self):
+        """Verify the database by checking the existence of the YieldData table."""
+        try:
+            with self.pool.connection() as conn:
+                conn.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'YieldData'")
+                if not conn.cursor.fetchone():
+                    return False, "YieldData table does not exist in the database."
+
+            return True, "Database configuration has been verified successfully."
+
+        except sqlite3.Error as e:
+            return False, f"Error: {e}"
+
+    def setup_database(self):
+        """Create the YieldData table and its indexes from the scripts in the setup directory."""
+        sql_files = sorted(file for file in (self.sql_directory / "setup").iterdir() if file.suffix == '.sql')
+        if not sql_files:
+            print("No SQL files found in the specified directory.")
+            return
+
+        with self.pool.connection() as conn:
+            for sql_file in sql_files:
+                with open(sql_file, 'r', encoding='utf-8') as f:
+                    try:
+                        conn.connection.executescript(f.read())
+                        conn.commit()
+                        print(f"Executed {sql_file.name} successfully.")
+                    except sqlite3.Error as e:
+                        print(f"Error executing {sql_file.name}: {e}")
+
+    def execute_insert(self):
+        # Executing in-process, the batched upsert is the row-by-row path without the round-trips
+        return self.execute_bulk_insert()
+
+    def _begin_bulk(self, cursor):
+        self._upsert_query = self.load_sql_query('InsertDataYields.sql')
+
+    def _write_batch(self, cursor, rows, date_updated):
+        date_updated = self._timestamp_param(date_updated)
+        dates = pd.to_datetime(rows['Date']).dt.strftime("%Y-%m-%d")
+        cursor.executemany(self._upsert_query,
+                           zip(rows['InstrumentName'], dates, rows['Yield'], [date_updated] * len(rows)))
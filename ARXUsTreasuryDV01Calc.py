@@ -1,5 +1,10 @@
 from pathlib import Path
-from ARXYieldDataAccess import ARXYieldDataAccess
+
+import numpy as np
+import pandas as pd
+
+from ARXInstrumentRegistry import ARXInstrumentRegistry
+from ARXYieldDataStore import ARXYieldDataStore
 
 
 class ARXUsTreasuryDV01Calc:
@@ -109,27 +114,15 @@ class ARXUsTreasuryDV01Calc:
         # Convert the yield from percentage to a decimal (e.g., 2.5% -> 0.025)
         yield_rate = row['Yield'] / 100
 
-        # Parse the time to maturity from the instrument name
-        # Extract the last two parts of the instrument name (e.g., '10_YR' from 'US_TREASURY_10_YR')
-        maturity_str = '_'.join(instrument.split('_')[-2:])
-
-        # Check if the instrument is a T-Bill with maturity in months
-        if 'MO' in maturity_str:
-            # Convert the maturity string to a numerical value and then to years
-            # For instance, '3_MO' becomes 3/12 = 0.25 years
-            time_to_maturity = int(maturity_str.replace('MO', '').replace('_', '')) / 12
-        # Check if the instrument has a maturity in years
-        elif 'YR' in maturity_str:
-            # Convert the maturity string to a numerical value
-            # For instance, '10_YR' becomes 10 years
-            time_to_maturity = int(maturity_str.replace('YR', '').replace('_', ''))
-        else:
+        # Look up the time to maturity and the bond type parsed from the instrument name (memoized per name)
+        record = ARXInstrumentRegistry.shared().get(instrument)
+        if record.bond_type == ARXInstrumentRegistry.UNKNOWN:
             # Raise an error for unknown maturity formats
             raise ValueError(f"Unknown maturity format in instrument: {instrument}")
+        time_to_maturity = record.tenor_years
 
-        # Determine the type of treasury instrument based on its maturity
         # T-Bills and 1-Year T-Notes are considered zero-coupon
-        if 'MO' in maturity_str or '1_YR' in maturity_str:
+        if record.bond_type == ARXInstrumentRegistry.ZERO_COUPON:
             treasury = ARXUsTreasuryDV01Calc(face_value=1000, yield_rate=yield_rate, time_to_maturity=time_to_maturity)
         else:
             # For other maturities, assume they are coupon bonds and set the coupon rate to be equal to the yield
@@ -141,14 +134,125 @@ class ARXUsTreasuryDV01Calc:
         # Return the computed DV01 for the instrument
         return treasury.dv01
 
+    @staticmethod
+    def zero_coupon_price_array(face_value, yield_rates, times_to_maturity):
+        """
+        Vectorized counterpart of `zero_coupon_price` operating on whole NumPy arrays.
+
+        Parameters:
+        - face_value (float): The face value of the bonds.
+        - yield_rates (np.ndarray): Market yield rates as decimals.
+        - times_to_maturity (np.ndarray): Times to maturity in years.
+
+        Returns:
+        - np.ndarray: The present value prices of the zero-coupon bonds.
+        """
+        return face_value / (1 + yield_rates) ** times_to_maturity
+
+    @staticmethod
+    def coupon_bond_price_array(face_value, yield_rates, times_to_maturity, coupon_rates):
+        """
+        Vectorized counterpart of `coupon_bond_price` operating on whole NumPy arrays.
+
+        Instead of discounting each coupon in a loop, the coupon stream is valued with the closed-form annuity
+        factor (1 - (1 + r)^-n) / r, where r is the semi-annual yield and n the number of coupon periods.
+
+        Parameters:
+        - face_value (float): The face value of the bonds.
+        - yield_rates (np.ndarray): Market yield rates as decimals.
+        - times_to_maturity (np.ndarray): Times to maturity in years.
+        - coupon_rates (np.ndarray): Coupon rates as decimals.
+
+        Returns:
+        - np.ndarray: The present value prices of the coupon-paying bonds.
+        """
+
+        # Same conventions as the scalar path: semi-annual periods and a coupon of coupon_rate * face_value.
+        coupon = coupon_rates * face_value
+        periods = np.floor(times_to_maturity * 2)
+        period_rate = yield_rates / 2
+
+        discount = (1 + period_rate) ** -periods
+
+        # The annuity factor degenerates to the number of periods when the yield is zero.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity = np.where(period_rate == 0, periods, (1 - discount) / period_rate)
+
+        return coupon * annuity + face_value * discount
+
+    @staticmethod
+    def dv01_array(yield_rates, times_to_maturity, coupon_rates, face_value=1000):
+        """
+        Compute the DV01 of many bonds at once.
+
+        Parameters:
+        - yield_rates (array-like): Market yield rates as decimals.
+        - times_to_maturity (array-like): Times to maturity in years.
+        - coupon_rates (array-like): Coupon rates as decimals; NaN marks a zero-coupon bond.
+        - face_value (float): The face value of the bonds.
+
+        Returns:
+        - np.ndarray: The DV01 of each bond.
+        """
+        delta = 0.0001
+
+        yield_rates = np.asarray(yield_rates, dtype=float)
+        times_to_maturity = np.asarray(times_to_maturity, dtype=float)
+        coupon_rates = np.asarray(coupon_rates, dtype=float)
+        is_zero_coupon = np.isnan(coupon_rates)
+
+        zero_dv01 = (ARXUsTreasuryDV01Calc.zero_coupon_price_array(face_value, yield_rates, times_to_maturity)
+                     - ARXUsTreasuryDV01Calc.zero_coupon_price_array(face_value, yield_rates + delta,
+                                                                     times_to_maturity))
+
+        coupon_dv01 = (ARXUsTreasuryDV01Calc.coupon_bond_price_array(face_value, yield_rates, times_to_maturity,
+                                                                     coupon_rates)
+                       - ARXUsTreasuryDV01Calc.coupon_bond_price_array(face_value, yield_rates + delta,
+                                                                       times_to_maturity, coupon_rates))
+
+        return np.where(is_zero_coupon, zero_dv01, coupon_dv01)
+
+    @staticmethod
+    def dv01_frame(df):
+        """
+        Compute the DV01 for every row of a DataFrame of instrument data in one vectorized pass.
+
+        This returns the same values as applying `compute_dv01` row by row, but the rows are joined to the
+        instrument registry on integer ids and the bonds are priced with NumPy array arithmetic.
+
+        Parameters:
+        - df: A Pandas DataFrame containing yield data with 'InstrumentName' and 'Yield' columns.
+
+        Returns:
+        - pd.Series: The DV01 of each row, aligned with the index of df.
+        """
+
+        # Translate the instrument names to registry ids and look the terms up by id.
+        registry = ARXInstrumentRegistry.shared()
+        instrument_ids = registry.ids(df['InstrumentName'])
+        times_to_maturity = registry.tenor_years()[instrument_ids]
+        is_zero_coupon = registry.zero_coupon()[instrument_ids]
+
+        unknown = np.isnan(times_to_maturity)
+        if unknown.any():
+            instrument = df['InstrumentName'].to_numpy()[unknown.argmax()]
+            raise ValueError(f"Unknown maturity format in instrument: {instrument}")
+
+        yield_rates = df['Yield'].to_numpy(dtype=float) / 100
+
+        # Coupon rate equals the yield until coupon data is available (see compute_dv01).
+        coupon_rates = np.where(is_zero_coupon, np.nan, yield_rates)
+
+        dv01 = ARXUsTreasuryDV01Calc.dv01_array(yield_rates, times_to_maturity, coupon_rates)
+        return pd.Series(dv01, index=df.index, name='DV01')
+
 
 if __name__ == "__main__":
     start_date = "2021-01-01"
     end_date = "2023-01-01"
 
-    yield_data_access = ARXYieldDataAccess(data_directory=Path("sources"), config_directory=Path("config"),
-                                           sql_directory=Path("SQL"))
-    df = yield_data_access.execute_get_yield_data_by_date_range(start_date, end_date)
-    df = df[df["InstrumentName"].str.startswith("US_TREASURY_")]
-    df['DV01'] = df.apply(ARXUsTreasuryDV01Calc.compute_dv01, axis=1)
+    yield_data_access = ARXYieldDataStore.create(data_directory=Path("sources"), config_directory=Path("config"),
+                                                 sql_directory=Path("SQL"))
+    df = yield_data_access.execute_get_filtered_yield_data(start_date, end_date, instrument_prefix="US_TREASURY_")
+    df['DV01'] = ARXUsTreasuryDV01Calc.dv01_frame(df)
     print(df[["InstrumentName", "DV01"]])
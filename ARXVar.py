@@ -1,5 +1,11 @@
+import bisect
 import math
+import os
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 
 from scipy.stats import norm
@@ -11,6 +17,134 @@ class ARXVaRStrategy(ABC):
     def calculate(self, df: pd.DataFrame, percentile: float):
         pass
 
+    def calculate_many(self, series: pd.Series, percentiles):
+        """Return the VaR for each of the percentiles, in the same order."""
+        return [var for var, _ in self.calculate_with_es(series, percentiles)]
+
+    def calculate_batch(self, df: pd.DataFrame, percentiles) -> pd.DataFrame:
+        """
+        Return the VaR of every column (e.g. every portfolio of ARXPortfolioSimulation.simulate_batch).
+
+        Returns:
+        - pd.DataFrame: One row per percentile and one column per column of `df`.
+        """
+        return pd.DataFrame({column: self.calculate_many(df[column], percentiles) for column in df.columns},
+                            index=pd.Index(percentiles, name="Percentile"))
+
+    @abstractmethod
+    def calculate_with_es(self, series: pd.Series, percentiles):
+        """
+        Return the VaR and the Expected Shortfall (the mean return beyond the VaR) for each of the percentiles,
+        from a single pass over the data.
+
+        Returns:
+        - list: A (VaR, ES) pair for each percentile, in the same order.
+        """
+        pass
+
+    def rolling_tracker(self, window: int, percentile: float):
+        """
+        Return a tracker that updates the VaR of a trailing window one observation at a time. Strategies with
+        rolling VaR support override this.
+        """
+        raise NotImplementedError(f"Rolling VaR is not supported by {type(self).__name__}.")
+
+    def calculate_rolling(self, series: pd.Series, percentile: float, window: int):
+        """
+        Calculate the VaR over a trailing window for every date.
+
+        Parameters:
+        - series (pd.Series): The returns, in date order.
+        - percentile (float): Confidence level between 0 and 1 (e.g., 0.95).
+        - window (int): Number of observations in the trailing window (e.g., 250).
+
+        Returns:
+        - pd.Series: VaR per date, NaN until the window has filled.
+        """
+        tracker = self.rolling_tracker(window, percentile)
+        values = [tracker.update(value) for value in np.asarray(series, dtype=float)]
+        return pd.Series(values, index=series.index, name="VaR", dtype=float)
+
+
+class ARXRollingHistoricalVaR:
+    """
+    Historical VaR of a trailing window, updated as the window slides.
+
+    The window is kept both in arrival order (to know which observation leaves) and sorted (to read the
+    order statistic). Each update inserts and removes one value with a binary search instead of re-sorting
+    the whole window.
+
+    Attributes:
+        window (int): Number of observations in the window.
+        percentile (float): Confidence level between 0 and 1.
+    """
+
+    def __init__(self, window: int, percentile: float):
+        if window < 1:
+            raise ValueError("Window should be at least 1.")
+        if not (0 <= percentile <= 1):
+            raise ValueError("Percentile should be between 0 and 1.")
+        self.window = window
+        self.percentile = percentile
+        self.index = (math.ceil((1 - percentile) * window) - 1) % window
+        self.values = deque()
+        self.sorted_values = []
+
+    def update(self, value: float):
+        """Add the next observation and return the VaR of the window (NaN until it has filled)."""
+        self.values.append(value)
+        bisect.insort(self.sorted_values, value)
+        if len(self.values) > self.window:
+            oldest = self.values.popleft()
+            del self.sorted_values[bisect.bisect_left(self.sorted_values, oldest)]
+
+        if len(self.values) < self.window:
+            return math.nan
+        return self.sorted_values[self.index]
+
+
+class ARXRollingParametricVaR:
+    """
+    Parametric VaR of a trailing window, updated as the window slides.
+
+    The mean and the sum of squared deviations are kept with Welford's updates, adding the new observation
+    and removing the one leaving the window, so each update is constant time.
+
+    Attributes:
+        window (int): Number of observations in the window.
+        percentile (float): Confidence level between 0 and 1.
+    """
+
+    def __init__(self, window: int, percentile: float):
+        if window < 2:
+            raise ValueError("Window should be at least 2.")
+        self.window = window
+        self.percentile = percentile
+        self.z_score = norm.ppf(1 - percentile)
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, value: float):
+        """Add the next observation and return the VaR of the window (NaN until it has filled)."""
+        self.values.append(value)
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self.m2 += delta * (value - self.mean)
+
+        if len(self.values) > self.window:
+            oldest = self.values.popleft()
+            delta = oldest - self.mean
+            self.mean -= delta / len(self.values)
+            self.m2 -= delta * (oldest - self.mean)
+
+        if len(self.values) < self.window:
+            return math.nan
+
+        # Sample standard deviation, as Series.std()
+        std_dev = math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+        return self.mean + self.z_score * std_dev
+
 
 # Implement Historical Simulation as an ARX VaR Strategy
 class ARXHistoricalSimulation(ARXVaRStrategy):
@@ -27,19 +161,58 @@ class ARXHistoricalSimulation(ARXVaRStrategy):
     """
 
     def calculate(self, series: pd.Series, percentile: float):
-        if not (0 <= percentile <= 1):
-            raise ValueError("Percentile should be between 0 and 1.")
+        return self.calculate_many(series, [percentile])[0]
+
+    def calculate_with_es(self, series: pd.Series, percentiles):
+        """
+        Return the VaR and Expected Shortfall for each of the percentiles from a single selection pass over
+        the returns.
+
+        Only the positions needed are put in order (np.partition), instead of fully sorting the returns
+        once per percentile. The Expected Shortfall is the mean of the returns up to and including the VaR
+        position, which the partition has already gathered in front of it.
+
+        Parameters:
+        - series (pd.Series): The returns.
+        - percentiles (list): Confidence levels between 0 and 1 (e.g., [0.95, 0.99]).
+
+        Returns:
+        - list: A (VaR, ES) pair for each percentile, in the same order.
+        """
+        for percentile in percentiles:
+            if not (0 <= percentile <= 1):
+                raise ValueError("Percentile should be between 0 and 1.")
 
         # Check if Series is empty
         if series.empty:
             raise ValueError("The provided Series is empty.")
 
-        sorted_returns = sorted(series.tolist())
+        returns = np.asarray(series, dtype=float)
+        n = len(returns)
 
-        # Calculate the desired position in the sorted list to find the VaR.
-        index = math.ceil((1 - percentile) * len(sorted_returns)) - 1
+        # Calculate the desired position in the sorted returns to find each VaR. A 100% percentile gives -1,
+        # which (as with list indexing) is the last position.
+        indexes = [(math.ceil((1 - percentile) * n) - 1) % n for percentile in percentiles]
 
-        return sorted_returns[index]
+        partitioned = np.partition(returns, sorted(set(indexes)))
+        return [(partitioned[index], partitioned[:index + 1].mean()) for index in indexes]
+
+    def calculate_batch(self, df: pd.DataFrame, percentiles) -> pd.DataFrame:
+        # One partition along the dates selects the VaR positions of every column at once
+        for percentile in percentiles:
+            if not (0 <= percentile <= 1):
+                raise ValueError("Percentile should be between 0 and 1.")
+        if df.empty:
+            raise ValueError("The provided DataFrame is empty.")
+
+        n = len(df)
+        indexes = [(math.ceil((1 - percentile) * n) - 1) % n for percentile in percentiles]
+        partitioned = np.partition(df.to_numpy(dtype=float), sorted(set(indexes)), axis=0)
+        return pd.DataFrame(partitioned[indexes], index=pd.Index(percentiles, name="Percentile"),
+                            columns=df.columns)
+
+    def rolling_tracker(self, window: int, percentile: float):
+        return ARXRollingHistoricalVaR(window, percentile)
 
 
 class ARXParametricSimulation(ARXVaRStrategy):
@@ -53,11 +226,215 @@ class ARXParametricSimulation(ARXVaRStrategy):
         # Get the z-score for the given percentile
         z_score = norm.ppf(1 - percentile)
 
-        # Calculate VaR
-        var = -(mean_return - z_score * std_dev)
+        # Calculate VaR: the return at the percentile's quantile of the fitted normal distribution
+        var = mean_return + z_score * std_dev
 
         return var
 
+    def calculate_with_es(self, series: pd.Series, percentiles):
+        # The mean and standard deviation are computed once for all percentiles
+        mean_return = series.mean()
+        std_dev = series.std()
+        z_scores = norm.ppf([1 - percentile for percentile in percentiles])
+
+        # As for the other strategies, the VaR is the return at the quantile and the Expected Shortfall the mean
+        # return in the tail beyond it, both of the same normal distribution:
+        #   VaR = mean + z * std and ES = mean - std * φ(z) / (1 - p), with φ the standard normal density
+        return [(mean_return + z_score * std_dev, mean_return - std_dev * norm.pdf(z_score) / (1 - percentile))
+                for z_score, percentile in zip(z_scores, percentiles)]
+
+    def calculate_batch(self, df: pd.DataFrame, percentiles) -> pd.DataFrame:
+        # Column means and standard deviations, then every (percentile, column) VaR by broadcasting
+        z_scores = norm.ppf([1 - percentile for percentile in percentiles])
+        var = df.mean().to_numpy() + np.outer(z_scores, df.std().to_numpy())
+        return pd.DataFrame(var, index=pd.Index(percentiles, name="Percentile"), columns=df.columns)
+
+    def rolling_tracker(self, window: int, percentile: float):
+        return ARXRollingParametricVaR(window, percentile)
+
+
+def _simulate_chunk(mean, factor, weights, size, seed_sequence, tail_size, indexes):
+    """
+    Simulate one chunk of Monte Carlo paths in a worker process.
+
+    Returns the `tail_size` worst portfolio returns of the chunk (all that is needed to merge the VaR of the
+    whole run), the chunk's own VaR at each of the `indexes` (for the convergence diagnostics), and the sum and
+    sum of squares of its portfolio returns.
+    """
+    rng = np.random.default_rng(seed_sequence)
+
+    # Correlated yield changes: mean + Z L^T, with L the Cholesky factor of the covariance
+    scenarios = mean + rng.standard_normal((size, len(mean))) @ factor.T
+    returns = scenarios @ weights
+
+    tail_size = min(tail_size, size)
+    tail = np.sort(np.partition(returns, tail_size - 1)[:tail_size])
+    return tail, tail[indexes], returns.sum(), np.square(returns).sum()
+
+
+class ARXMonteCarloSimulation(ARXVaRStrategy):
+    """
+    This class implements the Monte Carlo method for calculating Value at Risk (VaR).
+
+    Yield-change scenarios are drawn from a multivariate normal distribution with the mean and covariance of
+    the instruments' historical daily yield changes (ARXPortfolioSimulation.delta_yield), so the correlation
+    between maturities is preserved. Each scenario is valued with the portfolio weights and the VaR is read
+    from the simulated portfolio returns with the same index convention as the Historical Simulation.
+
+    The paths are simulated in fixed-size chunks spread over a process pool. A chunk only hands back its worst
+    returns and the run only keeps the worst ceil((1 - p) * paths) of them, so memory grows with the tail of
+    the deepest percentile p rather than with every path. Every chunk gets its own seed spawned from `seed`,
+    so a run is reproducible whatever the number of workers.
+
+    After each run `diagnostics` holds the number of paths, the throughput in paths per second and, per
+    percentile, the VaR with its standard error estimated from the spread of the chunk VaRs.
+
+    Attributes:
+        delta_yield (pd.DataFrame): Daily yield changes per instrument (None to use the returns passed in).
+        weights (list): Portfolio weights in the column order of `delta_yield`.
+        paths (int): Number of simulated paths.
+        chunk_size (int): Paths simulated per chunk.
+        workers (int): Worker processes (None for one per CPU, 1 to simulate in-process).
+        seed (int): Seed of the run.
+        verbose (bool): Print the diagnostics after each run.
+    """
+
+    def __init__(self, delta_yield: pd.DataFrame = None, weights=None, paths=1_000_000, chunk_size=100_000,
+                 workers=None, seed=None, verbose=True):
+        self.delta_yield = delta_yield
+        self.weights = weights
+        self.paths = paths
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.seed = seed
+        self.verbose = verbose
+        self.diagnostics = None
+
+    @classmethod
+    def from_portfolio(cls, simulation, **kwargs) -> 'ARXMonteCarloSimulation':
+        """Create the strategy from the yield changes and weights of an ARXPortfolioSimulation."""
+        return cls(simulation.delta_yield, simulation.weights, **kwargs)
+
+    def calculate(self, series: pd.Series, percentile: float):
+        return self.calculate_many(series, [percentile])[0]
+
+    def calculate_with_es(self, series: pd.Series, percentiles):
+        """
+        Simulate the portfolio returns once and return the VaR and Expected Shortfall for each of the
+        percentiles.
+
+        Parameters:
+        - series (pd.Series): The portfolio returns; only used when no `delta_yield` was given, in which
+                              case the scenarios are drawn from their own mean and variance.
+        - percentiles (list): Confidence levels between 0 and 1 (e.g., [0.95, 0.99]).
+
+        Returns:
+        - list: A (VaR, ES) pair for each percentile, in the same order.
+        """
+        for percentile in percentiles:
+            if not (0 <= percentile <= 1):
+                raise ValueError("Percentile should be between 0 and 1.")
+
+        if self.delta_yield is not None:
+            changes = np.asarray(self.delta_yield, dtype=float)
+            weights = np.asarray(self.weights, dtype=float)
+        else:
+            if series.empty:
+                raise ValueError("The provided Series is empty.")
+            changes = np.asarray(series, dtype=float).reshape(-1, 1)
+            weights = np.ones(1)
+
+        mean = changes.mean(axis=0)
+        factor = self.cholesky(np.atleast_2d(np.cov(changes, rowvar=False)))
+
+        # Each chunk keeps enough of its worst returns to find the deepest percentile of the whole run
+        chunk_sizes = [self.chunk_size] * (self.paths // self.chunk_size)
+        if self.paths % self.chunk_size:
+            chunk_sizes.append(self.paths % self.chunk_size)
+        # A 100% VaR is the single worst return, so at least one return is kept
+        tail_size = max(1, max(math.ceil((1 - percentile) * self.paths) for percentile in percentiles))
+        chunk_indexes = [[max(math.ceil((1 - percentile) * size), 1) - 1 for percentile in percentiles]
+                         for size in chunk_sizes]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+
+        arguments = ([mean] * len(chunk_sizes), [factor] * len(chunk_sizes), [weights] * len(chunk_sizes),
+                     chunk_sizes, seeds, [tail_size] * len(chunk_sizes), chunk_indexes)
+
+        start_time = time.perf_counter()
+        workers = self.workers or os.cpu_count() or 1
+        if workers == 1 or len(chunk_sizes) == 1:
+            tail, results = self._merge_chunks(map(_simulate_chunk, *arguments), tail_size)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunk_sizes))) as executor:
+                tail, results = self._merge_chunks(executor.map(_simulate_chunk, *arguments), tail_size)
+        elapsed = time.perf_counter() - start_time
+
+        indexes = [max(math.ceil((1 - percentile) * self.paths), 1) - 1 for percentile in percentiles]
+        tail = np.partition(tail, sorted(set(indexes)))
+        var = [(tail[index], tail[:index + 1].mean()) for index in indexes]
+
+        self.diagnostics = self._diagnostics(percentiles, var, results, elapsed)
+        if self.verbose:
+            self.report_diagnostics()
+        return var
+
+    @staticmethod
+    def _merge_chunks(chunks, tail_size):
+        """
+        Merge the chunks as they complete, keeping only the `tail_size` worst returns of the run (they are among
+        the worst returns of its chunks) and the per-chunk VaRs, sums and sums of squares for the diagnostics.
+        """
+        tail = np.empty(0)
+        results = []
+        for chunk_tail, chunk_var, chunk_sum, chunk_squares in chunks:
+            tail = np.concatenate([tail, chunk_tail])
+            if len(tail) > tail_size:
+                tail = np.partition(tail, tail_size - 1)[:tail_size]
+            results.append((chunk_var, chunk_sum, chunk_squares))
+        return tail, results
+
+    @staticmethod
+    def cholesky(covariance: np.ndarray) -> np.ndarray:
+        """
+        Lower-triangular factor L with L L^T equal to the covariance. Instruments that never change (or move in
+        lockstep) make the covariance singular; those fall back to a factor from the eigendecomposition.
+        """
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+    def _diagnostics(self, percentiles, var, results, elapsed):
+        chunk_var = np.array([chunk for chunk, _, _ in results])
+        total = sum(chunk_sum for _, chunk_sum, _ in results)
+        total_squares = sum(chunk_squares for _, _, chunk_squares in results)
+        mean = total / self.paths
+        chunks = len(results)
+
+        return {
+            "paths": self.paths,
+            "chunks": chunks,
+            "seconds": elapsed,
+            "paths_per_second": self.paths / elapsed if elapsed > 0 else math.inf,
+            "mean": mean,
+            "std": math.sqrt(max(total_squares / self.paths - mean ** 2, 0.0)),
+            "var": {percentile: {
+                "var": value,
+                "es": es,
+                # Batch-means standard error: the spread of the chunk VaRs around each other
+                "standard_error": (chunk_var[:, i].std(ddof=1) / math.sqrt(chunks)) if chunks > 1 else math.nan,
+            } for i, (percentile, (value, es)) in enumerate(zip(percentiles, var))},
+        }
+
+    def report_diagnostics(self):
+        diagnostics = self.diagnostics
+        print(f"Simulated {diagnostics['paths']:,} paths in {diagnostics['chunks']} chunks in "
+              f"{diagnostics['seconds']:.2f}s ({diagnostics['paths_per_second']:,.0f} paths/sec)")
+        for percentile, result in diagnostics["var"].items():
+            print(f"VaR {percentile * 100:g}%: {result['var'] * 100:.4f}% "
+                  f"(standard error {result['standard_error'] * 100:.4f}%), ES {result['es'] * 100:.4f}%")
+
 
 # ARX VaR Calculator with Strategy Pattern
 class ARXVaRCalculator:
@@ -69,3 +446,15 @@ class ARXVaRCalculator:
 
     def compute(self, series: pd.Series, percentile: float):
         return self.strategy.calculate(series, percentile)
+
+    def compute_many(self, series: pd.Series, percentiles):
+        return self.strategy.calculate_many(series, percentiles)
+
+    def compute_with_es(self, series: pd.Series, percentiles):
+        return self.strategy.calculate_with_es(series, percentiles)
+
+    def compute_batch(self, df: pd.DataFrame, percentiles):
+        return self.strategy.calculate_batch(df, percentiles)
+
+    def compute_rolling(self, series: pd.Series, percentile: float, window: int):
+        return self.strategy.calculate_rolling(series, percentile, window)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from scipy.special import xlogy
+from scipy.stats import chi2
+
+
+class ARXVaRBacktest:
+    """
+    Backtests VaR forecasts against realized portfolio changes.
+
+    An exceedance is a date on which the realized change fell below the VaR forecast for that date. Two
+    likelihood-ratio tests are run on the exceedances:
+      - Kupiec's proportion of failures (unconditional coverage): is the exceedance rate 1 - percentile?
+      - Christoffersen's independence test: are exceedances independent of whether the previous date had one?
+    Their sum is Christoffersen's conditional coverage test.
+
+    Every column of the realized changes and the forecasts is a separate backtest (e.g. one per portfolio and
+    VaR strategy), and all of them are evaluated at once with array operations over dates and columns. A
+    forecast for a date must only use data up to the previous date, e.g. a rolling VaR shifted by one day.
+    Dates without a forecast (NaN, such as a rolling window still filling) are left out.
+
+    Attributes:
+        percentile (float): Confidence level the forecasts were made at (e.g., 0.99).
+    """
+
+    def __init__(self, percentile: float):
+        if not (0 < percentile < 1):
+            raise ValueError("Percentile should be between 0 and 1.")
+        self.percentile = percentile
+
+    @staticmethod
+    def align(realized, forecast):
+        """
+        Align realized changes and forecasts on their dates and columns.
+
+        A Series on either side is broadcast against the columns of a DataFrame on the other, so one
+        portfolio can be tested against several strategies (or one strategy against several portfolios).
+
+        Returns:
+        - (pd.DataFrame, pd.DataFrame): Realized changes and forecasts with the same index and columns.
+        """
+        if isinstance(realized, pd.Series) and isinstance(forecast, pd.Series):
+            name = forecast.name if forecast.name is not None else realized.name
+            realized, forecast = realized.to_frame(name), forecast.to_frame(name)
+        elif isinstance(realized, pd.Series):
+            realized = pd.DataFrame({column: realized for column in forecast.columns})
+        elif isinstance(forecast, pd.Series):
+            forecast = pd.DataFrame({column: forecast for column in realized.columns})
+
+        return realized.align(forecast, join="inner")
+
+    def exceedances(self, realized, forecast) -> pd.DataFrame:
+        """
+        Flag the dates on which the realized change fell below the VaR forecast.
+
+        Returns:
+        - pd.DataFrame: 1.0 for an exceedance, 0.0 otherwise and NaN where either value is missing.
+        """
+        realized, forecast = self.align(realized, forecast)
+        valid = realized.notna() & forecast.notna()
+        return (realized < forecast).astype(float).where(valid)
+
+    def run(self, realized, forecast) -> pd.DataFrame:
+        """
+        Run the coverage tests for every column.
+
+        Parameters:
+        - realized (pd.Series | pd.DataFrame): Realized portfolio changes per date, e.g. from
+                                               ARXPortfolioSimulation.get_portfolio_delta_yield().
+        - forecast (pd.Series | pd.DataFrame): VaR forecast per date, in the same sign convention (a loss
+                                               is negative).
+
+        Returns:
+        - pd.DataFrame: One row per column, with the number of observations and exceedances, the expected
+                        number of exceedances, the exceedance rate, and the likelihood ratio and p-value of the
+                        Kupiec, independence and conditional coverage tests.
+        """
+        hits = self.exceedances(realized, forecast)
+        flags = hits.to_numpy()
+        valid = ~np.isnan(flags)
+        exceeded = np.nan_to_num(flags).astype(bool)
+
+        observations = valid.sum(axis=0)
+        exceedance_count = exceeded.sum(axis=0)
+        expected_rate = 1 - self.percentile
+
+        # Kupiec: likelihood of the expected rate against the observed rate
+        with np.errstate(divide="ignore", invalid="ignore"):
+            observed_rate = exceedance_count / observations
+        kupiec = -2 * (self._log_likelihood(observations - exceedance_count, exceedance_count, expected_rate)
+                       - self._log_likelihood(observations - exceedance_count, exceedance_count, observed_rate))
+
+        # Christoffersen: transitions between consecutive dates that both have a forecast
+        pairs = valid[:-1] & valid[1:]
+        previous, current = exceeded[:-1], exceeded[1:]
+        n00 = (pairs & ~previous & ~current).sum(axis=0)
+        n01 = (pairs & ~previous & current).sum(axis=0)
+        n10 = (pairs & previous & ~current).sum(axis=0)
+        n11 = (pairs & previous & current).sum(axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pi01 = n01 / (n00 + n01)
+            pi11 = n11 / (n10 + n11)
+            pi = (n01 + n11) / (n00 + n01 + n10 + n11)
+        independence = -2 * (self._log_likelihood(n00 + n10, n01 + n11, pi)
+                             - self._log_likelihood(n00, n01, pi01) - self._log_likelihood(n10, n11, pi11))
+        conditional = kupiec + independence
+
+        return pd.DataFrame({
+            "observations": observations,
+            "exceedances": exceedance_count,
+            "expected": observations * expected_rate,
+            "exceedance_rate": observed_rate,
+            "kupiec_lr": kupiec,
+            "kupiec_p_value": chi2.sf(kupiec, 1),
+            "independence_lr": independence,
+            "independence_p_value": chi2.sf(independence, 1),
+            "conditional_lr": conditional,
+            "conditional_p_value": chi2.sf(conditional, 2),
+        }, index=hits.columns)
+
+    @staticmethod
+    def _log_likelihood(misses, hits, rate):
+        # Bernoulli log-likelihood; xlogy makes 0 * log(0) zero, so rates of 0 or 1 are handled
+        rate = np.nan_to_num(rate)
+        return xlogy(misses, 1 - rate) + xlogy(hits, rate)
@@ -13,28 +13,41 @@ class ARXVaRReport:
         # Empty line for spacing within the box.
         self.empty_line = '|' + ' ' * 28 + '|'
 
-    def generate(self, var_95, var_99):
+    def generate(self, var_95, var_99, es_95=None, es_99=None):
         """
         Generates and prints a formatted VaR report.
 
+        When the Expected Shortfall is given, it is shown in a column next to the VaR of the same
+        confidence level.
+
         Parameters:
         - var_95 (float): The computed VaR at 95% confidence level.
         - var_99 (float): The computed VaR at 99% confidence level.
+        - es_95 (float): The computed Expected Shortfall at 95% confidence level (optional).
+        - es_99 (float): The computed Expected Shortfall at 99% confidence level (optional).
         """
         # Convert the numeric VaR values to formatted strings.
         var_95_str = f"VaR 95%: {var_95 * 100:.2f}%"
         var_99_str = f"VaR 99%: {var_99 * 100:.2f}%"
 
+        border_line, empty_line, width = self.border_line, self.empty_line, 28
+        if es_95 is not None and es_99 is not None:
+            # Add the Expected Shortfall column and widen the box to fit it.
+            var_95_str = f"{var_95_str:<18}ES 95%: {es_95 * 100:.2f}%"
+            var_99_str = f"{var_99_str:<18}ES 99%: {es_99 * 100:.2f}%"
+            width = 44
+            border_line = '+' + '-' * width + '+'
+            empty_line = '|' + ' ' * width + '|'
+
         # Center-align the VaR strings within the box.
-        var_95_line = '|' + var_95_str.center(28) + '|'
-        var_99_line = '|' + var_99_str.center(28) + '|'
+        var_95_line = '|' + var_95_str.center(width) + '|'
+        var_99_line = '|' + var_99_str.center(width) + '|'
 
         # Print the formatted VaR report.
-        print(self.border_line)
-        print(self.empty_line)
+        print(border_line)
+        print(empty_line)
         print(var_95_line)
         print(var_99_line)
-        print(self.empty_line)
-        print(self.border_line)
+        print(empty_line)
+        print(border_line)
         print("VaR calculated.")
-
@@ -3,10 +3,14 @@ import pandas as pd
 from pathlib import Path
 import json
 
+from ARXConnectionPool import ARXConnectionPool
+from ARXYieldDataStore import ARXYieldDataStore
 
-class ARXYieldDataAccess:
+
+class ARXYieldDataAccess(ARXYieldDataStore):
     """
      ARXYieldDataAccess is responsible for providing direct interactions with a specified SQL database.
+     It is the SQL Server backend of ARXYieldDataStore.
 
      This class provides the ability to:
      - Verify if the database configuration is correct by checking the existence of specified tables and stored procedures.
@@ -18,14 +22,21 @@ class ARXYieldDataAccess:
          config_directory (Path): Directory containing the JSON configuration file for database connection.
          sql_directory (Path): Directory containing the SQL query files.
          conn_str (str): Connection string for the SQL Server database.
+         pool_size (int): Maximum number of pooled connections (optional 'pool_size' in config.json, default 5).
+         pool (ARXConnectionPool): Connection pool shared by every data access object using the same database.
 
      """
+    DATABASE_ERRORS = (pyodbc.Error,)
 
     def __init__(self, data_directory, config_directory, sql_directory):
-        self.data_directory = Path(data_directory)
-        self.config_directory = Path(config_directory)
-        self.sql_directory = Path(sql_directory)
+        super().__init__(data_directory, config_directory, sql_directory)
+        self.pool_size = 5
         self.conn_str = self.load_database_config()
+        self.pool = ARXConnectionPool.shared(self.conn_str, size=self.pool_size)
+        self.date_range_query = "EXEC GetYieldDataByDateRange ?, ?"
+        self.updated_since_query = "EXEC GetYieldDataUpdatedSince ?"
+        self.filtered_query = "EXEC GetYieldDataFiltered ?, ?, ?, ?, ?, ?, ?"
+        self.distinct_instruments_query = "EXEC GetDistinctInstruments ?, ?"
 
     def load_database_config(self):
         try:
@@ -35,116 +46,93 @@ class ARXYieldDataAccess:
 
             # Construct the connection string
             conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};UID={config['username']};PWD={config['password']}"
+            self.pool_size = int(config.get('pool_size', self.pool_size))
             return conn_str
-        except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
+        except (FileNotFoundError, KeyError, ValueError) as e:
             raise Exception("Error loading database configuration from config.json") from e
 
     def verify_db_config(self):
         """Verify database configuration by checking the existence of the YieldData table and the GetYieldDataByDateRange stored procedure."""
-        conn = None  # Initialize connection as None
-        cursor = None  # Initialize cursor as None
-
         try:
-            # Establish a connection to SQL Server
-            conn = pyodbc.connect(self.conn_str)
-            cursor = conn.cursor()
+            # Check out a pooled connection to SQL Server
+            with self.pool.connection() as conn:
+                return self._verify_schema(conn.cursor)
 
-            # Check the existence of the YieldData table
-            cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = 'YieldData'")
-            result = cursor.fetchone()
-            if not result:
-                return False, "YieldData table does not exist in the database."
+        except pyodbc.Error as e:
+            return False, f"Error: {e}"
 
-            # Check the existence of the GetYieldDataByDateRange stored procedure
-            cursor.execute(
-                "SELECT ROUTINE_NAME FROM INFORMATION_SCHEMA.ROUTINES WHERE ROUTINE_NAME = 'GetYieldDataByDateRange' AND ROUTINE_TYPE='PROCEDURE'")
-            result = cursor.fetchone()
-            if not result:
-                return False, "GetYieldDataByDateRange stored procedure does not exist in the database."
+    @staticmethod
+    def _verify_schema(cursor):
+        # Check the existence of the YieldData table
+        cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = 'YieldData'")
+        result = cursor.fetchone()
+        if not result:
+            return False, "YieldData table does not exist in the database."
 
-            return True, "Database configuration has been verified successfully."
+        # Check the existence of the GetYieldDataByDateRange stored procedure
+        cursor.execute(
+            "SELECT ROUTINE_NAME FROM INFORMATION_SCHEMA.ROUTINES WHERE ROUTINE_NAME = 'GetYieldDataByDateRange' AND ROUTINE_TYPE='PROCEDURE'")
+        result = cursor.fetchone()
+        if not result:
+            return False, "GetYieldDataByDateRange stored procedure does not exist in the database."
 
-        except pyodbc.Error as e:
-            return False, f"Error: {e}"
-        finally:
-            if cursor:  # Close only if cursor exists
-                cursor.close()
-            if conn:  # Close only if connection exists
-                conn.close()
+        return True, "Database configuration has been verified successfully."
 
     def load_insert_query(self):
-        try:
-            # Load SQL query from the InsertDataYields.sql file
-            with open(self.sql_directory / 'InsertDataYields.sql', 'r') as sql_file:
-                insert_query = sql_file.read()
-            return insert_query
-        except FileNotFoundError as e:
-            raise Exception("Error loading SQL query from InsertDataYields.sql") from e
+        return self.load_sql_query('InsertDataYields.sql')
 
     def execute_insert(self):
         insert_query = self.load_insert_query()
-        # Establish a connection to SQL Server
-        conn = pyodbc.connect(self.conn_str)
-
-        # Create a cursor
-        cursor = conn.cursor()
-
-        # Iterate through CSV files in the data directory
-        for csv_file in self.data_directory.glob('*.csv'):
-            print("Integrating csv data: ", csv_file)
-            df = pd.read_csv(csv_file)
-
-            # Iterate through the rows and insert data row by row
-            for index, row in df.iterrows():
-                instrument_name = row['InstrumentName']
-                date = row['Date']
-                yield_value = row['Yield']
-                if not isinstance(yield_value, float):
-                    continue
-                date_updated = pd.Timestamp.now()
-
-                # Execute the SQL query with placeholders
-                cursor.execute(
-                    insert_query,
-                    instrument_name, date, yield_value, date_updated
-                )
-
-        # Commit the transaction
-        conn.commit()
-
-        # Close the cursor and connection
-        cursor.close()
-        conn.close()
-
-    def execute_get_yield_data_by_date_range(self, start_date, end_date):
-        try:
-            # Establish a connection to SQL Server
-            conn = pyodbc.connect(self.conn_str)
-
-            # Create a cursor
-            cursor = conn.cursor()
-
-            # Execute the GetYieldDataByDateRange stored procedure with placeholders
-            cursor.execute("EXEC GetYieldDataByDateRange ?, ?", start_date, end_date)
-
-            # Fetch all rows and store them in a DataFrame
-            rows = []
-            row = cursor.fetchone()
-            pd.set_option('display.max_columns', None)  # Display all columns
-
-            while row:
-                rows.append(list(row))
-                row = cursor.fetchone()
-
-            df = pd.DataFrame(rows, columns=["Id", "InstrumentName", "Date", "Yield", "DateUpdated"])
-            return df
-
-        except pyodbc.Error as e:
-            print(f"Error: {e}")
-
-    def get_unique_instruments(self, df):
-        """Retrieve unique instrument names from the data fetched between the given date range."""
-        return sorted(df["InstrumentName"].unique().tolist())
+        # Check out a pooled connection to SQL Server
+        with self.pool.connection() as conn:
+            # The pooled cursor reuses the prepared MERGE statement across rows
+            cursor = conn.cursor
+
+            # Iterate through CSV files in the data directory
+            for csv_file in self.data_directory.glob('*.csv'):
+                print("Integrating csv data: ", csv_file)
+                df = pd.read_csv(csv_file)
+
+                # Iterate through the rows and insert data row by row
+                for index, row in df.iterrows():
+                    instrument_name = row['InstrumentName']
+                    date = row['Date']
+                    yield_value = row['Yield']
+                    if not isinstance(yield_value, float):
+                        continue
+                    date_updated = pd.Timestamp.now()
+
+                    # Execute the SQL query with placeholders
+                    cursor.execute(
+                        insert_query,
+                        instrument_name, date, yield_value, date_updated
+                    )
+
+            # Commit the transaction
+            conn.commit()
+
+    def setup_database(self):
+        """Create the YieldData table and the stored procedures from the scripts in the setup directory."""
+        from ARXDatabaseSetup import ARXDatabaseSetup
+
+        ARXDatabaseSetup(self.sql_directory / "setup", self.conn_str).execute_scripts()
+
+    def _begin_bulk(self, cursor):
+        # Send each batch to a session staging table with a single fast_executemany round-trip
+        cursor.fast_executemany = True
+        cursor.execute(self.load_sql_query('CreateYieldDataStaging.sql'))
+        self._merge_query = self.load_sql_query('MergeYieldDataStaging.sql')
+
+    def _write_batch(self, cursor, rows, date_updated):
+        params = list(zip(rows['InstrumentName'], rows['Date'], rows['Yield'], [date_updated] * len(rows)))
+        cursor.executemany(
+            "INSERT INTO #YieldDataStaging (InstrumentName, Date, Yield, DateUpdated) VALUES (?, ?, ?, ?)", params)
+
+        # Upsert the staged batch into YieldData with one set-based MERGE
+        cursor.execute(self._merge_query)
+
+    def _end_bulk(self, cursor):
+        cursor.fast_executemany = False
 
 
 # Example usage:
@@ -155,7 +143,7 @@ if __name__ == "__main__":
 
     loader = ARXYieldDataAccess(data_directory=data_directory, config_directory=config_directory,
                                 sql_directory=sql_directory)
-    loader.execute_insert()
+    loader.execute_bulk_insert()
 
     # Example usage of execute_get_yield_data_by_date_range
     start_date = "2021-01-01"
@@ -164,5 +152,5 @@ if __name__ == "__main__":
     df = loader.execute_get_yield_data_by_date_range(start_date, end_date)
     print(df[df["InstrumentName"] == "USTreasuryYield"])
 
-    unique_instruments = loader.get_unique_instruments(df)
+    unique_instruments = loader.execute_get_distinct_instruments(start_date, end_date)
     print(f"Unique Instruments:  {unique_instruments}")
@@ -0,0 +1,289 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ARXCompactYieldData import ARXCompactYieldData
+from ARXDateRanges import ARXDateRanges
+
+
+class ARXYieldDataCache:
+    """
+    ARXYieldDataCache is a local, columnar cache placed in front of ARXYieldDataAccess.
+
+    Fetched yield data is stored on disk as one NumPy `.npy` file per column, sorted by instrument and date,
+    so the columns can be memory-mapped and a date range can be located per instrument with a binary search.
+    A small JSON metadata file records the instrument names, the date ranges already held, the latest
+    `DateUpdated` seen (the watermark) and the data version.
+
+    On every request the cache:
+    - Pulls the rows whose `DateUpdated` is at or after the watermark less `REFRESH_OVERLAP`, replacing any stale
+      cached rows. A load stamps its rows before committing them, so a load still running at the last refresh
+      can commit rows stamped before the watermark; the overlap pulls those too, and rows already held are
+      skipped.
+    - Fetches only the parts of the requested date range it does not hold yet.
+    - Serves the request from the memory-mapped columns.
+
+    The class exposes the same read methods as ARXYieldDataAccess, so it can be used in its place.
+
+    Attributes:
+        yield_data_access (ARXYieldDataAccess): The data access used to fetch missing data.
+        cache_directory (Path): Directory holding the cached columns and metadata.
+    """
+    COLUMNS = ["InstrumentCode", "Date", "Yield", "DateUpdated", "Id"]
+    META_FILE = "meta.json"
+    REFRESH_OVERLAP = pd.Timedelta(minutes=10)
+
+    def __init__(self, yield_data_access, cache_directory=Path("cache") / "yield_data"):
+        self.yield_data_access = yield_data_access
+        self.cache_directory = Path(cache_directory)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.meta = self.load_meta()
+
+    def load_meta(self):
+        try:
+            with open(self.cache_directory / self.META_FILE, 'r') as meta_file:
+                meta = json.load(meta_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"instruments": [], "offsets": [0], "ranges": [], "watermark": None}
+
+        # The metadata is only trusted when every column it describes is present
+        if not all((self.cache_directory / f"{column}.npy").exists() for column in self.COLUMNS):
+            return {"instruments": [], "offsets": [0], "ranges": [], "watermark": None}
+
+        # Without a watermark nothing can be refreshed, so no range is trusted as covered (see _store)
+        if meta["watermark"] is None:
+            meta["ranges"] = []
+        return meta
+
+    def load_columns(self):
+        """Memory-map the cached columns."""
+        if not self.meta["instruments"]:
+            return None
+        return {column: np.load(self.cache_directory / f"{column}.npy", mmap_mode='r') for column in self.COLUMNS}
+
+    @property
+    def data_version(self):
+        """
+        An ISO timestamp that moves forward whenever the refresh pulls new yield data: the watermark, or the time
+        of the refresh when the rows it pulled were stamped before the watermark.
+        """
+        return self.meta.get("version", self.meta["watermark"])
+
+    def invalidate(self):
+        """Drop everything held in the cache."""
+        with self._lock:
+            for column in self.COLUMNS:
+                (self.cache_directory / f"{column}.npy").unlink(missing_ok=True)
+            (self.cache_directory / self.META_FILE).unlink(missing_ok=True)
+            self.meta = self.load_meta()
+
+    def refresh(self):
+        """
+        Pull the rows inserted or updated since the watermark into the cache.
+
+        Returns:
+        - pd.DataFrame: The rows pulled (None when the cache is empty or the query failed).
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        if self.meta["watermark"] is None:
+            return None
+
+        watermark = pd.Timestamp(self.meta["watermark"])
+        updated = self.yield_data_access.execute_get_yield_data_updated_since(watermark - self.REFRESH_OVERLAP)
+        if updated is None:
+            return None
+
+        updated = self._unseen(updated)
+        if not updated.empty:
+            self._store(updated, [], refreshed=True)
+        return updated
+
+    def _unseen(self, df):
+        """The rows not held in the cache yet: those of instruments and dates not cached, or updated since."""
+        columns = self.load_columns()
+        if columns is None or df.empty:
+            return df
+
+        codes = {name: code for code, name in enumerate(self.meta["instruments"])}
+        offsets = self.meta["offsets"]
+        names = df["InstrumentName"].astype(str).to_numpy()
+        days = pd.to_datetime(df["Date"]).to_numpy().astype('datetime64[D]')
+        dates_updated = pd.to_datetime(df["DateUpdated"]).to_numpy().astype('datetime64[ns]')
+
+        held = np.zeros(len(df), dtype=bool)
+        for name in pd.unique(names):
+            code = codes.get(name)
+            if code is None or offsets[code] == offsets[code + 1]:
+                continue
+            rows = names == name
+            dates = columns["Date"][offsets[code]:offsets[code + 1]]
+            positions = np.minimum(np.searchsorted(dates, days[rows]), len(dates) - 1)
+            cached_updated = columns["DateUpdated"][offsets[code]:offsets[code + 1]][positions]
+            held[rows] = (dates[positions] == days[rows]) & (cached_updated >= dates_updated[rows])
+        return df[~held]
+
+    def execute_get_yield_data_by_date_range(self, start_date, end_date):
+        start, end = ARXDateRanges.normalize(start_date, end_date)
+
+        with self._lock:
+            self._update(start, end)
+            return self._read(start, end)
+
+    def execute_get_compact_yield_data_by_date_range(self, start_date, end_date, float32=False):
+        """
+        Return a date range as ARXCompactYieldData, reading only the instrument, date and yield columns.
+
+        Parameters:
+        - start_date, end_date: The requested date range (inclusive).
+        - float32 (bool): Store the yields as float32.
+        """
+        start, end = ARXDateRanges.normalize(start_date, end_date)
+
+        with self._lock:
+            self._update(start, end)
+            columns, rows = self._select(start, end)
+            if columns is None:
+                return ARXCompactYieldData([], [], [], [])
+            return ARXCompactYieldData.from_columns(self.meta["instruments"], columns["InstrumentCode"][rows],
+                                                    columns["Date"][rows], columns["Yield"][rows], float32=float32)
+
+    def _update(self, start, end):
+        """Pull updates since the watermark and fetch the parts of the range not cached yet."""
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"Could not check the yield data cache for updates, serving cached data: {e}")
+
+        # Fetch only the gaps between what is cached and what is requested
+        gaps = ARXDateRanges.missing(ARXDateRanges.from_json(self.meta["ranges"]), start, end)
+        fetched = []
+        for gap_start, gap_end in gaps:
+            df = self.yield_data_access.execute_get_yield_data_by_date_range(gap_start.strftime("%Y-%m-%d"),
+                                                                             gap_end.strftime("%Y-%m-%d"))
+            if df is None:
+                # The data access reports its own errors; leave the gap to be fetched next time
+                continue
+            fetched.append((df, (gap_start, gap_end)))
+
+        if fetched:
+            self._store(pd.concat([df for df, _ in fetched], ignore_index=True), [gap for _, gap in fetched])
+
+    def get_unique_instruments(self, df):
+        return self.yield_data_access.get_unique_instruments(df)
+
+    def execute_get_filtered_yield_data(self, start_date, end_date, instrument_prefix=None, instruments=None,
+                                        sampling=None, offset=0, page_size=None):
+        # Filtered, sampled and paged requests are answered by the database, which only sends the rows asked for
+        return self.yield_data_access.execute_get_filtered_yield_data(start_date, end_date, instrument_prefix,
+                                                                      instruments, sampling, offset, page_size)
+
+    def execute_get_distinct_instruments(self, start_date=None, end_date=None):
+        return self.yield_data_access.execute_get_distinct_instruments(start_date, end_date)
+
+    def _read(self, start, end):
+        columns, rows = self._select(start, end)
+        if columns is None:
+            return self._frame(np.empty(0, dtype=np.int32), np.empty(0, dtype='datetime64[D]'), np.empty(0),
+                               np.empty(0, dtype='datetime64[ns]'), np.empty(0, dtype=str), [])
+
+        return self._frame(columns["InstrumentCode"][rows], columns["Date"][rows], columns["Yield"][rows],
+                           columns["DateUpdated"][rows], columns["Id"][rows], self.meta["instruments"])
+
+    def _select(self, start, end):
+        """The memory-mapped columns and the positions of the rows within the date range."""
+        columns = self.load_columns()
+        if columns is None:
+            return None, None
+
+        # The rows are sorted by instrument and date, so each instrument's slice is found by binary search
+        start_day = np.datetime64(start.date(), 'D')
+        end_day = np.datetime64(end.date(), 'D')
+        offsets = self.meta["offsets"]
+        selection = []
+        for code in range(len(self.meta["instruments"])):
+            dates = columns["Date"][offsets[code]:offsets[code + 1]]
+            lower = offsets[code] + np.searchsorted(dates, start_day, side='left')
+            upper = offsets[code] + np.searchsorted(dates, end_day, side='right')
+            if upper > lower:
+                selection.append(np.arange(lower, upper))
+        rows = np.concatenate(selection) if selection else np.empty(0, dtype=np.int64)
+        return columns, rows
+
+    @staticmethod
+    def _frame(codes, dates, yields, dates_updated, ids, instruments):
+        return pd.DataFrame({
+            "Id": ids.astype(object),
+            "InstrumentName": pd.Categorical.from_codes(codes, categories=instruments).remove_unused_categories(),
+            "Date": dates.astype("datetime64[ns]"),
+            "Yield": np.asarray(yields, dtype=float),
+            "DateUpdated": np.asarray(dates_updated, dtype="datetime64[ns]"),
+        })
+
+    def _store(self, df, new_ranges, refreshed=False):
+        """
+        Merge fetched rows into the cached columns and record the newly covered ranges. Rows pulled by the
+        refresh (`refreshed`) move the data version forward.
+        """
+        existing = self.load_columns()
+
+        instruments = list(self.meta["instruments"])
+        names = df["InstrumentName"].astype(str)
+        for name in pd.unique(names):
+            if name not in instruments:
+                instruments.append(name)
+        codes = {name: code for code, name in enumerate(instruments)}
+
+        merged = pd.DataFrame({
+            "InstrumentCode": names.map(codes).to_numpy(dtype=np.int32),
+            "Date": pd.to_datetime(df["Date"]).to_numpy().astype('datetime64[D]'),
+            "Yield": df["Yield"].to_numpy(dtype=float),
+            "DateUpdated": pd.to_datetime(df["DateUpdated"]).to_numpy().astype('datetime64[ns]'),
+            "Id": df["Id"].astype(str).to_numpy(),
+        })
+        if existing is not None:
+            merged = pd.concat([pd.DataFrame({column: np.asarray(existing[column]) for column in self.COLUMNS}),
+                                merged], ignore_index=True)
+
+        # Keep the most recently updated row for each instrument and date
+        merged = merged.sort_values(["InstrumentCode", "Date", "DateUpdated"], kind="stable")
+        merged = merged.drop_duplicates(subset=["InstrumentCode", "Date"], keep="last")
+
+        offsets = np.searchsorted(merged["InstrumentCode"].to_numpy(), np.arange(len(instruments) + 1)).tolist()
+        watermark = merged["DateUpdated"].max() if not merged.empty else None
+
+        # Write every column to a temporary file first and swap them in, so readers never see a partial cache
+        for column in self.COLUMNS:
+            values = merged[column].to_numpy()
+            if column == "Id":
+                values = values.astype(str)
+            temporary = self.cache_directory / f"{column}.tmp.npy"
+            np.save(temporary, values)
+            os.replace(temporary, self.cache_directory / f"{column}.npy")
+
+        # Ranges fetched while the database held no rows at all are not recorded: with no watermark the refresh
+        # could never pull the rows loaded into them later, so they are fetched again next time instead
+        ranges = ARXDateRanges.merge(ARXDateRanges.from_json(self.meta["ranges"]) + list(new_ranges)) \
+            if watermark is not None else []
+        # The version moves forward even when the refreshed rows were stamped before the watermark
+        versions = [pd.Timestamp(version) for version in (self.data_version, watermark) if version is not None]
+        if refreshed:
+            versions.append(pd.Timestamp.now())
+        self.meta = {
+            "instruments": instruments,
+            "offsets": offsets,
+            "ranges": ARXDateRanges.to_json(ranges),
+            "watermark": None if watermark is None else pd.Timestamp(watermark).isoformat(),
+            "version": max(versions).isoformat() if versions else None,
+        }
+        temporary = self.cache_directory / f"{self.META_FILE}.tmp"
+        with open(temporary, 'w') as meta_file:
+            json.dump(self.meta, meta_file)
+        os.replace(temporary, self.cache_directory / self.META_FILE)
@@ -0,0 +1,497 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ARXIngestManifest import ARXIngestManifest
+
+
+class ARXYieldDataStore(ABC):
+    """
+    ARXYieldDataStore is the storage backend interface behind the yield data access layer.
+
+    Every backend supports the same operations: schema setup, the MERGE-style upsert of the source CSV files,
+    the date-range query, the filtered query, the query for rows updated since a given time and the instrument
+    listing.
+    The backend is chosen with the optional 'backend' key of config.json:
+    - 'sqlserver' (default): ARXYieldDataAccess, SQL Server over ODBC using the stored procedures in SQL/setup.
+    - 'sqlite': ARXSQLiteYieldDataAccess, an embedded, file-based database using the queries in SQL/sqlite.
+
+    Subclasses provide a connection `pool` (ARXConnectionPool), the database error types in `DATABASE_ERRORS`
+    and the backend-specific queries returning (Id, InstrumentName, Date, Yield, DateUpdated) rows:
+    `date_range_query` (start and end date placeholders), `updated_since_query` (one timestamp placeholder) and
+    `filtered_query` (the parameters of `filter_params`), and `distinct_instruments_query` returning
+    (InstrumentName,) rows for an optional start and end date.
+    The shared reading, validation and bulk-loading logic lives here.
+
+    Attributes:
+        data_directory (Path): Directory containing the source CSV files to be inserted into the database.
+        config_directory (Path): Directory containing the JSON configuration file for the database connection.
+        sql_directory (Path): Directory containing the SQL query files.
+    """
+    DATABASE_ERRORS = ()
+    # Sampling rules of the filtered query, applied per instrument
+    SAMPLING_RULES = {
+        "first_of_month": "FIRST_OF_MONTH",  # The first calendar day of each month
+        "month_start": "MONTH_START",  # The first observation of each month
+        "week_end": "WEEK_END",  # The last observation of each week (Monday to Sunday)
+    }
+
+    def __init__(self, data_directory, config_directory, sql_directory):
+        self.data_directory = Path(data_directory)
+        self.config_directory = Path(config_directory)
+        self.sql_directory = Path(sql_directory)
+
+    @staticmethod
+    def create(data_directory, config_directory, sql_directory) -> 'ARXYieldDataStore':
+        """Create the yield data access for the backend configured in config.json."""
+        try:
+            with open(Path(config_directory) / 'config.json', 'r') as config_file:
+                backend = json.load(config_file).get('backend', 'sqlserver')
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            raise Exception("Error loading database configuration from config.json") from e
+
+        if backend == 'sqlserver':
+            from ARXYieldDataAccess import ARXYieldDataAccess
+            return ARXYieldDataAccess(data_directory, config_directory, sql_directory)
+        if backend == 'sqlite':
+            from ARXSQLiteYieldDataAccess import ARXSQLiteYieldDataAccess
+            return ARXSQLiteYieldDataAccess(data_directory, config_directory, sql_directory)
+        raise ValueError(f"Unknown database backend in config.json: {backend}")
+
+    @abstractmethod
+    def verify_db_config(self):
+        """Return (True, message) if the schema is in place, (False, reason) otherwise."""
+        pass
+
+    @abstractmethod
+    def setup_database(self):
+        """Create the tables, indexes and queries used by the application."""
+        pass
+
+    @abstractmethod
+    def execute_insert(self):
+        """Upsert every CSV file in the data directory."""
+        pass
+
+    @abstractmethod
+    def _begin_bulk(self, cursor):
+        """Prepare a cursor for a bulk load."""
+        pass
+
+    @abstractmethod
+    def _write_batch(self, cursor, rows, date_updated):
+        """Upsert one validated batch of rows (see clean_yield_rows)."""
+        pass
+
+    def _end_bulk(self, cursor):
+        """Restore a cursor after a bulk load."""
+        pass
+
+    def _date_param(self, value):
+        """Convert a date to the parameter type expected by the backend."""
+        return value
+
+    def _timestamp_param(self, value):
+        """Convert a timestamp to the parameter type expected by the backend."""
+        return value
+
+    def load_sql_query(self, file_name):
+        try:
+            # Load SQL query from a file in the SQL directory
+            with open(self.sql_directory / file_name, 'r') as sql_file:
+                return sql_file.read()
+        except FileNotFoundError as e:
+            raise Exception(f"Error loading SQL query from {file_name}") from e
+
+    def pool_statistics(self):
+        """Connection pool statistics (checkouts, wait times, reconnects) for sizing the pool."""
+        return self.pool.statistics()
+
+    @staticmethod
+    def clean_yield_rows(df):
+        """
+        Vectorized validation of a batch of CSV rows.
+
+        Keeps only rows whose yield is numeric, converts the dates and drops repeated (InstrumentName, Date)
+        pairs within the batch (the last one wins, as it would with row-by-row upserts).
+        """
+        yields = pd.to_numeric(df['Yield'], errors='coerce')
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        mask = yields.notna() & dates.notna() & df['InstrumentName'].notna()
+
+        rows = pd.DataFrame({
+            'InstrumentName': df['InstrumentName'][mask].astype(str),
+            'Date': dates[mask].dt.date,
+            'Yield': yields[mask].astype(float),
+        })
+        return rows.drop_duplicates(subset=['InstrumentName', 'Date'], keep='last')
+
+    def execute_bulk_insert(self, batch_size=10000, incremental=True):
+        """
+        Bulk load every CSV file in the data directory.
+
+        Each file is read in chunks of `batch_size` rows so memory stays bounded regardless of the file size.
+        Each chunk is validated in one vectorized pass and upserted by the backend as one batch.
+
+        With `incremental` (the default), the ingest manifest in the data directory is used to skip files that
+        have not changed since they were last loaded and to send only the appended rows of files that grew.
+        Files changed in any other way (e.g. corrections to loaded dates) are sent in full.
+        Passing `incremental=False` reloads every row and rebuilds the manifest.
+
+        Returns:
+        - int: The number of rows loaded.
+        """
+        manifest = ARXIngestManifest.for_directory(self.data_directory)
+        if not incremental:
+            manifest.reset()
+
+        total_rows = 0
+        skipped_files = 0
+        start_time = time.perf_counter()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor
+            self._begin_bulk(cursor)
+
+            for csv_file in self.data_directory.glob('*.csv'):
+                fingerprint = manifest.fingerprint(csv_file)
+                if manifest.is_unchanged(csv_file, fingerprint):
+                    skipped_files += 1
+                    continue
+
+                print("Integrating csv data: ", csv_file)
+                file_rows = 0
+                max_dates = {}
+
+                # One timestamp per file rather than per row, taken after the previous file was committed, so
+                # the files are stamped in commit order and a refresh between two commits misses none of them
+                date_updated = pd.Timestamp.now().to_pydatetime()
+
+                offset = ARXIngestManifest.appended_offset(csv_file, manifest.known_fingerprint(csv_file))
+                for chunk in self.read_csv_chunks(csv_file, batch_size, offset):
+                    rows = self.clean_yield_rows(chunk)
+                    if rows.empty:
+                        continue
+
+                    self._write_batch(cursor, rows, date_updated)
+                    file_rows += len(rows)
+                    for instrument, max_date in self.max_dates(rows).items():
+                        max_dates[instrument] = max(max_dates.get(instrument, max_date), max_date)
+
+                conn.commit()
+
+                # Record the file only once its rows are committed
+                manifest.record(csv_file, fingerprint, max_dates)
+                manifest.save()
+
+                total_rows += file_rows
+                print(f"Loaded {file_rows} rows from {csv_file.name}")
+
+            self._end_bulk(cursor)
+
+        if skipped_files:
+            print(f"Skipped {skipped_files} unchanged files")
+
+        elapsed = time.perf_counter() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else float('inf')
+        print(f"Bulk insert complete: {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        return total_rows
+
+    @staticmethod
+    def read_csv_chunks(csv_file, batch_size, offset=None):
+        """
+        Read a CSV file in chunks of `batch_size` rows.
+
+        Parameters:
+        - csv_file (Path): The source file.
+        - batch_size (int): Rows per chunk.
+        - offset (int): Byte offset of the first row to read (e.g. ARXIngestManifest.appended_offset), with the
+                        column names still taken from the header; None reads the whole file.
+        """
+        if offset is None:
+            yield from pd.read_csv(csv_file, chunksize=batch_size)
+            return
+
+        columns = pd.read_csv(csv_file, nrows=0).columns
+        with open(csv_file, 'rb') as f:
+            f.seek(offset)
+            yield from pd.read_csv(f, header=None, names=columns, chunksize=batch_size)
+
+    @staticmethod
+    def max_dates(rows):
+        """Latest date per instrument in a batch of validated rows."""
+        return pd.to_datetime(rows['Date']).groupby(rows['InstrumentName']).max().to_dict()
+
+    def execute_parallel_insert(self, workers=None, connections=None, batch_size=10000, incremental=True):
+        """
+        Load the CSV files in the data directory in parallel.
+
+        The files are checksummed, parsed and validated in a pool of `workers` processes. As each file is
+        parsed, its rows are written over one of `connections` pooled database connections (by default the
+        size of the connection pool) in batches of `batch_size` rows and committed on their own, so a failure
+        in one file does not lose the work done for the others. The ingest manifest is updated as each file
+        is committed, so a re-run only retries the files that failed.
+
+        At most `workers` + `connections` files are being parsed or written at a time, and the rows of a file
+        are released as soon as they are committed, so memory is bounded by those files rather than by the
+        whole directory.
+
+        Parameters:
+        - workers (int): Number of parsing processes (default: the number of CPUs).
+        - connections (int): Number of concurrent database writers (default: the connection pool size).
+        - batch_size (int): Rows per upsert batch.
+        - incremental (bool): Skip unchanged files and send only appended rows (see execute_bulk_insert).
+
+        Returns:
+        - tuple: (number of rows loaded, dict of file name -> error message for the files that failed).
+        """
+        manifest = ARXIngestManifest.for_directory(self.data_directory)
+        if not incremental:
+            manifest.reset()
+
+        connections = min(connections or self.pool.size, self.pool.size)
+
+        csv_files = sorted(self.data_directory.glob('*.csv'))
+        total_rows = 0
+        skipped_files = 0
+        failures = {}
+        start_time = time.perf_counter()
+
+        workers = workers or os.cpu_count() or 1
+        files = iter(csv_files)
+        parsing = {}
+        writing = {}
+        with ProcessPoolExecutor(max_workers=workers) as parsers, \
+                ThreadPoolExecutor(max_workers=connections) as writers:
+            while True:
+                # Only start parsing another file once one of the files in flight has been committed
+                while len(parsing) + len(writing) < workers + connections:
+                    csv_file = next(files, None)
+                    if csv_file is None:
+                        break
+                    parsing[parsers.submit(_parse_csv_file, csv_file, manifest.known_fingerprint(csv_file),
+                                           batch_size)] = csv_file
+                if not parsing and not writing:
+                    break
+
+                done, _ = wait([*parsing, *writing], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        csv_file = parsing.pop(future)
+                        try:
+                            fingerprint, rows = future.result()
+                        except Exception as e:
+                            failures[csv_file.name] = f"parse error: {e}"
+                            print(f"Failed to parse {csv_file.name}: {e}")
+                            continue
+
+                        if rows is None:
+                            skipped_files += 1
+                            continue
+
+                        print(f"Parsed {csv_file.name}: {len(rows)} rows to load")
+                        # Only the row count and latest dates are kept; the rows go with the write
+                        writing[writers.submit(self._write_rows, rows, batch_size)] = (
+                            csv_file, fingerprint, len(rows), self.max_dates(rows) if not rows.empty else {})
+                        del rows
+                        continue
+
+                    csv_file, fingerprint, row_count, max_dates = writing.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failures[csv_file.name] = f"write error: {e}"
+                        print(f"Failed to load {csv_file.name}: {e}")
+                        continue
+
+                    # Record the file only once its rows are committed
+                    manifest.record(csv_file, fingerprint, max_dates)
+                    manifest.save()
+                    total_rows += row_count
+                    print(f"Loaded {row_count} rows from {csv_file.name}")
+
+        if skipped_files:
+            print(f"Skipped {skipped_files} unchanged files")
+        if failures:
+            print(f"{len(failures)} of {len(csv_files)} files failed: {', '.join(sorted(failures))}")
+
+        elapsed = time.perf_counter() - start_time
+        rate = total_rows / elapsed if elapsed > 0 else float('inf')
+        print(f"Parallel insert complete: {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+        return total_rows, failures
+
+    def _write_rows(self, rows, batch_size):
+        """Upsert the rows of one file over a pooled connection and commit them as one transaction."""
+        # One timestamp per file, taken as its write starts; files written concurrently may commit out of
+        # timestamp order, which the yield data cache's refresh overlap allows for
+        date_updated = pd.Timestamp.now().to_pydatetime()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor
+            self._begin_bulk(cursor)
+            try:
+                for start in range(0, len(rows), batch_size):
+                    self._write_batch(cursor, rows.iloc[start:start + batch_size], date_updated)
+                conn.commit()
+            finally:
+                self._end_bulk(cursor)
+
+    @staticmethod
+    def rows_to_frame(rows):
+        """
+        Build a typed DataFrame from a batch of (Id, InstrumentName, Date, Yield, DateUpdated) rows.
+
+        Each column is filled straight into a NumPy array of its final type: the dates as datetime64,
+        the yields as float64 and the instrument names as a categorical.
+        """
+        count = len(rows)
+        ids, instrument_names, dates, yields, dates_updated = zip(*rows) if count else ((),) * 5
+
+        return pd.DataFrame({
+            "Id": np.array([str(row_id) for row_id in ids], dtype=object),
+            "InstrumentName": pd.Categorical(instrument_names),
+            "Date": np.array(dates, dtype="datetime64[ns]"),
+            "Yield": np.fromiter(yields, dtype=float, count=count),
+            "DateUpdated": np.array(dates_updated, dtype="datetime64[ns]"),
+        })
+
+    @staticmethod
+    def concat_frames(chunks):
+        """Concatenate DataFrame chunks produced by `rows_to_frame` into one typed DataFrame."""
+        if not chunks:
+            return ARXYieldDataStore.rows_to_frame([])
+
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+        # Chunks carry their own categories, so re-encode the instrument names once over the full result
+        df["InstrumentName"] = df["InstrumentName"].astype("category")
+        return df
+
+    def iter_query_frames(self, query, params, chunk_size=50000):
+        """
+        Execute a query returning YieldData rows and stream the result as DataFrames of at most `chunk_size` rows.
+        """
+        # Check out a pooled connection for as long as the result is being streamed
+        with self.pool.connection() as conn:
+            cursor = conn.cursor
+
+            # Execute the query with placeholders
+            cursor.execute(query, tuple(params))
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield self.rows_to_frame(rows)
+
+    def iter_yield_data_by_date_range(self, start_date, end_date, chunk_size=50000):
+        """
+        Stream the yield data for a date range as a sequence of DataFrames of at most `chunk_size` rows.
+
+        Downstream stages can start processing the first chunk before the full range has arrived.
+        """
+        return self.iter_query_frames(self.date_range_query,
+                                      (self._date_param(start_date), self._date_param(end_date)),
+                                      chunk_size=chunk_size)
+
+    def execute_get_yield_data_by_date_range(self, start_date, end_date, chunk_size=50000):
+        try:
+            return self.concat_frames(list(self.iter_yield_data_by_date_range(start_date, end_date,
+                                                                              chunk_size=chunk_size)))
+
+        except self.DATABASE_ERRORS as e:
+            print(f"Error: {e}")
+
+    def execute_get_yield_data_updated_since(self, since, chunk_size=50000):
+        """Retrieve the rows inserted or updated (by DateUpdated) at or after the given time."""
+        chunks = self.iter_query_frames(self.updated_since_query, (self._timestamp_param(since),),
+                                        chunk_size=chunk_size)
+        return self.concat_frames(list(chunks))
+
+    def filter_params(self, start_date, end_date, instrument_prefix=None, instruments=None, sampling=None,
+                      offset=0, page_size=None):
+        """The parameters of `filtered_query`: dates, name pattern, JSON name list, sampling rule and page."""
+        if sampling is not None and sampling not in self.SAMPLING_RULES:
+            raise ValueError(f"Unknown sampling rule: {sampling}. Use one of {', '.join(self.SAMPLING_RULES)}.")
+
+        pattern = None
+        if instrument_prefix is not None:
+            # Match the prefix literally: '_' and '%' are LIKE wildcards
+            pattern = instrument_prefix.replace("\\", "\\\\").replace("_", "\\_").replace("%", "\\%") + "%"
+        names = None if instruments is None else json.dumps([str(name) for name in instruments])
+        return (self._date_param(start_date), self._date_param(end_date), pattern, names,
+                None if sampling is None else self.SAMPLING_RULES[sampling], int(offset),
+                None if page_size is None else int(page_size))
+
+    def iter_filtered_yield_data(self, start_date, end_date, instrument_prefix=None, instruments=None,
+                                 sampling=None, offset=0, page_size=None, chunk_size=50000):
+        """
+        Stream the yield data of a date range, filtered, sampled and paged by the database, as DataFrames of at
+        most `chunk_size` rows. Only the rows asked for leave the database.
+
+        Parameters:
+        - start_date, end_date: The date range (inclusive).
+        - instrument_prefix (str): Only the instruments whose name starts with it (e.g., 'US_TREASURY_').
+        - instruments (list): Only these instruments.
+        - sampling (str): None for every date, or one of SAMPLING_RULES ('first_of_month', 'month_start' or
+                          'week_end').
+        - offset, page_size: Page of the rows ordered by instrument and date (page_size None for all rows).
+        """
+        return self.iter_query_frames(self.filtered_query,
+                                      self.filter_params(start_date, end_date, instrument_prefix, instruments,
+                                                         sampling, offset, page_size),
+                                      chunk_size=chunk_size)
+
+    def execute_get_filtered_yield_data(self, start_date, end_date, instrument_prefix=None, instruments=None,
+                                        sampling=None, offset=0, page_size=None, chunk_size=50000):
+        """Retrieve the yield data of a date range filtered, sampled and paged by the database (see
+        iter_filtered_yield_data)."""
+        try:
+            return self.concat_frames(list(self.iter_filtered_yield_data(start_date, end_date, instrument_prefix,
+                                                                         instruments, sampling, offset, page_size,
+                                                                         chunk_size=chunk_size)))
+
+        except self.DATABASE_ERRORS as e:
+            print(f"Error: {e}")
+
+    def execute_get_distinct_instruments(self, start_date=None, end_date=None):
+        """
+        The names of the instruments with data (within the date range when given), without fetching their rows.
+        """
+        params = (None if start_date is None else self._date_param(start_date),
+                  None if end_date is None else self._date_param(end_date))
+        try:
+            with self.pool.connection() as conn:
+                conn.cursor.execute(self.distinct_instruments_query, params)
+                return [row[0] for row in conn.cursor.fetchall()]
+
+        except self.DATABASE_ERRORS as e:
+            print(f"Error: {e}")
+
+    def get_unique_instruments(self, df):
+        """Retrieve unique instrument names from the data fetched between the given date range."""
+        return sorted(df["InstrumentName"].unique().tolist())
+
+
+def _parse_csv_file(csv_file, known_fingerprint, batch_size):
+    """
+    Checksum, parse and validate one CSV file in a worker process.
+
+    Returns the file's (checksum, size) fingerprint and its validated rows (only the appended ones when the
+    file grew since it was last loaded), or None for the rows when the file is unchanged.
+    """
+    fingerprint = ARXIngestManifest.fingerprint(csv_file)
+    if known_fingerprint == fingerprint:
+        return fingerprint, None
+
+    offset = ARXIngestManifest.appended_offset(csv_file, known_fingerprint)
+    chunks = [ARXYieldDataStore.clean_yield_rows(chunk)
+              for chunk in ARXYieldDataStore.read_csv_chunks(csv_file, batch_size, offset)]
+    if not chunks:
+        return fingerprint, pd.DataFrame(columns=['InstrumentName', 'Date', 'Yield'])
+
+    return fingerprint, pd.concat(chunks, ignore_index=True)
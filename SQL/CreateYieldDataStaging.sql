@@ -0,0 +1,10 @@
+-- Create a session-scoped staging table for bulk loading YieldData
+IF OBJECT_ID('tempdb..#YieldDataStaging') IS NOT NULL
+    DROP TABLE #YieldDataStaging;
+
+CREATE TABLE #YieldDataStaging (
+    InstrumentName NVARCHAR(255) NOT NULL,
+    Date DATE NOT NULL,
+    Yield FLOAT NOT NULL,
+    DateUpdated DATETIME NOT NULL
+);
@@ -0,0 +1,13 @@
+-- Insert or update the staged batch into the YieldData table with one set-based MERGE, then clear the staging table
+MERGE INTO YieldData AS target
+USING #YieldDataStaging AS source
+ON target.InstrumentName = source.InstrumentName AND target.Date = source.Date
+WHEN MATCHED THEN
+    UPDATE SET
+        target.Yield = source.Yield,
+        target.DateUpdated = source.DateUpdated
+WHEN NOT MATCHED THEN
+    INSERT (InstrumentName, Date, Yield, DateUpdated)
+    VALUES (source.InstrumentName, source.Date, source.Yield, source.DateUpdated);
+
+TRUNCATE TABLE #YieldDataStaging;
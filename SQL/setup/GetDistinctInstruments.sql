@@ -0,0 +1,13 @@
+-- Create a stored procedure to list the instruments with data, optionally within a date range
+CREATE OR ALTER PROCEDURE GetDistinctInstruments
+    @StartDate DATE = NULL,
+    @EndDate DATE = NULL
+AS
+BEGIN
+    SELECT DISTINCT InstrumentName
+    FROM YieldData
+    WHERE (@StartDate IS NULL OR Date >= @StartDate)
+      AND (@EndDate IS NULL OR Date <= @EndDate)
+    ORDER BY InstrumentName;
+
+END;
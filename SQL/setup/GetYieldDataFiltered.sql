@@ -0,0 +1,39 @@
+-- Create a stored procedure to retrieve YieldData filtered, sampled and paged in the database
+--   @InstrumentPrefix: LIKE pattern of the instrument names (e.g. 'US\_TREASURY\_%', escaped with '\'), or NULL
+--   @Instruments:      JSON array of instrument names, or NULL
+--   @Sampling:         NULL for every date, 'FIRST_OF_MONTH' for the first calendar day of each month,
+--                      'MONTH_START' for the first observation of each month and 'WEEK_END' for the last
+--                      observation of each week (Monday to Sunday), per instrument
+--   @Offset, @PageSize: Page of the result ordered by instrument and date (@PageSize NULL for all rows)
+CREATE OR ALTER PROCEDURE GetYieldDataFiltered
+    @StartDate DATE,
+    @EndDate DATE,
+    @InstrumentPrefix NVARCHAR(255) = NULL,
+    @Instruments NVARCHAR(MAX) = NULL,
+    @Sampling NVARCHAR(20) = NULL,
+    @Offset INT = 0,
+    @PageSize INT = NULL
+AS
+BEGIN
+    WITH Filtered AS (
+        SELECT Id, InstrumentName, Date, Yield, DateUpdated,
+               ROW_NUMBER() OVER (PARTITION BY InstrumentName, YEAR(Date), MONTH(Date) ORDER BY Date) AS MonthRank,
+               ROW_NUMBER() OVER (PARTITION BY InstrumentName,
+                                  DATEADD(DAY, -((DATEPART(WEEKDAY, Date) + @@DATEFIRST - 2) % 7), Date)
+                                  ORDER BY Date DESC) AS WeekRank
+        FROM YieldData
+        WHERE Date >= @StartDate AND Date <= @EndDate
+          AND (@InstrumentPrefix IS NULL OR InstrumentName LIKE @InstrumentPrefix ESCAPE '\')
+          AND (@Instruments IS NULL OR InstrumentName IN (SELECT value FROM OPENJSON(@Instruments)))
+          AND (@Sampling IS NULL OR @Sampling <> 'FIRST_OF_MONTH' OR DAY(Date) = 1)
+    )
+    SELECT Id, InstrumentName, Date, Yield, DateUpdated
+    FROM Filtered
+    WHERE @Sampling IS NULL
+       OR @Sampling = 'FIRST_OF_MONTH'
+       OR (@Sampling = 'MONTH_START' AND MonthRank = 1)
+       OR (@Sampling = 'WEEK_END' AND WeekRank = 1)
+    ORDER BY InstrumentName, Date
+    OFFSET @Offset ROWS FETCH NEXT ISNULL(@PageSize, 2147483647) ROWS ONLY;
+
+END;
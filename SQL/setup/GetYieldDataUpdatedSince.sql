@@ -0,0 +1,10 @@
+-- Create a stored procedure to retrieve YieldData rows inserted or updated since a given time
+CREATE OR ALTER PROCEDURE GetYieldDataUpdatedSince
+    @Since DATETIME
+AS
+BEGIN
+    SELECT Id, InstrumentName, Date, Yield, DateUpdated
+    FROM YieldData
+    WHERE DateUpdated >= @Since;
+
+END;
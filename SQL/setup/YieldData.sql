@@ -8,3 +8,8 @@ BEGIN
         DateUpdated DATETIME DEFAULT GETDATE() NOT NULL
     )
 END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_YieldData_InstrumentName_Date' AND object_id = OBJECT_ID('YieldData'))
+BEGIN
+    CREATE INDEX IX_YieldData_InstrumentName_Date ON YieldData (InstrumentName, Date) INCLUDE (Yield, DateUpdated)
+END
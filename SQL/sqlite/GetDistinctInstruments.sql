@@ -0,0 +1,6 @@
+-- List the instruments with data, optionally within a date range
+SELECT DISTINCT InstrumentName
+FROM YieldData
+WHERE (?1 IS NULL OR Date >= ?1)
+  AND (?2 IS NULL OR Date <= ?2)
+ORDER BY InstrumentName;
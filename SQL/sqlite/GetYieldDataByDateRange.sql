@@ -0,0 +1,4 @@
+-- Retrieve YieldData by date range
+SELECT Id, InstrumentName, Date, Yield, DateUpdated
+FROM YieldData
+WHERE Date >= ? AND Date <= ?;
@@ -0,0 +1,28 @@
+-- Retrieve YieldData filtered, sampled and paged in the database
+--   ?1, ?2: Start and end date
+--   ?3: LIKE pattern of the instrument names (escaped with '\'), or NULL
+--   ?4: JSON array of instrument names, or NULL
+--   ?5: NULL for every date, 'FIRST_OF_MONTH' for the first calendar day of each month, 'MONTH_START' for the
+--       first observation of each month and 'WEEK_END' for the last observation of each week (Monday to
+--       Sunday), per instrument
+--   ?6, ?7: Offset and page size of the result ordered by instrument and date (page size NULL for all rows)
+WITH Filtered AS (
+    SELECT Id, InstrumentName, Date, Yield, DateUpdated,
+           ROW_NUMBER() OVER (PARTITION BY InstrumentName, strftime('%Y-%m', Date) ORDER BY Date) AS MonthRank,
+           ROW_NUMBER() OVER (PARTITION BY InstrumentName,
+                              date(Date, '-' || ((CAST(strftime('%w', Date) AS INTEGER) + 6) % 7) || ' days')
+                              ORDER BY Date DESC) AS WeekRank
+    FROM YieldData
+    WHERE Date >= ?1 AND Date <= ?2
+      AND (?3 IS NULL OR InstrumentName LIKE ?3 ESCAPE '\')
+      AND (?4 IS NULL OR InstrumentName IN (SELECT value FROM json_each(?4)))
+      AND (?5 IS NULL OR ?5 <> 'FIRST_OF_MONTH' OR strftime('%d', Date) = '01')
+)
+SELECT Id, InstrumentName, Date, Yield, DateUpdated
+FROM Filtered
+WHERE ?5 IS NULL
+   OR ?5 = 'FIRST_OF_MONTH'
+   OR (?5 = 'MONTH_START' AND MonthRank = 1)
+   OR (?5 = 'WEEK_END' AND WeekRank = 1)
+ORDER BY InstrumentName, Date
+LIMIT coalesce(?7, -1) OFFSET ?6;
@@ -0,0 +1,4 @@
+-- Retrieve YieldData rows inserted or updated since a given time
+SELECT Id, InstrumentName, Date, Yield, DateUpdated
+FROM YieldData
+WHERE DateUpdated >= ?;
@@ -0,0 +1,6 @@
+-- Insert or update data into the YieldData table
+INSERT INTO YieldData (InstrumentName, Date, Yield, DateUpdated)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (InstrumentName, Date) DO UPDATE SET
+    Yield = excluded.Yield,
+    DateUpdated = excluded.DateUpdated;
@@ -0,0 +1,15 @@
+-- Create the YieldData table for the embedded SQLite backend
+CREATE TABLE IF NOT EXISTS YieldData (
+    Id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    InstrumentName TEXT NOT NULL,
+    Date TEXT NOT NULL,
+    Yield REAL NOT NULL,
+    DateUpdated TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+-- One row per instrument and date; also serves lookups by instrument
+CREATE UNIQUE INDEX IF NOT EXISTS IX_YieldData_InstrumentName_Date ON YieldData (InstrumentName, Date);
+
+-- Date-range and incremental refresh queries
+CREATE INDEX IF NOT EXISTS IX_YieldData_Date ON YieldData (Date);
+CREATE INDEX IF NOT EXISTS IX_YieldData_DateUpdated ON YieldData (DateUpdated);
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ARXYieldDataStore import ARXYieldDataStore
+
+CURVES = (("1_YR", 0.5), ("10_YR", 1.5))
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """
+    Factory of a SQLite yield data store in tmp_path, with its config.json in tmp_path / "config" and its CSV
+    files in tmp_path / "sources".
+
+    Given a date range, a random-walk CSV file (seeded by `seed`) of every (maturity, base yield) in `curves`
+    is written for the business days of the range and loaded into the database.
+    """
+    def make(start_date=None, end_date=None, seed=0, curves=CURVES):
+        config_directory = tmp_path / "config"
+        config_directory.mkdir()
+        with open(config_directory / "config.json", "w") as config_file:
+            json.dump({"backend": "sqlite", "database_path": str(tmp_path / "ARXFinance.db")}, config_file)
+
+        data_directory = tmp_path / "sources"
+        data_directory.mkdir()
+        if start_date is not None:
+            dates = pd.bdate_range(start_date, end_date)
+            rng = np.random.default_rng(seed)
+            for maturity, base in curves:
+                pd.DataFrame({"InstrumentName": f"US_TREASURY_{maturity}", "Date": dates.strftime("%Y-%m-%d"),
+                              "Yield": base + np.cumsum(rng.normal(0, 0.02, len(dates)))}
+                             ).to_csv(data_directory / f"US_TREASURY_{maturity}_yield_data.csv", index=False)
+
+        store = ARXYieldDataStore.create(data_directory=data_directory, config_directory=config_directory,
+                                         sql_directory="SQL")
+        store.setup_database()
+        if start_date is not None:
+            store.execute_bulk_insert()
+        return store
+
+    return make
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from ARXAcquisitionRunner import ARXAcquisitionRunner, ARXRateLimiter
+from ARXApiResponseCache import ARXApiResponseCache
+
+
+class LocalDatalinks:
+    """Stand-in for the remote API: each datalink code answers after a delay and may fail a number of times."""
+
+    def __init__(self, delays, failures=None):
+        dates = pd.bdate_range("2021-01-01", "2021-01-31")
+        self.data = pd.DataFrame({"3 MO": [0.05] * len(dates), "10 YR": [1.0] * len(dates)},
+                                 index=pd.DatetimeIndex(dates, name="Date"))
+        self.delays = delays
+        self.failures = dict(failures or {})
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, datalink_code, start_date, end_date):
+        with self.lock:
+            self.requests.append(datalink_code)
+            failing = self.failures.get(datalink_code, 0)
+            if failing:
+                self.failures[datalink_code] = failing - 1
+        time.sleep(self.delays.get(datalink_code, 0))
+        if failing:
+            raise ConnectionError(f"{datalink_code} unavailable")
+        return self.data[start_date:end_date]
+
+
+def make_runner(tmp_path, datalinks, sources, **kwargs):
+    kwargs.setdefault("response_cache", ARXApiResponseCache(tmp_path / "cache"))
+    return ARXAcquisitionRunner(sources, "2021-01-01", "2021-01-31", config_directory=tmp_path,
+                                destination_directory=tmp_path / "sources",
+                                fetcher=datalinks, backoff=0.01, **kwargs)
+
+
+def source(ticker, code, **kwargs):
+    return dict(ticker=ticker, maturities=["3 MO", "10 YR"], nasdaq_datalink_code=code, **kwargs)
+
+
+def test_sources_are_fetched_concurrently(tmp_path):
+    codes = [f"CODE/{i}" for i in range(4)]
+    datalinks = LocalDatalinks({code: 0.3 for code in codes})
+    runner = make_runner(tmp_path, datalinks, [source(f"CURVE {i}", code) for i, code in enumerate(codes)])
+
+    start_time = time.perf_counter()
+    results = runner.run()
+
+    # The job takes about as long as one source, not the sum of all of them
+    assert time.perf_counter() - start_time < 0.9
+    assert all(result["status"] == "ok" for result in results.values())
+    assert sorted(file.name for file in (tmp_path / "sources").iterdir()) == sorted(
+        f"CURVE_{i}_{maturity}_yield_data.csv" for i in range(4) for maturity in ("3_MO", "10_YR"))
+
+
+def test_failures_are_retried_and_isolated(tmp_path):
+    datalinks = LocalDatalinks({}, failures={"FLAKY/CODE": 2, "DOWN/CODE": 10})
+    runner = make_runner(tmp_path, datalinks, [source("FLAKY", "FLAKY/CODE"), source("DOWN", "DOWN/CODE"),
+                                               source("GOOD", "GOOD/CODE")], retries=3)
+
+    results = runner.run()
+
+    assert results["FLAKY (FLAKY/CODE)"]["status"] == "ok"
+    assert results["FLAKY (FLAKY/CODE)"]["attempts"] == 3
+    assert results["GOOD (GOOD/CODE)"]["status"] == "ok"
+    assert results["DOWN (DOWN/CODE)"] == {"status": "error", "error": "DOWN/CODE unavailable"}
+    assert datalinks.requests.count("DOWN/CODE") == 4
+    assert (tmp_path / "sources" / "GOOD_3_MO_yield_data.csv").exists()
+    assert not (tmp_path / "sources" / "DOWN_3_MO_yield_data.csv").exists()
+
+
+def test_rate_limit_is_shared_per_datalink_code(tmp_path):
+    datalinks = LocalDatalinks({})
+    runner = make_runner(tmp_path, datalinks, [source(f"CURVE {i}", "SHARED/CODE", rate_limit=10)
+                                               for i in range(4)], response_cache=None)
+
+    start_time = time.perf_counter()
+    runner.run()
+
+    assert len(datalinks.requests) == 4
+    # Four requests at ten per second are spread over at least 0.3 seconds
+    assert time.perf_counter() - start_time >= 0.3
+
+
+@pytest.mark.parametrize("rate", [None, 0])
+def test_rate_limiter_without_rate_does_not_wait(rate):
+    limiter = ARXRateLimiter(rate)
+    start_time = time.perf_counter()
+    for _ in range(100):
+        limiter.wait()
+    assert time.perf_counter() - start_time < 0.1
+
+
+def test_sources_must_not_collide(tmp_path):
+    datalinks = LocalDatalinks({})
+    with pytest.raises(ValueError, match="listed more than once"):
+        make_runner(tmp_path, datalinks, [source("CURVE", "CODE/A"), source("CURVE", "CODE/A")])
+
+    # The same ticker from two datalink codes would write the same CSV files
+    with pytest.raises(ValueError, match="CURVE_3_MO_yield_data.csv"):
+        make_runner(tmp_path, datalinks, [source("CURVE", "CODE/A"), source("CURVE", "CODE/B")])
+
+    make_runner(tmp_path, datalinks, [source("CURVE", "CODE/A"),
+                                      dict(ticker="CURVE", maturities=["30 YR"], nasdaq_datalink_code="CODE/B")])
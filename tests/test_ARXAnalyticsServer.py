@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from ARXAnalyticsServer import ARXAnalyticsServer, ARXLatencyStats, ARXReadWriteLock
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXRiskActions import ARXRiskActions
+
+PORTFOLIO = {"US_TREASURY_10_YR": 0.7, "US_TREASURY_1_YR": 0.3}
+
+
+@pytest.fixture
+def store(sqlite_store):
+    return sqlite_store("2021-01-01", "2022-06-30", seed=5)
+
+
+@pytest.fixture
+def server(store, tmp_path):
+    server = ARXAnalyticsServer(store, "2021-01-01", port=0, workers=4, refresh_interval=None,
+                                cache_directory=tmp_path / "cache")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=60)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+
+
+def request(server, path, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    with urllib.request.urlopen(urllib.request.Request(f"http://127.0.0.1:{server.port}{path}", data=data),
+                                timeout=60) as response:
+        return json.load(response)
+
+
+def test_var_matches_the_risk_actions(server, store):
+    result = request(server, "/var", {"portfolio": PORTFOLIO, "start_date": "2021-06-01",
+                                      "end_date": "2022-03-31", "methods": ["historical", "parametric"]})
+
+    simulation = ARXPortfolioSimulation(store.execute_get_yield_data_by_date_range("2021-01-01", "2022-06-30"))
+    expected = ARXRiskActions.var(simulation, PORTFOLIO, "2021-06-01", "2022-03-31",
+                                  methods=["historical", "parametric"])
+    for method in ("historical", "parametric"):
+        for percentile in ("0.95", "0.99"):
+            assert result[method][percentile]["var"] == pytest.approx(expected[method][percentile]["var"])
+            assert result[method][percentile]["es"] == pytest.approx(expected[method][percentile]["es"])
+
+
+def test_concurrent_requests_and_latency_stats(server):
+    bodies = [("/var", {"portfolio": PORTFOLIO, "methods": ["historical"]}),
+              ("/simulate", {"portfolio": PORTFOLIO, "start_date": "2022-01-01"}),
+              ("/dv01", {"start_date": "2021-01-01", "end_date": "2022-06-30"})] * 8
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda item: request(server, *item), bodies))
+
+    assert all("historical" in result for result in results[0::3])
+    assert all(result["dates"][0] >= "2022-01-03" for result in results[1::3])
+    assert all(len(result) == len(results[2]) and result for result in results[2::3])
+
+    stats = request(server, "/stats")
+    for endpoint in ("POST /var", "POST /simulate", "POST /dv01"):
+        latency = stats["latency"][endpoint]
+        assert latency["count"] == 8
+        assert 0 < latency["p50_ms"] <= latency["p95_ms"] <= latency["p99_ms"] <= latency["max_ms"]
+    assert stats["dataset"]["instruments"] == ["US_TREASURY_10_YR", "US_TREASURY_1_YR"]
+
+
+def test_bad_requests(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/var", {"portfolio": {"UNKNOWN": 1.0}})
+    assert error.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/unknown")
+    assert error.value.code == 404
+
+
+def test_refresh_appends_new_dates(server, store):
+    dates = server.simulation.dates
+    assert server.refresh_once() == "unchanged"
+
+    new_dates = pd.bdate_range("2022-07-01", "2022-07-15").strftime("%Y-%m-%d")
+    for maturity in ("1_YR", "10_YR"):
+        pd.DataFrame({"InstrumentName": f"US_TREASURY_{maturity}", "Date": new_dates, "Yield": 1.0}).to_csv(
+            store.data_directory / f"US_TREASURY_{maturity}_yield_data.csv", mode="a", header=False, index=False)
+    store.execute_bulk_insert()
+
+    assert server.refresh_once() == "appended"
+    assert len(server.simulation.dates) == len(dates) + len(new_dates)
+    assert request(server, "/stats")["dataset"]["last_date"].startswith("2022-07-15")
+
+    simulated = request(server, "/simulate", {"portfolio": PORTFOLIO, "start_date": "2022-07-01"})
+    assert len(simulated["dates"]) == len(new_dates)
+
+
+def test_latency_stats_window():
+    stats = ARXLatencyStats(window=3)
+    for seconds in (1.0, 0.001, 0.002, 0.003):
+        stats.record("GET /health", seconds)
+
+    summary = stats.summary()["GET /health"]
+    assert summary["count"] == 4
+    assert summary["max_ms"] == pytest.approx(3)
+    assert summary["p50_ms"] == pytest.approx(2)
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ARXReadWriteLock()
+    lock.acquire_read()
+    events = []
+
+    def write():
+        lock.acquire_write()
+        events.append("write")
+        lock.release_write()
+
+    def read():
+        lock.acquire_read()
+        events.append("read")
+        lock.release_read()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not lock._writers_waiting:
+        time.sleep(0.001)
+    reader = threading.Thread(target=read)
+    reader.start()
+    time.sleep(0.05)
+
+    # The new reader waits behind the writer, which waits for the first reader
+    assert events == []
+    lock.release_read()
+    writer.join(timeout=5)
+    reader.join(timeout=5)
+    assert events == ["write", "read"]
+
+
+def test_refresh_rebuilds_on_corrections(server, store):
+    path = store.data_directory / "US_TREASURY_1_YR_yield_data.csv"
+    df = pd.read_csv(path)
+    df.loc[df["Date"] == "2021-03-01", "Yield"] = 9.0
+    df.to_csv(path, index=False)
+    store.execute_bulk_insert()
+
+    assert server.refresh_once() == "rebuilt"
+    assert server.simulation.data.loc[pd.Timestamp("2021-03-01"), "US_TREASURY_1_YR"] == 9.0
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from ARXApiDataAcquire import ARXApiDataAcquire
+from ARXApiResponseCache import ARXApiResponseCache
+
+
+class LocalDatalink:
+    """Stand-in for the remote API serving a fixed yield curve history and recording the requests it receives."""
+
+    def __init__(self):
+        dates = pd.bdate_range("2021-01-01", "2021-03-31")
+        self.data = pd.DataFrame({"3 MO": [0.05 + i / 1000 for i in range(len(dates))],
+                                  "10 YR": [1.0 + i / 1000 for i in range(len(dates))]},
+                                 index=pd.DatetimeIndex(dates, name="Date"))
+        self.requests = []
+
+    def __call__(self, datalink_code, start_date, end_date):
+        self.requests.append((datalink_code, start_date, end_date))
+        return self.data[start_date:end_date]
+
+
+@pytest.fixture
+def datalink():
+    return LocalDatalink()
+
+
+def make_acquirer(tmp_path, datalink, start_date, end_date, ttl=3600):
+    return ARXApiDataAcquire("US TREASURY", start_date, end_date, ["3 MO", "10 YR"], config_directory=tmp_path,
+                             destination_directory=tmp_path / "sources",
+                             response_cache=ARXApiResponseCache(tmp_path / "cache", ttl=ttl), fetcher=datalink)
+
+
+def test_requests_only_gaps(tmp_path, datalink):
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-01-31").get_yield_data()
+    data = make_acquirer(tmp_path, datalink, "2021-01-15", "2021-02-28").get_yield_data()
+
+    assert datalink.requests == [("USTREASURY/YIELD", "2021-01-01", "2021-01-31"),
+                                 ("USTREASURY/YIELD", "2021-02-01", "2021-02-28")]
+    pd.testing.assert_frame_equal(data, datalink.data["2021-01-15":"2021-02-28"], check_freq=False,
+                                  check_names=False)
+
+    # A repeated request is served entirely from the cache
+    make_acquirer(tmp_path, datalink, "2021-01-04", "2021-02-26").get_yield_data()
+    assert len(datalink.requests) == 2
+
+
+def test_expired_ranges_are_refetched(tmp_path, datalink):
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-01-31", ttl=0).get_yield_data()
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-01-31", ttl=0).get_yield_data()
+
+    assert len(datalink.requests) == 2
+
+
+def test_save_to_csv_appends(tmp_path, datalink):
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-01-31").save_to_csv()
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-02-28").save_to_csv()
+
+    saved = pd.read_csv(tmp_path / "sources" / "US_TREASURY_10_YR_yield_data.csv")
+    expected = datalink.data["2021-01-01":"2021-02-28"]
+    assert list(saved.columns) == ["InstrumentName", "Date", "Yield"]
+    assert list(pd.to_datetime(saved["Date"])) == list(expected.index)
+    assert list(saved["Yield"]) == list(expected["10 YR"])
+
+
+def test_refetched_ranges_stay_fresh(tmp_path, datalink, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("ARXApiResponseCache.time.time", lambda: clock["now"])
+
+    for now in (1000, 1050, 1200, 1210, 1220):
+        clock["now"] = now
+        make_acquirer(tmp_path, datalink, "2021-01-01", "2021-01-31", ttl=100).get_yield_data()
+
+    # Fetched at 1000, served at 1050, expired and refetched at 1200, then fresh again
+    assert len(datalink.requests) == 2
+
+
+def test_save_to_csv_merges_backfills(tmp_path, datalink):
+    make_acquirer(tmp_path, datalink, "2021-02-01", "2021-02-28").save_to_csv()
+    make_acquirer(tmp_path, datalink, "2021-01-01", "2021-03-31").save_to_csv()
+
+    # The earlier dates are merged in by date rather than dropped, and the later ones are kept too
+    saved = pd.read_csv(tmp_path / "sources" / "US_TREASURY_3_MO_yield_data.csv")
+    expected = datalink.data["2021-01-01":"2021-03-31"]
+    assert list(pd.to_datetime(saved["Date"])) == list(expected.index)
+    assert list(saved["Yield"]) == pytest.approx(list(expected["3 MO"]))
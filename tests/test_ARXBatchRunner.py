@@ -0,0 +1,114 @@
+import json
+
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from ARXBatchRunner import cli
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXRiskActions import ARXRiskActions
+from ARXVar import ARXHistoricalSimulation
+from ARXYieldDataStore import ARXYieldDataStore
+
+
+@pytest.fixture
+def workspace(sqlite_store, tmp_path):
+    sqlite_store("2021-01-01", "2022-12-30", seed=4)
+    with open(tmp_path / "config" / "portfolio.json", "w") as portfolio_file:
+        json.dump({"US_TREASURY_10_YR": 0.7, "US_TREASURY_1_YR": 0.3}, portfolio_file)
+    return tmp_path
+
+
+def invoke(workspace, *args):
+    return CliRunner().invoke(cli, ["--config-dir", str(workspace / "config"), "--data-dir",
+                                    str(workspace / "sources"), "--cache-dir", str(workspace / "cache"),
+                                    "--result-cache-dir", str(workspace / "results"), *args])
+
+
+def test_jobs_run_over_one_dataset(workspace):
+    job_file = workspace / "jobs.json"
+    portfolio = str(workspace / "config" / "portfolio.json")
+    with open(job_file, "w") as file:
+        json.dump({"jobs": [
+            {"name": "var-2021", "action": "var", "start_date": "2021-01-01", "end_date": "2021-12-31",
+             "portfolio": portfolio, "methods": ["historical", "parametric"]},
+            {"name": "var-2022", "action": "var", "start_date": "2022-01-01", "end_date": "2022-12-31",
+             "portfolio": {"US_TREASURY_1_YR": 1.0}, "methods": ["historical"]},
+            {"name": "simulate", "action": "simulate", "start_date": "2021-01-01", "end_date": "2022-12-31",
+             "portfolio": portfolio, "output": str(workspace / "out" / "simulate.csv")},
+            {"name": "dv01", "action": "dv01", "start_date": "2021-01-01", "end_date": "2022-12-31",
+             "output": str(workspace / "out" / "dv01.csv")},
+            {"name": "broken", "action": "var", "start_date": "2021-01-01", "end_date": "2021-12-31",
+             "portfolio": {"UNKNOWN": 1.0}},
+        ]}, file)
+
+    result = invoke(workspace, "jobs", str(job_file), "--output", str(workspace / "results.json"))
+
+    # The broken job fails on its own and makes the run exit non-zero
+    assert result.exit_code == 1
+    with open(workspace / "results.json") as file:
+        results = {job["name"]: job for job in json.load(file)["jobs"]}
+    assert [results[name]["status"] for name in ("var-2021", "var-2022", "simulate", "dv01")] == ["ok"] * 4
+    assert results["broken"]["status"] == "error"
+
+    # Loading only the year gives the same VaR as reading it from the shared dataset
+    store = ARXYieldDataStore.create(data_directory=workspace / "sources", config_directory=workspace / "config",
+                                     sql_directory="SQL")
+    simulation = ARXPortfolioSimulation(store.execute_get_yield_data_by_date_range("2022-01-01", "2022-12-31"))
+    simulation.set_weights({"US_TREASURY_1_YR": 1.0})
+    simulation.simulate()
+    expected = ARXHistoricalSimulation().calculate(simulation.get_portfolio_delta_yield(), 0.99)
+    assert results["var-2022"]["result"]["historical"]["0.99"]["var"] == pytest.approx(expected)
+
+    simulated = pd.read_csv(workspace / "out" / "simulate.csv")
+    assert len(simulated) == results["simulate"]["result"]["dates"] == 521
+    dv01 = pd.read_csv(workspace / "out" / "dv01.csv")
+    assert list(dv01.columns) == ["Date", "US_TREASURY_10_YR", "US_TREASURY_1_YR"]
+
+
+def test_single_var_command(workspace):
+    result = invoke(workspace, "var", "--start", "2021-01-01", "--end", "2022-12-31", "--portfolio",
+                    str(workspace / "config" / "portfolio.json"), "--method", "monte_carlo", "--paths", "20000",
+                    "--seed", "3")
+
+    assert result.exit_code == 0, result.output
+    outcome = json.loads(result.output)
+    assert outcome["status"] == "ok"
+    assert outcome["result"]["monte_carlo"]["diagnostics"]["paths"] == 20000
+    assert outcome["result"]["monte_carlo"]["0.99"]["es"] < outcome["result"]["monte_carlo"]["0.99"]["var"]
+
+
+def test_yield_changes_start_the_range_without_a_change(workspace):
+    store = ARXYieldDataStore.create(data_directory=workspace / "sources", config_directory=workspace / "config",
+                                     sql_directory="SQL")
+    simulation = ARXPortfolioSimulation(store.execute_get_yield_data_by_date_range("2021-01-01", "2022-12-31"))
+
+    changes = ARXRiskActions.yield_changes(simulation, {"US_TREASURY_1_YR": 1.0}, "2022-01-01", "2022-12-31")
+
+    assert changes.index[0] == pd.Timestamp("2022-01-03")
+    assert changes.iloc[0, 0] == 0
+    assert changes.iloc[1:, 0].abs().sum() > 0
+
+
+def test_save_jobs_run_before_the_dataset_is_loaded(workspace):
+    new_dates = pd.bdate_range("2023-01-02", "2023-01-31").strftime("%Y-%m-%d")
+    for maturity in ("1_YR", "10_YR"):
+        pd.DataFrame({"InstrumentName": f"US_TREASURY_{maturity}", "Date": new_dates, "Yield": 1.0}).to_csv(
+            workspace / "sources" / f"US_TREASURY_{maturity}_yield_data.csv", mode="a", header=False, index=False)
+
+    job_file = workspace / "jobs.json"
+    with open(job_file, "w") as file:
+        json.dump({"jobs": [
+            {"name": "save", "action": "save"},
+            {"name": "simulate", "action": "simulate", "start_date": "2023-01-01", "end_date": "2023-01-31",
+             "portfolio": str(workspace / "config" / "portfolio.json"),
+             "output": str(workspace / "out" / "simulate.csv")},
+            # Compared as text, '2023-1-5' would sort after '2023-01-31' and cut the dataset short
+            {"name": "dv01", "action": "dv01", "start_date": "2022-12-1", "end_date": "2023-1-5"},
+        ]}, file)
+
+    result = invoke(workspace, "jobs", str(job_file), "--output", str(workspace / "results.json"))
+    assert result.exit_code == 0, result.output
+
+    simulated = pd.read_csv(workspace / "out" / "simulate.csv")
+    assert simulated.iloc[-1, 0].startswith("2023-01-31")
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ARXCompactYieldData import ARXCompactYieldData
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXYieldDataCache import ARXYieldDataCache
+
+
+@pytest.fixture
+def long_data():
+    rows = [
+        ["id-1", "US_TREASURY_10_YR", "2023-01-03", 3.5, "2023-02-01"],
+        ["id-2", "US_TREASURY_3_MO", "2023-01-03", 4.1, "2023-02-01"],
+        ["id-3", "US_TREASURY_10_YR", "2023-01-04", 3.6, "2023-02-01"],
+        ["id-4", "US_TREASURY_3_MO", "2023-01-05", 4.2, "2023-02-01"],
+        # A duplicate instrument and date: the first row is kept
+        ["id-5", "US_TREASURY_10_YR", "2023-01-04", 9.9, "2023-02-01"],
+    ]
+    df = pd.DataFrame(rows, columns=["Id", "InstrumentName", "Date", "Yield", "DateUpdated"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def test_to_wide_matches_pivot(long_data):
+    compact = ARXCompactYieldData.from_frame(long_data)
+
+    expected = ARXPortfolioSimulation(long_data).data
+    pd.testing.assert_frame_equal(compact.to_wide(), expected, check_freq=False, check_index_type=False)
+    pd.testing.assert_frame_equal(ARXPortfolioSimulation(compact).data, expected, check_freq=False, check_index_type=False)
+
+
+def test_compact_columns(long_data):
+    compact = ARXCompactYieldData.from_frame(long_data, float32=True)
+
+    assert len(compact) == 5
+    assert compact.instruments == ["US_TREASURY_10_YR", "US_TREASURY_3_MO"]
+    assert compact.codes.dtype == np.int16 and compact.days.dtype == np.int32
+    assert compact.yields.dtype == np.float32
+    assert compact.nbytes == 5 * (2 + 4 + 4)
+    assert compact.dates()[0] == np.datetime64("2023-01-03")
+
+    frame = compact.to_frame()
+    assert frame["InstrumentName"].astype(str).tolist() == long_data["InstrumentName"].tolist()
+    np.testing.assert_allclose(frame["Yield"], long_data["Yield"], rtol=1e-6)
+
+
+def test_cache_serves_compact_data(tmp_path, long_data):
+    class LocalYieldDataAccess:
+        def execute_get_yield_data_by_date_range(self, start_date, end_date):
+            return long_data.drop_duplicates(subset=["InstrumentName", "Date"])
+
+    cache = ARXYieldDataCache(LocalYieldDataAccess(), cache_directory=tmp_path)
+    compact = cache.execute_get_compact_yield_data_by_date_range("2023-01-01", "2023-01-04")
+
+    assert len(compact) == 3
+    wide = compact.to_wide()
+    assert list(wide.columns) == ["US_TREASURY_10_YR", "US_TREASURY_3_MO"]
+    assert wide.loc["2023-01-04", "US_TREASURY_10_YR"] == 3.6
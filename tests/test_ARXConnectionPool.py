@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from ARXConnectionPool import ARXConnectionPool
+
+
+class LocalCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, *params):
+        if self.connection.broken:
+            raise RuntimeError("connection lost")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class LocalConnection:
+    """Stand-in for a DB-API connection that can be marked as broken."""
+
+    def __init__(self):
+        self.broken = False
+        self.closed = False
+
+    def cursor(self):
+        return LocalCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_connections_are_reused():
+    opened = []
+    pool = ARXConnectionPool("local", size=2, connect=lambda conn_str: opened.append(LocalConnection()) or opened[-1])
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(opened) == 1
+
+    stats = pool.statistics()
+    assert stats["checkouts"] == 2
+    assert stats["connections_opened"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_size_is_bounded():
+    pool = ARXConnectionPool("local", size=1, timeout=0.05, connect=lambda conn_str: LocalConnection())
+
+    held = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(held)
+
+    # Once released, another thread can check the connection out
+    results = []
+    thread = threading.Thread(target=lambda: results.append(pool.acquire()))
+    thread.start()
+    thread.join()
+    assert results == [held]
+    assert pool.statistics()["timeouts"] == 1
+
+
+def test_broken_connection_is_reopened():
+    pool = ARXConnectionPool("local", size=1, health_check_interval=0, connect=lambda conn_str: LocalConnection())
+
+    with pool.connection() as pooled:
+        pooled.connection.broken = True
+
+    with pool.connection() as reopened:
+        assert reopened is not pooled
+        assert not reopened.connection.broken
+
+    assert pooled.connection.closed
+    assert pool.statistics()["reconnects"] == 1
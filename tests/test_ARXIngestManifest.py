@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from ARXIngestManifest import ARXIngestManifest
+
+
+def write_csv(path, dates, yields):
+    pd.DataFrame({
+        "InstrumentName": ["US_TREASURY_5_YR"] * len(dates),
+        "Date": dates,
+        "Yield": yields
+    }).to_csv(path, index=False)
+
+
+@pytest.fixture
+def store(sqlite_store):
+    return sqlite_store()
+
+
+def test_appended_offset(tmp_path):
+    csv_file = tmp_path / "a.csv"
+    write_csv(csv_file, ["2021-01-04", "2021-01-05"], [0.3, 0.31])
+    known = ARXIngestManifest.fingerprint(csv_file)
+    assert ARXIngestManifest.appended_offset(csv_file, None) is None
+    assert ARXIngestManifest.appended_offset(csv_file, known) is None
+
+    # Rows appended after the loaded contents start at the loaded size
+    write_csv(csv_file, ["2021-01-04", "2021-01-05", "2021-01-06"], [0.3, 0.31, 0.32])
+    assert ARXIngestManifest.appended_offset(csv_file, known) == known[1]
+
+    # A correction to a loaded row rewrites the file
+    write_csv(csv_file, ["2021-01-04", "2021-01-05", "2021-01-06"], [0.3, 0.35, 0.32])
+    assert ARXIngestManifest.appended_offset(csv_file, known) is None
+
+
+def test_rerun_skips_unchanged_and_sends_only_new_rows(store):
+    csv_file = store.data_directory / "US_TREASURY_5_YR_yield_data.csv"
+    write_csv(csv_file, ["2021-01-04", "2021-01-05"], [0.3, 0.31])
+    assert store.execute_bulk_insert() == 2
+
+    # An unchanged file is skipped
+    assert store.execute_bulk_insert() == 0
+
+    # Only the appended date is sent from a changed file
+    write_csv(csv_file, ["2021-01-04", "2021-01-05", "2021-01-06"], [0.3, 0.31, 0.32])
+    assert store.execute_bulk_insert() == 1
+    assert len(store.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 3
+
+    manifest = ARXIngestManifest.for_directory(store.data_directory)
+    assert manifest.files[csv_file.name]["max_dates"] == {"US_TREASURY_5_YR": "2021-01-06"}
+
+    # A correction to a loaded date rewrites the file, so every row of the file is sent
+    write_csv(csv_file, ["2021-01-04", "2021-01-05", "2021-01-06", "2021-01-07"], [0.3, 0.35, 0.32, 0.33])
+    assert store.execute_bulk_insert() == 4
+    df = store.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31").set_index("Date")
+    assert df.loc[pd.Timestamp("2021-01-05"), "Yield"] == 0.35
+    assert manifest.for_directory(store.data_directory).files[csv_file.name]["max_dates"] == {
+        "US_TREASURY_5_YR": "2021-01-07"}
+
+    # Rows appended with an already-loaded date are sent too
+    pd.DataFrame({"InstrumentName": ["US_TREASURY_5_YR"], "Date": ["2021-01-04"], "Yield": [0.29]}).to_csv(
+        csv_file, mode="a", header=False, index=False)
+    assert store.execute_bulk_insert() == 1
+    df = store.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31").set_index("Date")
+    assert df.loc[pd.Timestamp("2021-01-04"), "Yield"] == 0.29
+
+    # A full reload sends every row again
+    assert store.execute_bulk_insert(incremental=False) == 4
+
+
+def test_parallel_insert_isolates_failures(store):
+    for maturity in ("1_YR", "5_YR", "10_YR"):
+        pd.DataFrame({
+            "InstrumentName": [f"US_TREASURY_{maturity}"] * 2,
+            "Date": ["2021-01-04", "2021-01-05"],
+            "Yield": [0.3, 0.31]
+        }).to_csv(store.data_directory / f"US_TREASURY_{maturity}_yield_data.csv", index=False)
+
+    # A file without a Yield column fails to parse
+    pd.DataFrame({"InstrumentName": ["US_TREASURY_30_YR"], "Date": ["2021-01-04"]}).to_csv(
+        store.data_directory / "US_TREASURY_30_YR_yield_data.csv", index=False)
+
+    total_rows, failures = store.execute_parallel_insert(workers=2, connections=2)
+    assert total_rows == 6
+    assert list(failures) == ["US_TREASURY_30_YR_yield_data.csv"]
+    assert len(store.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 6
+
+    # Only the failed file is retried on the next run
+    manifest = ARXIngestManifest.for_directory(store.data_directory)
+    assert "US_TREASURY_30_YR_yield_data.csv" not in manifest.files
+    total_rows, failures = store.execute_parallel_insert(workers=2)
+    assert total_rows == 0
+    assert list(failures) == ["US_TREASURY_30_YR_yield_data.csv"]
+
+
+def test_parallel_insert_with_more_files_than_in_flight(store):
+    for index in range(7):
+        write_csv(store.data_directory / f"CURVE_{index}_yield_data.csv", ["2021-01-04", "2021-01-05"], [0.3, 0.31])
+
+    total_rows, failures = store.execute_parallel_insert(workers=1, connections=1)
+    assert (total_rows, failures) == (14, {})
+    assert len(ARXIngestManifest.for_directory(store.data_directory).files) == 7
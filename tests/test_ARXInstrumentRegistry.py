@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from ARXInstrumentRegistry import ARXInstrumentRegistry
+
+
+def test_parse():
+    assert ARXInstrumentRegistry.parse('US_TREASURY_3_MO') == (0.25, 0, ARXInstrumentRegistry.ZERO_COUPON)
+    assert ARXInstrumentRegistry.parse('US_TREASURY_1_YR') == (1.0, 0, ARXInstrumentRegistry.ZERO_COUPON)
+    assert ARXInstrumentRegistry.parse('US_TREASURY_10_YR') == (10.0, 2, ARXInstrumentRegistry.COUPON)
+
+    tenor_years, coupon_frequency, bond_type = ARXInstrumentRegistry.parse('USTreasuryYield')
+    assert np.isnan(tenor_years)
+    assert bond_type == ARXInstrumentRegistry.UNKNOWN
+
+
+def test_get_is_memoized():
+    registry = ARXInstrumentRegistry()
+    record = registry.get('US_TREASURY_5_YR')
+
+    # The same record (and id) is returned for every lookup of the same name
+    assert registry.get('US_TREASURY_5_YR') is record
+    assert registry.get_id('US_TREASURY_30_YR') == record.instrument_id + 1
+    assert len(registry) == 2
+
+
+def test_ids_and_arrays():
+    registry = ARXInstrumentRegistry()
+    names = pd.Series(['US_TREASURY_10_YR', 'US_TREASURY_3_MO', 'US_TREASURY_10_YR', 'A'], dtype='category')
+
+    ids = registry.ids(names)
+    assert ids[0] == ids[2]
+    assert len(registry) == 3
+
+    # Terms are looked up by integer id
+    assert list(registry.tenor_years()[ids[:3]]) == [10.0, 0.25, 10.0]
+    assert list(registry.zero_coupon()[ids[:3]]) == [False, True, False]
+    assert np.isnan(registry.tenor_years()[ids[3]])
+
+
+def test_sort_key():
+    registry = ARXInstrumentRegistry()
+    names = ['US_TREASURY_10_YR', 'B', 'US_TREASURY_1_YR', 'US_TREASURY_3_MO']
+
+    assert sorted(names, key=registry.sort_key) == ['US_TREASURY_3_MO', 'US_TREASURY_1_YR', 'US_TREASURY_10_YR', 'B']
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -49,3 +50,95 @@ def test_simulate():
     assert portfolio_delta_yield.iloc[0] == 0.0  # First value should be zero due to pct_change()
     # Expected value for the second date: 0.6*(1.55-1.5)/1.5 + 0.4*(2.55-2.5)/2.5
     assert round(portfolio_delta_yield.iloc[1], 8) == round(0.028, 8)
+
+
+def test_simulate_batch_matches_single_portfolios():
+    simulation = ARXPortfolioSimulation(df)
+    weights = pd.DataFrame({'A': [0.6, 1.0, 0.0], 'B': [0.4, 0.0, 1.0]}, index=['mixed', 'only A', 'only B'])
+
+    batch = simulation.simulate_batch(weights)
+
+    assert list(batch.columns) == ['mixed', 'only A', 'only B']
+    for name, row in weights.iterrows():
+        single = ARXPortfolioSimulation(df)
+        single.set_weights(row.to_dict())
+        single.simulate()
+        pd.testing.assert_series_equal(batch[name], single.get_portfolio_delta_yield(), check_names=False)
+
+    # The single-portfolio data is left untouched
+    assert list(simulation.data.columns) == ['A', 'B']
+
+
+def test_simulate_batch_after_set_weights_and_missing_columns():
+    simulation = ARXPortfolioSimulation(df)
+    simulation.set_weights({'A': 1.0})
+
+    # Instruments left out of a row (or of set_weights) still take part in the batch
+    batch = simulation.simulate_batch(pd.DataFrame({'B': [1.0]}, index=['only B']))
+    assert round(batch['only B'].iloc[1], 8) == round(0.02, 8)
+
+    with pytest.raises(ValueError):
+        simulation.simulate_batch(pd.DataFrame({'A': [0.6], 'C': [0.4]}))
+    with pytest.raises(ValueError):
+        simulation.simulate_batch(pd.DataFrame({'A': [0.6], 'B': [0.5]}))
+
+
+def test_weights_do_not_narrow_the_data():
+    simulation = ARXPortfolioSimulation(df)
+    simulation.set_weights({'B': 1.0})
+    simulation.simulate()
+    changes = simulation.calculate_yield_changes()
+
+    # The next portfolio can still use every instrument, and the changes are not recomputed
+    simulation.set_weights({'A': 0.6, 'B': 0.4})
+    simulation.simulate()
+    assert np.shares_memory(simulation.calculate_yield_changes(), changes)
+    assert list(simulation.data.columns) == ['A', 'B']
+    assert list(simulation.delta_yield.columns) == ['A', 'B']
+    assert round(simulation.get_portfolio_delta_yield().iloc[1], 8) == round(0.028, 8)
+
+    with pytest.raises(ValueError):
+        simulation.matrix[0, 0] = 0.0
+
+
+def long_history(dates):
+    rng = np.random.default_rng(9)
+    yields = 2 + np.cumsum(rng.normal(0, 0.02, (len(dates), 3)), axis=0)
+    return pd.DataFrame({'Date': np.repeat(dates, 3), 'InstrumentName': np.tile(['A', 'B', 'C'], len(dates)),
+                         'Yield': yields.ravel()})
+
+
+def test_append_matches_full_recomputation():
+    from ARXVar import ARXHistoricalSimulation, ARXParametricSimulation
+
+    dates = pd.bdate_range('2022-01-03', periods=120)
+    history = long_history(dates)
+    weights = {'C': 0.5, 'A': 0.5}
+
+    simulation = ARXPortfolioSimulation(history[history['Date'] < dates[100]])
+    simulation.set_weights(weights)
+    simulation.simulate()
+    simulation.track_rolling_var('historical', ARXHistoricalSimulation(), 0.95, 20)
+    simulation.track_rolling_var('parametric', ARXParametricSimulation(), 0.95, 20)
+
+    # Append the remaining dates one at a time, plus one already held (ignored)
+    assert simulation.append(history[history['Date'] == dates[99]]) == 0
+    for date in dates[100:]:
+        assert simulation.append(history[history['Date'] == date]) == 1
+
+    full = ARXPortfolioSimulation(history)
+    full.set_weights(weights)
+    full.simulate()
+
+    np.testing.assert_array_equal(simulation.matrix, full.matrix)
+    np.testing.assert_allclose(simulation.calculate_yield_changes(), full.calculate_yield_changes())
+    pd.testing.assert_series_equal(simulation.get_portfolio_delta_yield(), full.get_portfolio_delta_yield())
+    for name, strategy in (('historical', ARXHistoricalSimulation()), ('parametric', ARXParametricSimulation())):
+        expected = strategy.calculate_rolling(full.get_portfolio_delta_yield(), 0.95, 20)
+        pd.testing.assert_series_equal(simulation.rolling_var(name), expected, check_index_type=False)
+
+
+def test_append_rejects_new_instruments():
+    simulation = ARXPortfolioSimulation(df)
+    with pytest.raises(ValueError):
+        simulation.append(pd.DataFrame({'Date': ['2023-01-03'], 'InstrumentName': ['C'], 'Yield': [1.0]}))
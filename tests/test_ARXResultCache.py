@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ARXPortfolioSimulation import ARXPortfolioSimulation
+from ARXResultCache import ARXResultCache
+from ARXRiskActions import ARXRiskActions
+
+
+class Counter:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_hits_and_misses():
+    cache = ARXResultCache()
+    compute = Counter({"var": 0.1})
+
+    first = cache.get_or_compute("var", compute, "v1", weights={"A": 0.5, "B": 0.5}, method="historical")
+    second = cache.get_or_compute("var", compute, "v1", weights={"A": 0.5, "B": 0.5}, method="historical")
+    assert first == second == {"var": 0.1}
+    assert compute.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Any change of the inputs is another result
+    cache.get_or_compute("var", compute, "v1", weights={"A": 0.6, "B": 0.4}, method="historical")
+    cache.get_or_compute("var", compute, "v1", weights={"A": 0.5, "B": 0.5}, method="parametric")
+    assert compute.calls == 3
+    assert cache.stats["hit_rate"] == pytest.approx(0.25)
+
+
+def test_results_are_copies():
+    cache = ARXResultCache()
+    frame = pd.DataFrame({"DV01": [1.0, 2.0]})
+    cache.get_or_compute("dv01", lambda: frame, "v1")
+
+    cached = cache.get_or_compute("dv01", Counter(None), "v1")
+    cached.loc[0, "DV01"] = 100.0
+    pd.testing.assert_frame_equal(cache.get_or_compute("dv01", Counter(None), "v1"), frame)
+
+
+def test_new_data_version_invalidates(tmp_path):
+    cache = ARXResultCache(cache_directory=tmp_path)
+    compute = Counter(1.0)
+    cache.get_or_compute("var", compute, "2024-01-01T00:00:00", method="historical")
+    cache.get_or_compute("var", compute, "2024-01-02T00:00:00", method="historical")
+    assert compute.calls == 2
+    assert cache.stats["entries"] == 1
+
+    # Files of the older version stay on disk until the size-based eviction removes them
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+def test_alternating_data_versions_are_hits(tmp_path):
+    cache = ARXResultCache(cache_directory=tmp_path)
+    compute = Counter(1.0)
+    for data_version in ("2024-01-02T00:00:00", "2024-01-01T00:00:00") * 2:
+        cache.get_or_compute("var", compute, data_version, method="historical")
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ARXResultCache(max_memory_bytes=2500)
+    payload = np.zeros(100)  # about 1 KiB pickled
+    for name in ("a", "b"):
+        cache.get_or_compute("simulate", lambda: payload, "v1", name=name)
+    cache.get_or_compute("simulate", Counter(None), "v1", name="a")
+    cache.get_or_compute("simulate", lambda: payload, "v1", name="c")
+
+    # 'b' was the least recently used when 'c' no longer fitted
+    assert cache.stats["entries"] == 2
+    compute = Counter(payload)
+    cache.get_or_compute("simulate", compute, "v1", name="a")
+    assert compute.calls == 0
+    cache.get_or_compute("simulate", compute, "v1", name="b")
+    assert compute.calls == 1
+
+
+def test_disk_tier_is_shared_and_bounded(tmp_path):
+    ARXResultCache(cache_directory=tmp_path).get_or_compute("var", lambda: {"var": 0.2}, "v1", method="historical")
+
+    # Another process (here another instance) reads it from disk
+    cache = ARXResultCache(cache_directory=tmp_path)
+    assert cache.get_or_compute("var", Counter(None), "v1", method="historical") == {"var": 0.2}
+    assert cache.disk_hits == 1
+
+    bounded = ARXResultCache(cache_directory=tmp_path / "bounded", max_disk_bytes=3000)
+    for name in range(5):
+        bounded.get_or_compute("simulate", lambda: np.zeros(100), "v1", name=name)
+    assert sum(path.stat().st_size for path in (tmp_path / "bounded").glob("*.pkl")) <= 3000
+
+
+def test_var_is_memoized():
+    dates = pd.bdate_range("2022-01-03", periods=300)
+    rng = np.random.default_rng(9)
+    df = pd.concat([pd.DataFrame({"Date": dates, "InstrumentName": name,
+                                  "Yield": base + np.cumsum(rng.normal(0, 0.02, len(dates)))})
+                    for name, base in (("US_TREASURY_1_YR", 0.5), ("US_TREASURY_10_YR", 1.5))])
+    simulation = ARXPortfolioSimulation(df)
+    weights = {"US_TREASURY_10_YR": 0.7, "US_TREASURY_1_YR": 0.3}
+    cache = ARXResultCache()
+
+    expected = ARXRiskActions.var(simulation, weights, "2022-02-01", "2022-12-30", methods=["historical"])
+    first = ARXRiskActions.var(simulation, weights, "2022-02-01", "2022-12-30", methods=["historical"],
+                               result_cache=cache, data_version="v1")
+    second = ARXRiskActions.var(simulation, weights, "2022-2-1", "2022-12-30", methods=["historical"],
+                                result_cache=cache, data_version="v1")
+    assert first == second == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    with pytest.raises(ValueError):
+        ARXRiskActions.var(simulation, {"UNKNOWN": 1.0}, result_cache=cache, data_version="v1")
+
+    # Only seeded Monte Carlo runs are reproducible, so only those are memoized
+    for seed in (None, None, 5, 5):
+        ARXRiskActions.var(simulation, weights, methods=["monte_carlo"], paths=2000, workers=1, seed=seed,
+                           result_cache=cache, data_version="v1")
+    assert (cache.hits, cache.misses) == (2, 2)
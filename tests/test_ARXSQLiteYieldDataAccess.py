@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from ARXSQLiteYieldDataAccess import ARXSQLiteYieldDataAccess
+
+
+@pytest.fixture
+def store(sqlite_store):
+    store = sqlite_store()
+    pd.DataFrame({
+        "InstrumentName": ["US_TREASURY_1_YR"] * 3,
+        "Date": ["2021-01-04", "2021-01-05", "2021-01-06"],
+        "Yield": [0.1, 0.11, "."]
+    }).to_csv(store.data_directory / "US_TREASURY_1_YR_yield_data.csv", index=False)
+    return store
+
+
+def test_create_selects_backend(store):
+    assert isinstance(store, ARXSQLiteYieldDataAccess)
+    assert store.verify_db_config()[0]
+
+
+def test_bulk_insert_and_date_range(store):
+    # Rows without a numeric yield are skipped
+    assert store.execute_bulk_insert() == 2
+
+    df = store.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-04")
+    assert len(df) == 1
+    assert df["Date"].iloc[0] == pd.Timestamp("2021-01-04")
+    assert df["Yield"].iloc[0] == 0.1
+    assert store.get_unique_instruments(df) == ["US_TREASURY_1_YR"]
+
+
+def test_upsert_updates_existing_rows(store):
+    store.execute_bulk_insert()
+    first_load = store.execute_get_yield_data_by_date_range("2021-01-01", "2021-12-31")
+
+    pd.DataFrame({
+        "InstrumentName": ["US_TREASURY_1_YR", "US_TREASURY_1_YR"],
+        "Date": ["2021-01-05", "2021-01-07"],
+        "Yield": [0.2, 0.12]
+    }).to_csv(store.data_directory / "US_TREASURY_1_YR_yield_data.csv", index=False)
+
+    store.execute_bulk_insert()
+
+    df = store.execute_get_yield_data_by_date_range("2021-01-01", "2021-12-31").set_index("Date")
+    assert len(df) == 3
+    assert df.loc[pd.Timestamp("2021-01-05"), "Yield"] == 0.2
+
+    # Only the rows touched by the second load are returned as updated since the first load
+    updated = store.execute_get_yield_data_updated_since(first_load["DateUpdated"].max() + pd.Timedelta(microseconds=1))
+    assert sorted(updated["Date"].dt.strftime("%Y-%m-%d")) == ["2021-01-05", "2021-01-07"]
+
+
+@pytest.fixture
+def curve(store):
+    dates = pd.bdate_range("2021-01-01", "2021-03-31")
+    for name in ("US_TREASURY_1_YR", "US_TREASURY_10_YR", "USXTREASURY_5_YR", "CORP_AA_5_YR"):
+        pd.DataFrame({"InstrumentName": name, "Date": dates.strftime("%Y-%m-%d"),
+                      "Yield": range(1, len(dates) + 1)}
+                     ).to_csv(store.data_directory / f"{name}_yield_data.csv", index=False)
+    store.execute_bulk_insert()
+    return store
+
+
+def test_filtered_query_filters_instruments(curve):
+    df = curve.execute_get_filtered_yield_data("2021-01-01", "2021-03-31", instrument_prefix="US_TREASURY_")
+    # '_' is matched literally, not as a LIKE wildcard
+    assert sorted(df["InstrumentName"].unique()) == ["US_TREASURY_10_YR", "US_TREASURY_1_YR"]
+
+    df = curve.execute_get_filtered_yield_data("2021-02-01", "2021-02-28", instruments=["CORP_AA_5_YR"])
+    assert df["InstrumentName"].unique().tolist() == ["CORP_AA_5_YR"]
+    assert len(df) == 20
+
+
+def test_filtered_query_samples_dates(curve):
+    everything = curve.execute_get_yield_data_by_date_range("2021-01-01", "2021-03-31")
+    everything = everything[everything["InstrumentName"] == "US_TREASURY_1_YR"]
+    dates = everything["Date"]
+
+    def sampled(rule):
+        df = curve.execute_get_filtered_yield_data("2021-01-01", "2021-03-31", instruments=["US_TREASURY_1_YR"],
+                                                   sampling=rule)
+        return df["Date"].tolist()
+
+    assert sampled("first_of_month") == dates[dates.dt.day == 1].tolist()
+    assert sampled("month_start") == dates.groupby(dates.dt.to_period("M")).min().tolist()
+    assert sampled("week_end") == dates.groupby(dates.dt.to_period("W-SUN")).max().tolist()
+    assert sampled("month_start")[:2] == [pd.Timestamp("2021-01-01"), pd.Timestamp("2021-02-01")]
+
+    with pytest.raises(ValueError):
+        sampled("quarter_end")
+
+
+def test_filtered_query_pages(curve):
+    full = curve.execute_get_filtered_yield_data("2021-01-01", "2021-03-31", instrument_prefix="US_TREASURY_")
+    pages = [curve.execute_get_filtered_yield_data("2021-01-01", "2021-03-31", instrument_prefix="US_TREASURY_",
+                                                   offset=offset, page_size=50)
+             for offset in range(0, len(full), 50)]
+
+    assert [len(page) for page in pages[:-1]] == [50] * (len(pages) - 1)
+    paged = pd.concat(pages, ignore_index=True)
+    assert paged[["InstrumentName", "Date"]].astype(str).values.tolist() == \
+        full[["InstrumentName", "Date"]].astype(str).values.tolist()
+
+
+def test_distinct_instruments(curve):
+    assert curve.execute_get_distinct_instruments() == ["CORP_AA_5_YR", "USXTREASURY_5_YR", "US_TREASURY_10_YR",
+                                                        "US_TREASURY_1_YR"]
+    assert curve.execute_get_distinct_instruments("2022-01-01", "2022-12-31") == []
+
+    # Database errors are reported rather than raised, as for the other queries
+    curve.distinct_instruments_query = "SELECT InstrumentName FROM MissingTable"
+    assert curve.execute_get_distinct_instruments() is None
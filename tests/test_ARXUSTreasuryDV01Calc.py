@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import pandas as pd
 
@@ -90,6 +91,30 @@ def test_compute_dv01():
     assert abs(dv01 - expected_dv01) < 1e-6
 
 
+def test_dv01_frame_matches_compute_dv01():
+    # A mix of zero-coupon (T-Bills and 1-Year) and coupon instruments, including a zero yield
+    df = pd.DataFrame({
+        'InstrumentName': ['US_TREASURY_3_MO', 'US_TREASURY_1_YR', 'US_TREASURY_5_YR', 'US_TREASURY_10_YR',
+                           'US_TREASURY_30_YR', 'US_TREASURY_10_YR', 'US_TREASURY_3_MO'],
+        'Yield': [0.05, 0.1, 1.25, 2.5, 3.75, 0.0, 4.8]
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+
+    # Calculate the DV01 using the vectorized batch path
+    dv01 = ARXUsTreasuryDV01Calc.dv01_frame(df)
+
+    # The batch path must return the same values as the scalar path, row for row
+    expected = df.apply(ARXUsTreasuryDV01Calc.compute_dv01, axis=1)
+    assert list(dv01.index) == list(df.index)
+    assert np.allclose(dv01.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_dv01_frame_unknown_maturity():
+    df = pd.DataFrame({'InstrumentName': ['US_TREASURY_10_XX'], 'Yield': [2.5]})
+
+    with pytest.raises(ValueError):
+        ARXUsTreasuryDV01Calc.dv01_frame(df)
+
+
 # If you want to run the tests from the command line
 if __name__ == '__main__':
     pytest.main()
@@ -1,7 +1,11 @@
+import math
+
+import numpy as np
 import pandas as pd
 import pytest
+from scipy.stats import norm
 
-from ARXVar import ARXHistoricalSimulation
+from ARXVar import ARXHistoricalSimulation, ARXMonteCarloSimulation, ARXParametricSimulation, ARXVaRCalculator
 
 
 @pytest.fixture
@@ -43,3 +47,165 @@ def test_calculate(sample_data):
     print("Selected Index:", index)
 
     assert result == -0.03, f"Expected -0.03, but got {result}"
+
+
+def test_calculate_many_matches_full_sort():
+    arx_hist_sim = ARXHistoricalSimulation()
+    series = pd.Series(np.random.default_rng(7).normal(0, 0.01, 1001), name="Returns")
+    percentiles = [0.99, 0.95, 0.5, 0.95, 0.0, 1.0]
+
+    sorted_returns = sorted(series.tolist())
+    expected = [sorted_returns[math.ceil((1 - p) * len(sorted_returns)) - 1] for p in percentiles]
+
+    assert arx_hist_sim.calculate_many(series, percentiles) == expected
+
+
+def test_calculate_many_percentile_out_of_bounds(sample_data):
+    with pytest.raises(ValueError, match="Percentile should be between 0 and 1."):
+        ARXHistoricalSimulation().calculate_many(sample_data, [0.95, 1.5])
+
+
+def test_compute_many_parametric(sample_data):
+    calculator = ARXVaRCalculator(strategy=ARXParametricSimulation())
+
+    var_95, var_99 = calculator.compute_many(sample_data, [0.95, 0.99])
+
+    assert var_95 == pytest.approx(calculator.compute(sample_data, 0.95))
+    assert var_99 == pytest.approx(calculator.compute(sample_data, 0.99))
+
+
+@pytest.fixture
+def long_returns():
+    dates = pd.bdate_range("2020-01-01", periods=400)
+    return pd.Series(np.random.default_rng(11).normal(0, 0.01, len(dates)), index=dates, name="Returns")
+
+
+@pytest.mark.parametrize("strategy", [ARXHistoricalSimulation(), ARXParametricSimulation()])
+def test_compute_rolling_matches_window_slices(strategy, long_returns):
+    calculator = ARXVaRCalculator(strategy=strategy)
+    window = 50
+
+    rolling = calculator.compute_rolling(long_returns, 0.95, window)
+
+    assert rolling.index.equals(long_returns.index)
+    assert rolling.iloc[:window - 1].isna().all()
+    expected = [calculator.compute(long_returns.iloc[end - window:end], 0.95)
+                for end in range(window, len(long_returns) + 1)]
+    np.testing.assert_allclose(rolling.iloc[window - 1:].to_numpy(), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_rolling_historical_with_ties():
+    series = pd.Series([0.01, -0.02, 0.01, -0.02, 0.01, -0.02, 0.03])
+    rolling = ARXHistoricalSimulation().calculate_rolling(series, 0.95, 3)
+
+    assert rolling.tolist()[2:] == [-0.02, -0.02, -0.02, -0.02, -0.02]
+
+
+@pytest.fixture
+def yield_changes():
+    rng = np.random.default_rng(3)
+    covariance = [[1.0e-4, 0.8e-4], [0.8e-4, 1.0e-4]]
+    return pd.DataFrame(rng.multivariate_normal([0.0, 0.0], covariance, 2000), columns=["A", "B"])
+
+
+def test_monte_carlo_matches_normal_quantile(yield_changes):
+    weights = [0.6, 0.4]
+    strategy = ARXMonteCarloSimulation(yield_changes, weights, paths=200_000, chunk_size=50_000, workers=1,
+                                       seed=42)
+
+    var_95, var_99 = ARXVaRCalculator(strategy=strategy).compute_many(pd.Series(dtype=float), [0.95, 0.99])
+
+    portfolio = yield_changes @ weights
+    for var, percentile in ((var_95, 0.95), (var_99, 0.99)):
+        expected = portfolio.mean() + norm.ppf(1 - percentile) * portfolio.std()
+        assert var == pytest.approx(expected, rel=0.03)
+        assert 0 < strategy.diagnostics["var"][percentile]["standard_error"] < abs(expected) * 0.03
+    assert strategy.diagnostics["paths"] == 200_000
+    assert strategy.diagnostics["chunks"] == 4
+    assert strategy.diagnostics["paths_per_second"] > 0
+
+
+def test_monte_carlo_is_reproducible_across_workers(yield_changes):
+    def run(workers):
+        strategy = ARXMonteCarloSimulation(yield_changes, [0.5, 0.5], paths=30_000, chunk_size=7_000,
+                                           workers=workers, seed=7)
+        return strategy.calculate_many(pd.Series(dtype=float), [0.95, 0.99])
+
+    assert run(1) == run(2)
+
+
+def test_monte_carlo_full_percentile_is_worst_path(yield_changes):
+    strategy = ARXMonteCarloSimulation(yield_changes, [0.5, 0.5], paths=30_000, chunk_size=7_000, workers=1,
+                                       seed=7, verbose=False)
+    (var_100, es_100), (var_95, _) = strategy.calculate_with_es(pd.Series(dtype=float), [1.0, 0.95])
+    assert var_100 == es_100 < var_95
+
+
+def test_monte_carlo_from_returns_and_singular_covariance():
+    series = pd.Series(np.random.default_rng(5).normal(0, 0.01, 500))
+    strategy = ARXMonteCarloSimulation(paths=20_000, chunk_size=5_000, workers=1, seed=1)
+    assert strategy.calculate(series, 0.95) == pytest.approx(series.mean() + norm.ppf(0.05) * series.std(),
+                                                             rel=0.05)
+
+    # An instrument that never changes makes the covariance singular
+    changes = pd.DataFrame({"A": series, "B": 0.0})
+    strategy = ARXMonteCarloSimulation(changes, [0.5, 0.5], paths=20_000, chunk_size=5_000, workers=1, seed=1)
+    assert np.isfinite(strategy.calculate(series, 0.95))
+
+
+def test_historical_es_is_mean_beyond_var(long_returns):
+    percentiles = [0.95, 0.99]
+    results = ARXVaRCalculator(strategy=ARXHistoricalSimulation()).compute_with_es(long_returns, percentiles)
+
+    sorted_returns = sorted(long_returns.tolist())
+    for (var, es), percentile in zip(results, percentiles):
+        index = math.ceil((1 - percentile) * len(sorted_returns)) - 1
+        assert var == sorted_returns[index]
+        assert es == pytest.approx(np.mean(sorted_returns[:index + 1]))
+        assert es <= var
+
+
+def test_parametric_es(long_returns):
+    (var, es), = ARXParametricSimulation().calculate_with_es(long_returns, [0.975])
+
+    mean, std = long_returns.mean(), long_returns.std()
+    assert var == pytest.approx(ARXParametricSimulation().calculate(long_returns, 0.975))
+    assert var == pytest.approx(mean + norm.ppf(0.025) * std)
+    assert es == pytest.approx(mean - std * norm.pdf(norm.ppf(0.025)) / 0.025)
+
+    # The mean return beyond the 2.5% quantile of the fitted normal, as for the other strategies
+    sample = np.sort(np.random.default_rng(1).normal(mean, std, 1_000_000))
+    assert es == pytest.approx(sample[:25_000].mean(), rel=0.01)
+    assert es < sample[24_999]
+
+
+def test_parametric_var_and_es_share_the_mean():
+    # A clearly non-zero mean: VaR and ES are quantile and tail mean of the same distribution
+    series = pd.Series(np.random.default_rng(2).normal(0.5, 1.0, 5000))
+    (var, es), = ARXParametricSimulation().calculate_with_es(series, [0.95])
+    assert es <= var
+    assert var == pytest.approx(series.mean() + norm.ppf(0.05) * series.std())
+    assert var == pytest.approx(ARXHistoricalSimulation().calculate(series, 0.95), abs=0.1)
+    assert es == pytest.approx(ARXHistoricalSimulation().calculate_with_es(series, [0.95])[0][1], abs=0.1)
+
+
+def test_monte_carlo_es(yield_changes):
+    strategy = ARXMonteCarloSimulation(yield_changes, [0.6, 0.4], paths=100_000, chunk_size=25_000, workers=1,
+                                       seed=3)
+    (var, es), = strategy.calculate_with_es(pd.Series(dtype=float), [0.99])
+
+    portfolio = yield_changes @ [0.6, 0.4]
+    assert es < var
+    assert es == pytest.approx(portfolio.mean() - portfolio.std() * norm.pdf(norm.ppf(0.01)) / 0.01, rel=0.05)
+    assert strategy.diagnostics["var"][0.99]["es"] == es
+
+
+@pytest.mark.parametrize("strategy", [ARXHistoricalSimulation(), ARXParametricSimulation()])
+def test_compute_batch_matches_columns(strategy, yield_changes):
+    calculator = ARXVaRCalculator(strategy=strategy)
+
+    batch = calculator.compute_batch(yield_changes, [0.95, 0.99])
+
+    assert list(batch.index) == [0.95, 0.99]
+    for column in yield_changes.columns:
+        np.testing.assert_allclose(batch[column], calculator.compute_many(yield_changes[column], [0.95, 0.99]))
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2
+
+from ARXVar import ARXHistoricalSimulation, ARXParametricSimulation, ARXVaRCalculator
+from ARXVarBacktest import ARXVaRBacktest
+
+
+def reference_tests(hits, percentile):
+    """Straightforward loop over the dates of a single backtest."""
+    p = 1 - percentile
+    n, x = len(hits), sum(hits)
+    rate = x / n
+
+    def log_likelihood(misses, exceeded, q):
+        return (misses * math.log(1 - q) if misses else 0.0) + (exceeded * math.log(q) if exceeded else 0.0)
+
+    kupiec = -2 * (log_likelihood(n - x, x, p) - log_likelihood(n - x, x, rate))
+
+    counts = {(a, b): 0 for a in (0, 1) for b in (0, 1)}
+    for previous, current in zip(hits[:-1], hits[1:]):
+        counts[(previous, current)] += 1
+    n00, n01, n10, n11 = counts[(0, 0)], counts[(0, 1)], counts[(1, 0)], counts[(1, 1)]
+    pi01 = n01 / (n00 + n01) if n00 + n01 else 0.0
+    pi11 = n11 / (n10 + n11) if n10 + n11 else 0.0
+    pi = (n01 + n11) / (n00 + n01 + n10 + n11)
+    independence = -2 * (log_likelihood(n00 + n10, n01 + n11, pi)
+                         - log_likelihood(n00, n01, pi01) - log_likelihood(n10, n11, pi11))
+    return kupiec, independence
+
+
+@pytest.fixture
+def returns():
+    dates = pd.bdate_range("2019-01-01", periods=750)
+    return pd.Series(np.random.default_rng(21).standard_t(4, len(dates)) / 100, index=dates, name="Returns")
+
+
+def test_matches_reference_for_many_columns(returns):
+    forecasts = pd.DataFrame({
+        name: ARXVaRCalculator(strategy=strategy).compute_rolling(returns, 0.95, 250).shift(1)
+        for name, strategy in (("historical", ARXHistoricalSimulation()), ("parametric", ARXParametricSimulation()))
+    })
+
+    results = ARXVaRBacktest(0.95).run(returns, forecasts)
+
+    assert list(results.index) == ["historical", "parametric"]
+    for name in forecasts.columns:
+        valid = forecasts[name].notna()
+        hits = (returns[valid] < forecasts[name][valid]).astype(int).tolist()
+        kupiec, independence = reference_tests(hits, 0.95)
+
+        row = results.loc[name]
+        assert row["observations"] == len(hits) == 500
+        assert row["exceedances"] == sum(hits)
+        assert row["expected"] == pytest.approx(25)
+        assert row["kupiec_lr"] == pytest.approx(kupiec)
+        assert row["independence_lr"] == pytest.approx(independence)
+        assert row["conditional_p_value"] == pytest.approx(chi2.sf(kupiec + independence, 2))
+
+
+def test_perfect_and_clustered_forecasts():
+    dates = pd.bdate_range("2020-01-01", periods=100)
+    realized = pd.DataFrame({"never": -0.01, "clustered": -0.01}, index=dates)
+    forecast = pd.DataFrame({"never": -0.02, "clustered": -0.02}, index=dates)
+    forecast.iloc[40:50, 1] = 0.0
+
+    results = ARXVaRBacktest(0.99).run(realized, forecast)
+
+    assert results.loc["never", "exceedances"] == 0
+    assert results.loc["never", "independence_lr"] == pytest.approx(0)
+    assert results.loc["clustered", "exceedances"] == 10
+    # Ten exceedances in a row, where one is expected, fail both tests
+    assert results.loc["clustered", "kupiec_p_value"] < 0.001
+    assert results.loc["clustered", "independence_p_value"] < 0.001
+
+
+def test_series_inputs_and_missing_forecasts(returns):
+    forecast = pd.Series(-0.02, index=returns.index[100:], name="fixed")
+
+    hits = ARXVaRBacktest(0.95).exceedances(returns, forecast)
+    results = ARXVaRBacktest(0.95).run(returns, forecast)
+
+    assert len(hits) == 650
+    assert results.loc["fixed", "observations"] == 650
+    assert results.loc["fixed", "exceedances"] == (returns.iloc[100:] < -0.02).sum()
+
+
+def test_percentile_out_of_bounds():
+    with pytest.raises(ValueError, match="Percentile should be between 0 and 1."):
+        ARXVaRBacktest(1.0)
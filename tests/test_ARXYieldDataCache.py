@@ -0,0 +1,167 @@
+import pandas as pd
+import pytest
+
+from ARXDateRanges import ARXDateRanges
+from ARXYieldDataCache import ARXYieldDataCache
+
+
+class LocalYieldDataAccess:
+    """
+    Stand-in for ARXYieldDataAccess serving an in-memory YieldData table and recording the queries it receives.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.range_requests = []
+
+    def execute_get_yield_data_by_date_range(self, start_date, end_date):
+        self.range_requests.append((start_date, end_date))
+        dates = pd.to_datetime(self.table["Date"])
+        return self.table[(dates >= start_date) & (dates <= end_date)].reset_index(drop=True)
+
+    def execute_get_yield_data_updated_since(self, since):
+        return self.table[self.table["DateUpdated"] >= since].reset_index(drop=True)
+
+    def get_unique_instruments(self, df):
+        return sorted(df["InstrumentName"].unique().tolist())
+
+
+@pytest.fixture
+def table():
+    dates = pd.date_range("2021-01-01", "2021-01-31")
+    rows = []
+    for instrument, base in (("US_TREASURY_1_YR", 0.1), ("US_TREASURY_10_YR", 1.0)):
+        for i, date in enumerate(dates):
+            rows.append([f"{instrument}-{i}", instrument, date, base + i / 100, pd.Timestamp("2023-01-01")])
+    return pd.DataFrame(rows, columns=["Id", "InstrumentName", "Date", "Yield", "DateUpdated"])
+
+
+def test_missing_ranges():
+    covered = ARXDateRanges.from_json([["2021-01-05", "2021-01-10"], ["2021-01-11", "2021-01-15"]])
+
+    gaps = ARXDateRanges.missing(covered, "2021-01-01", "2021-01-20")
+    assert ARXDateRanges.to_json(gaps) == [["2021-01-01", "2021-01-04"], ["2021-01-16", "2021-01-20"]]
+    assert ARXDateRanges.missing(covered, "2021-01-06", "2021-01-14") == []
+
+
+def test_serves_repeated_and_wider_requests(tmp_path, table):
+    access = LocalYieldDataAccess(table)
+    cache = ARXYieldDataCache(access, cache_directory=tmp_path)
+
+    df = cache.execute_get_yield_data_by_date_range("2021-01-10", "2021-01-20")
+    assert len(df) == 22
+    assert access.range_requests == [("2021-01-10", "2021-01-20")]
+
+    # A repeated request is served from the cache
+    cache.execute_get_yield_data_by_date_range("2021-01-12", "2021-01-18")
+    assert len(access.range_requests) == 1
+
+    # A wider request only fetches the missing dates, from a fresh cache instance reading the files on disk
+    cache = ARXYieldDataCache(access, cache_directory=tmp_path)
+    df = cache.execute_get_yield_data_by_date_range("2021-01-05", "2021-01-25")
+    assert access.range_requests[1:] == [("2021-01-05", "2021-01-09"), ("2021-01-21", "2021-01-25")]
+    assert len(df) == 42
+
+    expected = table[(table["Date"] >= "2021-01-05") & (table["Date"] <= "2021-01-25")]
+    merged = df.merge(expected, on=["InstrumentName", "Date"], suffixes=("", "_expected"))
+    assert len(merged) == 42
+    assert (merged["Yield"] == merged["Yield_expected"]).all()
+
+
+def test_invalidates_rows_by_date_updated(tmp_path, table):
+    access = LocalYieldDataAccess(table)
+    cache = ARXYieldDataCache(access, cache_directory=tmp_path)
+    cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")
+    version = cache.data_version
+
+    # Re-ingest one row with a newer DateUpdated
+    row = (table["InstrumentName"] == "US_TREASURY_10_YR") & (table["Date"] == "2021-01-15")
+    table.loc[row, "Yield"] = 9.99
+    table.loc[row, "DateUpdated"] = pd.Timestamp("2023-06-01")
+
+    df = cache.execute_get_yield_data_by_date_range("2021-01-15", "2021-01-15")
+    assert len(access.range_requests) == 1
+    assert df.set_index("InstrumentName")["Yield"]["US_TREASURY_10_YR"] == 9.99
+    assert cache.data_version != version
+
+
+def test_empty_store_is_fetched_again(tmp_path, table):
+    access = LocalYieldDataAccess(table.iloc[:0])
+    cache = ARXYieldDataCache(access, cache_directory=tmp_path)
+    assert cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31").empty
+    assert cache.data_version is None
+
+    # Rows loaded after the empty fetch are read, also by a cache instance reading the files on disk
+    access.table = table
+    assert len(ARXYieldDataCache(access, cache_directory=tmp_path).execute_get_yield_data_by_date_range(
+        "2021-01-01", "2021-01-31")) == 62
+    assert len(cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 62
+    assert cache.data_version is not None
+
+
+def test_rows_inserted_after_an_empty_fetch_are_read(tmp_path, sqlite_store):
+    store = sqlite_store()
+    cache = ARXYieldDataCache(store, cache_directory=tmp_path / "cache")
+    assert cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31").empty
+
+    pd.DataFrame({"InstrumentName": "US_TREASURY_1_YR", "Date": ["2021-01-04", "2021-01-05"], "Yield": [0.1, 0.11]}
+                 ).to_csv(store.data_directory / "US_TREASURY_1_YR_yield_data.csv", index=False)
+    store.execute_bulk_insert()
+
+    assert len(cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 2
+
+
+def write_curve(store, maturity, dates, value):
+    pd.DataFrame({"InstrumentName": f"US_TREASURY_{maturity}", "Date": dates, "Yield": value}).to_csv(
+        store.data_directory / f"US_TREASURY_{maturity}_yield_data.csv", index=False)
+
+
+def test_refresh_between_two_file_commits(tmp_path, sqlite_store, monkeypatch):
+    store = sqlite_store()
+    dates = pd.bdate_range("2021-01-04", "2021-01-29").strftime("%Y-%m-%d")
+    write_curve(store, "1_YR", dates[:5], 0.1)
+    store.execute_bulk_insert()
+    cache = ARXYieldDataCache(store, cache_directory=tmp_path / "cache")
+    cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")
+
+    # The cache refreshes after the first file of the next load is committed, before the second is written
+    write_curve(store, "1_YR", dates, 0.1)
+    write_curve(store, "10_YR", dates, 1.0)
+    write_batch = store._write_batch
+    files = []
+
+    def refresh_between_files(cursor, rows, date_updated):
+        if files and files[-1] != rows["InstrumentName"].iloc[0]:
+            cache.refresh()
+        files.append(rows["InstrumentName"].iloc[0])
+        write_batch(cursor, rows, date_updated)
+
+    monkeypatch.setattr(store, "_write_batch", refresh_between_files)
+    store.execute_bulk_insert()
+
+    cache.refresh()
+    assert len(cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 2 * len(dates)
+
+
+def test_refresh_pulls_rows_committed_late_with_an_earlier_stamp(tmp_path, sqlite_store):
+    store = sqlite_store()
+    write_curve(store, "1_YR", ["2021-01-04", "2021-01-05"], 0.1)
+    store.execute_bulk_insert()
+    cache = ARXYieldDataCache(store, cache_directory=tmp_path / "cache")
+    cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")
+    version = cache.data_version
+
+    # A concurrent load stamped its rows before the watermark but committed them after the refresh
+    rows = store.clean_yield_rows(pd.DataFrame({"InstrumentName": "US_TREASURY_10_YR", "Date": ["2021-01-04"],
+                                                "Yield": [1.0]}))
+    with store.pool.connection() as conn:
+        store._write_batch(conn.cursor, rows, (pd.Timestamp(cache.meta["watermark"]) - pd.Timedelta(seconds=1))
+                           .to_pydatetime())
+        conn.commit()
+
+    assert len(cache.refresh()) == 1
+    assert cache.data_version > version
+    assert len(cache.execute_get_yield_data_by_date_range("2021-01-01", "2021-01-31")) == 3
+
+    # Rows pulled again by the overlap are already held
+    assert cache.refresh().empty